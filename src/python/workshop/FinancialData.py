@@ -1,100 +1,625 @@
+import asyncio
 import json
 import logging
-from typing import Optional
+import time
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Optional
 import aiosqlite
-import pandas as pd
+from compact_schema import FACT_TABLE
+from connection_pool import ConnectionPool, PoolTimeoutError
+from partitions import PARTITION_DIR, PartitionRouter
+from query_cache import QueryCache
+from query_guard import GuardAction, QueryGuard
+from query_paging import (
+    build_page_query,
+    check_page_state,
+    choose_keyset,
+    decode_token,
+    encode_token,
+    is_pageable,
+    query_hash,
+    single_table,
+)
+from result_serializer import ResultSerializer
+from schema_catalog import SchemaCatalog
+from snapshot_manager import SnapshotManager
 from terminal_colors import TerminalColors as tc
 from utilities import Utilities
 
 DATA_BASE = "database/financial_data.db"
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 8
+POOL_ACQUIRE_TIMEOUT = 10.0
+# How often a request may look for a newly published snapshot (one stat of the pointer file)
+SNAPSHOT_CHECK_INTERVAL = 1.0
+# Hard server-side cap on rows returned by one tool call, whatever LIMIT the model wrote
+MAX_RESULT_ROWS = 100
+FETCH_BATCH_SIZE = 50
+JOURNAL_PAGE_SIZE = 30
+# Wall-clock budget for one tool call's SQL; the statement is interrupted when it runs out
+QUERY_TIMEOUT = 15.0
+# SQLite VM instructions between deadline checks; small enough to react within milliseconds
+PROGRESS_HANDLER_STEPS = 10_000
+
+# Fixed statement texts for the typed tools. sqlite3 keeps a per-connection cache of prepared
+# statements keyed by SQL text, so each pooled connection prepares these only once. Optional
+# date bounds are always bound to keep the text fixed: "" and "~" sort before and after every text
+# date, 0 and 99999999 before and after every integer date of the compact journal layout.
+BOOK_DETAILS_SQL = """
+SELECT k.SAP_BOOK_ID, k.Bookname, k.systementity, l.DATE AS LATEST_DATE, l.BALANCE AS LATEST_BALANCE,
+    l.TOTAL_JOURNALS AS LATEST_TOTAL_JOURNALS
+FROM books k
+LEFT JOIN balance_records l ON l.SAP_BOOK_ID = k.SAP_BOOK_ID
+    AND l.DATE = (SELECT MAX(DATE) FROM balance_records WHERE SAP_BOOK_ID = k.SAP_BOOK_ID)
+WHERE k.SAP_BOOK_ID = ?
+"""
+BOOK_DETAILS_ROLLUP_SQL = """
+SELECT k.SAP_BOOK_ID, k.Bookname, k.systementity, l.DATE AS LATEST_DATE, l.BALANCE AS LATEST_BALANCE,
+    l.TOTAL_JOURNALS AS LATEST_TOTAL_JOURNALS
+FROM books k
+LEFT JOIN latest_balances l ON l.SAP_BOOK_ID = k.SAP_BOOK_ID
+WHERE k.SAP_BOOK_ID = ?
+"""
+JOURNAL_ENTRIES_SQL = """
+SELECT DOCUMENT_NUMBER, SAP_BOOK_ID, ENTRY_DATE, POSTING_DATE, TRANSACTION_TYPE, VALUE, TRANSACTION_CURRENCY,
+    COST_CENTER, USERNAME, APPROVED_BY, REMARKS
+FROM journal_entries
+WHERE SAP_BOOK_ID = ? AND ENTRY_DATE >= ? AND ENTRY_DATE < ?
+ORDER BY ENTRY_DATE DESC, DOCUMENT_NUMBER DESC
+LIMIT ? OFFSET ?
+"""
+BALANCES_SQL = """
+SELECT SAP_BOOK_ID, DATE, BALANCE, TOTAL_JOURNALS, DAILY_CHANGE
+FROM balance_records
+WHERE SAP_BOOK_ID = ? AND DATE >= ? AND DATE < ?
+ORDER BY DATE DESC
+LIMIT ?
+"""
+LATEST_DATE_SQL = "SELECT MAX(DATE) FROM balance_records"
+LATEST_SUMMARY_SQL = """
+SELECT COUNT(*) AS BOOK_COUNT, SUM(TOTAL_JOURNALS) AS TOTAL_JOURNALS, ROUND(SUM(BALANCE), 2) AS TOTAL_BALANCE,
+    ROUND(AVG(BALANCE), 2) AS AVG_BALANCE, MIN(BALANCE) AS MIN_BALANCE, MAX(BALANCE) AS MAX_BALANCE
+FROM balance_records
+WHERE DATE = ?
+"""
+LATEST_SUMMARY_ROLLUP_SQL = """
+SELECT BOOK_COUNT, TOTAL_JOURNALS, TOTAL_BALANCE, AVG_BALANCE, MIN_BALANCE, MAX_BALANCE
+FROM daily_balance_summary
+WHERE DATE = ?
+"""
+TOP_BALANCES_SQL = """
+SELECT b.SAP_BOOK_ID, k.Bookname, b.BALANCE, b.TOTAL_JOURNALS
+FROM balance_records b
+LEFT JOIN books k ON k.SAP_BOOK_ID = b.SAP_BOOK_ID
+WHERE b.DATE = ?
+ORDER BY b.BALANCE DESC
+LIMIT ?
+"""
 
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
 
+class QueryTimeoutError(Exception):
+    """Raised when a statement is interrupted because the query deadline passed."""
+
+
 class FinancialData:
-    conn: Optional[aiosqlite.Connection]
+    pool: Optional[ConnectionPool]
 
-    def __init__(self: "FinancialData", utilities: Utilities) -> None:
-        self.conn = None
+    def __init__(
+        self: "FinancialData",
+        utilities: Utilities,
+        pool_min_size: int = POOL_MIN_SIZE,
+        pool_max_size: int = POOL_MAX_SIZE,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+        query_cache: Optional[QueryCache] = None,
+        max_result_rows: int = MAX_RESULT_ROWS,
+        serializer: Optional[ResultSerializer] = None,
+        query_guard: Optional[QueryGuard] = None,
+        query_timeout: float = QUERY_TIMEOUT,
+    ) -> None:
+        self.pool = None
         self.utilities = utilities
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.acquire_timeout = acquire_timeout
+        self.query_cache = query_cache or QueryCache()
+        self.max_result_rows = max_result_rows
+        self.serializer = serializer or ResultSerializer()
+        self.query_guard = query_guard or QueryGuard()
+        self.query_timeout = query_timeout
+        self.catalog = SchemaCatalog(self.db_path)
+        self.snapshots = SnapshotManager(self.db_path)
+        self._connect_lock = asyncio.Lock()
+        # The snapshot file the current pool reads, and the (file, partition router) behind every
+        # pool and borrowed connection
+        self._db_file: Optional[Path] = None
+        self._pool_snapshots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._conn_snapshots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._pointer_signature: Optional[tuple[int, int]] = None
+        self._next_snapshot_check = 0.0
+        self._switching = False
+        # Last PRAGMA data_version seen per pooled connection
+        self._data_versions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # (database version, whether dates are stored ISO style with dashes, whether journals are compact)
+        self._date_style: tuple[Optional[str], bool, bool] = (None, False, False)
+
+    @property
+    def db_path(self: "FinancialData") -> Path:
+        return self.utilities.shared_files_path / DATA_BASE
 
     async def connect(self: "FinancialData") -> None:
-        db_uri = f"file:{self.utilities.shared_files_path}/{DATA_BASE}?mode=ro"
+        # Shared across chat sessions, so only the first caller opens the pool
+        async with self._connect_lock:
+            if self.pool and not self.pool.closed:
+                return
+            self._pointer_signature = self.snapshots.pointer_signature()
+            db_file = self.snapshots.current()
+            self.pool = await self._open_pool(db_file)
+            self._db_file = db_file if self.pool else None
+
+    async def _open_pool(self: "FinancialData", db_file: Path) -> Optional[ConnectionPool]:
+        pool = None
         try:
-            self.conn = await aiosqlite.connect(db_uri, uri=True)
-            logger.debug("Database connection opened.")
+            # Journal partitions are attached to every connection of the pool
+            router = await asyncio.to_thread(PartitionRouter.load, db_file, self.db_path.parent / PARTITION_DIR)
+            pool = ConnectionPool(
+                f"file:{db_file}?mode=ro",
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
+                acquire_timeout=self.acquire_timeout,
+                on_connect=router.attach,
+            )
+            await pool.open()
         except aiosqlite.Error as e:
             logger.exception("Error opening database", exc_info=e)
-            self.conn = None
+            if pool:
+                await pool.close()
+            return None
+        self._pool_snapshots[pool] = (db_file, router)
+        logger.debug("Database connection pool opened on %s.", db_file)
+        return pool
+
+    async def _switch_snapshot(self: "FinancialData") -> None:
+        """Move to a newly published snapshot: new requests go to a new pool, the old one drains.
+
+        Only the request that notices the publish waits for the new pool to open; the others
+        keep using the old pool meanwhile. Queries already running on the old snapshot finish
+        there, and its connections are closed as they are released.
+        """
+        now = time.monotonic()
+        if self._switching or self.pool is None or now < self._next_snapshot_check:
+            return
+        self._next_snapshot_check = now + SNAPSHOT_CHECK_INTERVAL
+        signature = self.snapshots.pointer_signature()
+        if signature == self._pointer_signature:
+            return
+
+        self._switching = True
+        try:
+            db_file = self.snapshots.current()
+            if db_file != self._db_file:
+                pool = await self._open_pool(db_file)
+                if pool is None:
+                    # Tried again at the next check
+                    return
+                old_pool = self.pool
+                self.pool, self._db_file = pool, db_file
+                # Results of the old snapshot are keyed on its version and will not be asked for again
+                self.query_cache.invalidate()
+                await old_pool.close()
+                logger.info("Switched to database snapshot %s.", db_file)
+            self._pointer_signature = signature
+        finally:
+            self._switching = False
+
+    @asynccontextmanager
+    async def _connection(self: "FinancialData") -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a pooled connection on the current snapshot."""
+        await self._switch_snapshot()
+        async with AsyncExitStack() as stack:
+            pool = self.pool
+            try:
+                conn = await stack.enter_async_context(pool.acquire())
+            except PoolTimeoutError:
+                # The pool was retired by a snapshot switch while this request waited for it
+                if not pool.closed or self.pool is pool:
+                    raise
+                pool = self.pool
+                conn = await stack.enter_async_context(pool.acquire())
+            self._conn_snapshots[conn] = self._pool_snapshots[pool]
+            yield conn
+
+    def _route(
+        self: "FinancialData",
+        conn: aiosqlite.Connection,
+        sql: str,
+        lower: Optional[str | int] = None,
+        upper: Optional[str | int] = None,
+    ) -> str:
+        """Point a journal query at only the partitions its entry date bounds can match."""
+        _, router = self._conn_snapshots[conn]
+        return router.route(sql, lower, upper)
 
     async def close(self: "FinancialData") -> None:
-        if self.conn:
-            await self.conn.close()
-            logger.debug("Database connection closed.")
-
-    async def _get_table_names(self: "FinancialData") -> list:
-        async with self.conn.execute("SELECT name FROM sqlite_master WHERE type='table';") as tables:
-            return [table[0] async for table in tables if table[0] != "sqlite_sequence"]
-
-    async def _get_column_info(self: "FinancialData", table_name: str) -> list:
-        async with self.conn.execute(f"PRAGMA table_info('{table_name}');") as columns:
-            return [f"{col[1]}: {col[2]}" async for col in columns]
-
-    async def _get_transaction_types(self: "FinancialData") -> list:
-        query = "SELECT DISTINCT TRANSACTION_TYPE FROM journal_entries;"
-        async with self.conn.execute(query) as cursor:
-            result = await cursor.fetchall()
-        return [row[0] for row in result if row[0] is not None]
-
-    async def _get_currencies(self: "FinancialData") -> list:
-        query = "SELECT DISTINCT TRANSACTION_CURRENCY FROM journal_entries;"
-        async with self.conn.execute(query) as cursor:
-            result = await cursor.fetchall()
-        return [row[0] for row in result if row[0] is not None]
-
-    async def _get_years(self: "FinancialData") -> list:
-        query = "SELECT DISTINCT substr(ENTRY_DATE, 1, 4) AS year FROM journal_entries ORDER BY year;"
-        async with self.conn.execute(query) as cursor:
-            result = await cursor.fetchall()
-        return [row[0] for row in result if row[0] is not None]
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+            logger.debug("Database connection pool closed.")
+        await self.query_cache.close()
+        self.serializer.close()
 
-    async def get_database_info(self: "FinancialData") -> str:
-        table_dicts = []
-        for table_name in await self._get_table_names():
-            columns_names = await self._get_column_info(table_name)
-            table_dicts.append({"table_name": table_name, "column_names": columns_names})
-
-        database_info = "\n".join(
-            [
-                f"Table {table['table_name']} Schema: Columns: {', '.join(table['column_names'])}"
-                for table in table_dicts
-            ]
+    def pool_metrics(self: "FinancialData") -> dict:
+        return self.pool.metrics() if self.pool else {}
+
+    def cache_stats(self: "FinancialData") -> dict:
+        return self.query_cache.stats()
+
+    async def get_db_version(self: "FinancialData", conn: aiosqlite.Connection) -> str:
+        """Return a version string that changes whenever the database contents change."""
+        async with conn.execute("PRAGMA data_version;") as cursor:
+            (data_version,) = await cursor.fetchone()
+        previous = self._data_versions.get(conn)
+        self._data_versions[conn] = data_version
+        if previous is not None and previous != data_version:
+            # Another connection committed to the database since this one last looked
+            self.query_cache.invalidate()
+        return self.file_version(conn)
+
+    def file_version(self: "FinancialData", conn: Optional[aiosqlite.Connection] = None) -> str:
+        """Return a signature of the database files that persists across connections and processes.
+
+        Without a connection this is the version of the current snapshot; with one, of the
+        snapshot that connection reads, which differs while an old snapshot drains.
+        """
+        db_file = self._conn_snapshots[conn][0] if conn is not None else None
+        db_file = db_file or self._db_file or self.db_path
+        signature = [db_file.name]
+        for path in (db_file, db_file.with_name(f"{db_file.name}-wal")):
+            try:
+                stat = path.stat()
+                signature.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            except FileNotFoundError:
+                signature.append("-")
+        return "/".join(signature)
+
+    @asynccontextmanager
+    async def _deadline(self: "FinancialData", conn: aiosqlite.Connection) -> AsyncIterator[None]:
+        """Abort the statements run inside the context once the query timeout passes or the task is cancelled.
+
+        Cancelling the awaiting task does not stop the statement on the connection's worker
+        thread, which would otherwise hold the pooled connection until it finished on its own.
+        """
+        deadline = time.monotonic() + self.query_timeout
+        cancelled = False
+
+        def progress() -> int:
+            # Runs on the worker thread; a non-zero return makes SQLite abort with "interrupted"
+            return 1 if cancelled or time.monotonic() > deadline else 0
+
+        await conn.set_progress_handler(progress, PROGRESS_HANDLER_STEPS)
+        try:
+            yield
+        except asyncio.CancelledError:
+            cancelled = True
+            # interrupt() is not queued behind the running statement, unlike other aiosqlite calls
+            await conn.interrupt()
+            raise
+        except aiosqlite.OperationalError as e:
+            if "interrupted" in str(e) and time.monotonic() > deadline:
+                raise QueryTimeoutError(f"The query did not finish within {self.query_timeout:g} seconds.") from e
+            raise
+        finally:
+            await conn.set_progress_handler(None, 0)
+
+    def _timeout_result(self: "FinancialData", error: QueryTimeoutError, **details: object) -> str:
+        return json.dumps(
+            {
+                "SQLite query timed out": str(error),
+                "timeout_seconds": self.query_timeout,
+                "hint": "Narrow the query with a WHERE clause on SAP_BOOK_ID or the date, or use a summary table.",
+                **details,
+            }
         )
-        txn_types = await self._get_transaction_types()
-        currencies = await self._get_currencies()
-        years = await self._get_years()
 
-        database_info += f"\nTransaction Types: {', '.join(txn_types)}"
-        database_info += f"\nCurrencies: {', '.join(currencies)}"
-        database_info += f"\nYears: {', '.join(years)}"
-        database_info += "\n\n"
+    async def get_database_info(self: "FinancialData") -> str:
+        async with self._connection() as conn:
+            return await self.catalog.get_database_info(conn, self.file_version(conn))
+
+    async def _fetch_capped(self: "FinancialData", cursor: aiosqlite.Cursor, limit: int) -> list:
+        rows = []
+        while len(rows) < limit:
+            batch = await cursor.fetchmany(min(FETCH_BATCH_SIZE, limit - len(rows)))
+            if not batch:
+                break
+            rows.extend(batch)
+        return rows
+
+    async def _fetch_page(
+        self: "FinancialData",
+        conn: aiosqlite.Connection,
+        sqlite_query: str,
+        continuation_token: str,
+        db_version: str,
+        extra: Optional[dict] = None,
+        max_rows: Optional[int] = None,
+    ) -> str:
+        """Run one page of the query; max_rows bounds the rows of all its pages together."""
+        state = {"h": query_hash(sqlite_query), "v": db_version}
+        if continuation_token:
+            previous = decode_token(continuation_token)
+            if previous["h"] != state["h"]:
+                raise ValueError("The continuation token belongs to a different query.")
+            if previous["v"] != db_version:
+                return json.dumps(
+                    {"Continuation token expired": "The data changed since the first page. Run the query again."}
+                )
+            state = previous
+
+        # Rows returned by the earlier pages
+        served = state.get("n", 0)
+        page_rows = self.max_result_rows if max_rows is None else min(self.max_result_rows, max_rows - served)
+        # One extra row tells us whether the result was truncated
+        limit = page_rows + 1
+        if is_pageable(sqlite_query):
+            # LIMIT 0 only prepares the statement, which is enough to learn the column names
+            probe_sql, probe_params = build_page_query(sqlite_query, None, None, 0, 0)
+            async with conn.execute(probe_sql, probe_params) as cursor:
+                columns = [description[0] for description in cursor.description]
+            table = single_table(sqlite_query)
+            unique_keys = await self._unique_keys(conn, table) if table else []
+            key_columns = choose_keyset(sqlite_query, columns, unique_keys)
+            if continuation_token:
+                # Tokens come back from the model: one that does not page this query as issued is refused
+                check_page_state(state, key_columns)
+            page_sql, params = build_page_query(sqlite_query, key_columns, state.get("a"), state.get("o", 0), limit)
+        else:
+            key_columns, page_sql, params = None, sqlite_query, []
+
+        async with conn.execute(page_sql, params) as cursor:
+            rows = await self._fetch_capped(cursor, limit)
+            columns = ResultSerializer.columns_from_description(cursor.description)
+
+        if not rows:
+            return json.dumps("The query returned no results.")
+
+        truncated = len(rows) > page_rows
+        rows = rows[:page_rows]
+        if not truncated:
+            return await self.serializer.serialize_async(columns, rows, extra)
+
+        result = {**(extra or {}), "truncated": True, "row_cap": self.max_result_rows}
+        served += len(rows)
+        if max_rows is not None and served >= max_rows:
+            # The cost guard's limit, not the page size, ends the result; there is no next page
+            result["row_limit"] = max_rows
+        elif is_pageable(sqlite_query):
+            next_state = {"h": state["h"], "v": db_version, "n": served}
+            if key_columns:
+                next_state["k"] = key_columns
+                next_state["a"] = [rows[-1][columns.index(key)] for key in key_columns]
+            else:
+                next_state["o"] = served
+            result["continuation_token"] = encode_token(next_state)
+        return await self.serializer.serialize_async(columns, rows, result)
 
-        return database_info
+    async def _unique_keys(self: "FinancialData", conn: aiosqlite.Connection, table: str) -> list[tuple[str, ...]]:
+        """Column lists of the primary key and unique indexes of a table; none for a view."""
+        async with conn.execute('SELECT name FROM pragma_index_list(?) WHERE "unique";', (table,)) as cursor:
+            indexes = [row[0] for row in await cursor.fetchall()]
+        unique_keys = []
+        for index in indexes:
+            async with conn.execute("SELECT name FROM pragma_index_info(?) ORDER BY seqno;", (index,)) as cursor:
+                unique_keys.append(tuple(row[0] for row in await cursor.fetchall()))
+        return unique_keys
 
-    async def async_fetch_data_using_sqlite_query(self: "FinancialData", sqlite_query: str) -> str:
+    async def _has_table(self: "FinancialData", conn: aiosqlite.Connection, table_name: str) -> bool:
+        catalog = await self.catalog.get(conn, self.file_version(conn))
+        return any(table["table_name"] == table_name for table in catalog["tables"])
+
+    async def _date_bounds(
+        self: "FinancialData",
+        conn: aiosqlite.Connection,
+        db_version: str,
+        from_date: str,
+        to_date: str,
+        journal: bool = False,
+    ) -> tuple[str | int, str | int]:
+        """Turn inclusive YYYY-MM-DD bounds into a half-open range in the database's own date format.
+
+        With journal=True the bounds are for journal_entries.ENTRY_DATE, which the compact layout
+        stores as integers; balance_records dates are always text.
+        """
+        if self._date_style[0] != db_version:
+            async with conn.execute("SELECT DATE FROM balance_records LIMIT 1;") as cursor:
+                row = await cursor.fetchone()
+            async with conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?;", (FACT_TABLE,)) as cursor:
+                compact = await cursor.fetchone() is not None
+            self._date_style = (db_version, bool(row and "-" in str(row[0])), compact)
+        _, iso, compact = self._date_style
+
+        def parse(value: str) -> date:
+            for fmt in ("%Y-%m-%d", "%Y%m%d"):
+                try:
+                    return datetime.strptime(value.strip(), fmt).date()
+                except ValueError:
+                    continue
+            raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+        def render(value: date) -> str:
+            return value.isoformat() if iso else value.strftime("%Y%m%d")
+
+        if journal and compact:
+            lower = int(parse(from_date).strftime("%Y%m%d")) if from_date else 0
+            upper = int((parse(to_date) + timedelta(days=1)).strftime("%Y%m%d")) if to_date else 99999999
+            return lower, upper
+
+        lower = render(parse(from_date)) if from_date else ""
+        upper = render(parse(to_date) + timedelta(days=1)) if to_date else "~"
+        return lower, upper
+
+    async def _run_prepared(
+        self: "FinancialData",
+        conn: aiosqlite.Connection,
+        db_version: str,
+        sql: str,
+        params: tuple,
+        extra: Optional[dict] = None,
+    ) -> str:
+        cache_key = QueryCache.make_key(f"{sql}{json.dumps(params)}", db_version)
+        cached = await self.query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async with conn.execute(sql, params) as cursor:
+            rows = await self._fetch_capped(cursor, self.max_result_rows)
+            columns = ResultSerializer.columns_from_description(cursor.description)
+        if rows:
+            result = await self.serializer.serialize_async(columns, rows, extra)
+        else:
+            result = json.dumps("The query returned no results.")
+        await self.query_cache.set(cache_key, result)
+        return result
+
+    async def get_book_details(self: "FinancialData", book_id: str) -> str:
+        """Get a book's name, source system and latest balance.
+
+        :param book_id: The SAP book ID, e.g. B0001.
+        """
+        print(f"\n{tc.BLUE}Function Call: get_book_details({book_id}){tc.RESET}\n")
+        try:
+            async with self._connection() as conn, self._deadline(conn):
+                db_version = await self.get_db_version(conn)
+                sql = BOOK_DETAILS_ROLLUP_SQL if await self._has_table(conn, "latest_balances") else BOOK_DETAILS_SQL
+                return await self._run_prepared(conn, db_version, sql, (book_id.strip().upper(),))
+        except QueryTimeoutError as e:
+            return self._timeout_result(e, book_id=book_id)
+        except Exception as e:
+            return json.dumps({"get_book_details failed": str(e), "book_id": book_id})
+
+    async def get_journal_entries(
+        self: "FinancialData", book_id: str, from_date: str = "", to_date: str = "", page: int = 1
+    ) -> str:
+        """Get a book's journal entries, newest first, one page at a time.
+
+        :param book_id: The SAP book ID, e.g. B0058.
+        :param from_date: Optional first entry date to include, YYYY-MM-DD.
+        :param to_date: Optional last entry date to include, YYYY-MM-DD.
+        :param page: Page number starting at 1; each page holds 30 entries.
+        """
+        print(f"\n{tc.BLUE}Function Call: get_journal_entries({book_id}, {from_date}, {to_date}, {page}){tc.RESET}\n")
+        try:
+            async with self._connection() as conn, self._deadline(conn):
+                db_version = await self.get_db_version(conn)
+                lower, upper = await self._date_bounds(conn, db_version, from_date, to_date, journal=True)
+                offset = (max(int(page), 1) - 1) * JOURNAL_PAGE_SIZE
+                params = (book_id.strip().upper(), lower, upper, JOURNAL_PAGE_SIZE, offset)
+                extra = {"page": max(int(page), 1), "page_size": JOURNAL_PAGE_SIZE}
+                sql = self._route(conn, JOURNAL_ENTRIES_SQL, lower, upper)
+                return await self._run_prepared(conn, db_version, sql, params, extra)
+        except QueryTimeoutError as e:
+            return self._timeout_result(e, book_id=book_id)
+        except Exception as e:
+            return json.dumps({"get_journal_entries failed": str(e), "book_id": book_id})
+
+    async def get_balances(self: "FinancialData", book_id: str, from_date: str = "", to_date: str = "") -> str:
+        """Get a book's daily balances, newest first.
+
+        :param book_id: The SAP book ID, e.g. B0058.
+        :param from_date: Optional first date to include, YYYY-MM-DD.
+        :param to_date: Optional last date to include, YYYY-MM-DD.
+        """
+        print(f"\n{tc.BLUE}Function Call: get_balances({book_id}, {from_date}, {to_date}){tc.RESET}\n")
+        try:
+            async with self._connection() as conn, self._deadline(conn):
+                db_version = await self.get_db_version(conn)
+                lower, upper = await self._date_bounds(conn, db_version, from_date, to_date)
+                params = (book_id.strip().upper(), lower, upper, self.max_result_rows)
+                return await self._run_prepared(conn, db_version, BALANCES_SQL, params)
+        except QueryTimeoutError as e:
+            return self._timeout_result(e, book_id=book_id)
+        except Exception as e:
+            return json.dumps({"get_balances failed": str(e), "book_id": book_id})
+
+    async def get_latest_balance_summary(self: "FinancialData", top_n: int = 10) -> str:
+        """Get the balance summary across all books for the latest date, with the top books by balance.
+
+        :param top_n: How many books to list, ordered by balance (default 10).
+        """
+        print(f"\n{tc.BLUE}Function Call: get_latest_balance_summary({top_n}){tc.RESET}\n")
+        try:
+            async with self._connection() as conn, self._deadline(conn):
+                db_version = await self.get_db_version(conn)
+                async with conn.execute(LATEST_DATE_SQL) as cursor:
+                    (latest_date,) = await cursor.fetchone()
+                if latest_date is None:
+                    return json.dumps("The query returned no results.")
+
+                has_rollup = await self._has_table(conn, "daily_balance_summary")
+                summary_sql = LATEST_SUMMARY_ROLLUP_SQL if has_rollup else LATEST_SUMMARY_SQL
+                async with conn.execute(summary_sql, (latest_date,)) as cursor:
+                    summary_row = await cursor.fetchone()
+                    summary_columns = ResultSerializer.columns_from_description(cursor.description)
+
+                summary = dict(zip(summary_columns, summary_row, strict=True)) if summary_row else {}
+                extra = {"latest_date": latest_date, "summary": summary}
+                params = (latest_date, min(max(int(top_n), 1), self.max_result_rows))
+                return await self._run_prepared(conn, db_version, TOP_BALANCES_SQL, params, extra)
+        except QueryTimeoutError as e:
+            return self._timeout_result(e)
+        except Exception as e:
+            return json.dumps({"get_latest_balance_summary failed": str(e)})
+
+    async def async_fetch_data_using_sqlite_query(
+        self: "FinancialData", sqlite_query: str, continuation_token: str = ""
+    ) -> str:
+        """Run a read-only SQLite query against the financial database and return the rows as JSON.
+
+        :param sqlite_query: A single SQLite SELECT statement.
+        :param continuation_token: The continuation_token of a truncated result, to fetch its next page.
+        """
         print(f"\n{tc.BLUE}Function Call: async_fetch_data_using_sqlite_query{tc.RESET}")
         print(f"{tc.BLUE}Executing query: {sqlite_query}{tc.RESET}\n")
 
         try:
-            async with self.conn.execute(sqlite_query) as cursor:
-                rows = await cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
+            async with self._connection() as conn, self._deadline(conn):
+                db_version = await self.get_db_version(conn)
+                cache_key = QueryCache.make_key(sqlite_query, f"{db_version}|{continuation_token}")
+                cached = await self.query_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+                decision = await self.query_guard.check(conn, sqlite_query)
+                if decision.action == GuardAction.REJECT:
+                    print(f"{tc.YELLOW}Query rejected: {', '.join(decision.findings)}{tc.RESET}\n")
+                    result = json.dumps({"Query rejected by cost guard": decision.to_dict(), "query": sqlite_query})
+                elif decision.action == GuardAction.REWRITE and is_pageable(sqlite_query):
+                    print(f"{tc.YELLOW}Query limited to {self.query_guard.max_limit} rows{tc.RESET}\n")
+                    # Paged like any other query, so keyset paging stays possible; the guard's LIMIT
+                    # applies to the rows of all pages together
+                    max_rows = self.query_guard.max_limit
+                    extra = {"query_guard": decision.to_dict(executed_sql=sqlite_query, row_limit=max_rows)}
+                    sql = self._route(conn, sqlite_query)
+                    result = await self._fetch_page(conn, sql, continuation_token, db_version, extra, max_rows=max_rows)
+                elif decision.action == GuardAction.REWRITE:
+                    print(f"{tc.YELLOW}Query rewritten: {decision.sql}{tc.RESET}\n")
+                    extra = {"query_guard": decision.to_dict()}
+                    result = await self._fetch_page(
+                        conn, self._route(conn, decision.sql), continuation_token, db_version, extra
+                    )
+                else:
+                    sql = self._route(conn, sqlite_query)
+                    result = await self._fetch_page(conn, sql, continuation_token, db_version)
 
-            if not rows:
-                return json.dumps("The query returned no results.")
-            df = pd.DataFrame(rows, columns=columns)
-            return df.to_json(index=False, orient="split")
+            await self.query_cache.set(cache_key, result)
+            return result
 
+        except QueryTimeoutError as e:
+            print(f"{tc.YELLOW}Query timed out after {self.query_timeout:g}s{tc.RESET}\n")
+            return self._timeout_result(e, query=sqlite_query)
         except Exception as e:
             return json.dumps({"SQLite query failed": str(e), "query": sqlite_query})
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from azure.ai.projects.aio import AIProjectClient
+from azure.ai.projects.models import Agent, AsyncToolSet, VectorStore, VectorStoreStatus
+from azure.core.exceptions import ResourceNotFoundError
+
+from resource_janitor import SHARED_OWNER, ResourceJanitor
+from utilities import Utilities, hash_file, load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FORMAT = 1
+
+
+def _hash_json(value: object) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class AgentRegistry:
+    """Remembers the agent and vector store created for a configuration and reuses them while it is unchanged.
+
+    Entries live in a small JSON file, one per agent or vector store name, with a hash of
+    everything that went into creating the object: the file contents for a vector store; the
+    model, instructions (including the database schema), temperature, tool definitions and
+    tool resources for an agent. A chat then only needs a new thread. The stored ID is checked
+    against the service once per process, and the object is created again when the hash
+    changed or the service no longer has it. Replaced objects are not deleted here, as chats
+    started before the change may still be using them; with a janitor, everything created is
+    tracked as shared and a sweep deletes it some time after ids() stops listing it.
+    """
+
+    def __init__(
+        self,
+        project_client: AIProjectClient,
+        utilities: Utilities,
+        path: Path,
+        janitor: Optional[ResourceJanitor] = None,
+    ) -> None:
+        self.project_client = project_client
+        self.utilities = utilities
+        self.path = path
+        self.janitor = janitor
+        # (kind, name) -> (hash, object) already confirmed to exist, so later chats skip the round trip
+        self._known: dict[tuple[str, str], tuple[str, Agent | VectorStore]] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_vector_store(self, files: list[str], vector_store_name: str) -> VectorStore:
+        """Return the vector store holding exactly these shared files, uploading them only when they changed."""
+        prefix = self.utilities.shared_files_path
+        hashes = await asyncio.gather(*(asyncio.to_thread(hash_file, prefix / file) for file in files))
+        key = _hash_json({"name": vector_store_name, "files": dict(zip(files, hashes, strict=True))})
+
+        async with self._lock:
+            vector_store = await self._lookup("vector_stores", vector_store_name, key)
+            if vector_store is None:
+                vector_store = await self.utilities.create_vector_store(self.project_client, files, vector_store_name)
+                vector_store_files = await self.project_client.agents.list_vector_store_files(vector_store.id)
+                file_ids = [file.id for file in vector_store_files.data]
+                self._register("vector_stores", vector_store_name, key, vector_store, file_ids=file_ids)
+                await self._track("vector_store", vector_store.id, file_ids)
+            return vector_store
+
+    async def get_agent(
+        self, name: str, model: str, instructions: str, toolset: AsyncToolSet, temperature: Optional[float] = None
+    ) -> Agent:
+        """Return an agent created with exactly these settings, creating one only when none exists yet."""
+        key = _hash_json(
+            {
+                "model": model,
+                "instructions": instructions,
+                "temperature": temperature,
+                # Function tools come from a set, so their order is not stable between processes
+                "tools": sorted(json.dumps(tool.as_dict(), sort_keys=True) for tool in toolset.definitions),
+                "tool_resources": toolset.resources.as_dict(),
+            }
+        )
+
+        async with self._lock:
+            agent = await self._lookup("agents", name, key)
+            if agent is None:
+                agent = await self.project_client.agents.create_agent(
+                    name=name, model=model, instructions=instructions, toolset=toolset, temperature=temperature
+                )
+                self._register("agents", name, key, agent)
+                await self._track("agent", agent.id)
+            return agent
+
+    def ids(self) -> set[str]:
+        """IDs of every registered agent, vector store and vector store file, in any process."""
+        registry = self._load()
+        ids = set()
+        for kind in ("agents", "vector_stores"):
+            for entry in registry[kind].values():
+                ids.add(entry["id"])
+                ids.update(entry.get("file_ids", []))
+        return ids
+
+    async def _lookup(self, kind: str, name: str, key: str) -> Optional[Agent | VectorStore]:
+        known = self._known.get((kind, name))
+        if known is not None and known[0] == key:
+            return known[1]
+
+        entry = self._load()[kind].get(name)
+        if entry is None:
+            return None
+        if entry["hash"] != key:
+            logger.info("Configuration of %s %r changed; replacing %s", kind, name, entry["id"])
+            return None
+        try:
+            if kind == "agents":
+                found = await self.project_client.agents.get_agent(entry["id"])
+            else:
+                found = await self.project_client.agents.get_vector_store(entry["id"])
+        except ResourceNotFoundError:
+            logger.info("Registered %s %s no longer exists", kind, entry["id"])
+            return None
+        if kind == "vector_stores" and found.status == VectorStoreStatus.EXPIRED:
+            logger.info("Registered vector store %s has expired", entry["id"])
+            return None
+        self._known[(kind, name)] = (key, found)
+        return found
+
+    def _register(self, kind: str, name: str, key: str, created: Agent | VectorStore, **extra: object) -> None:
+        registry = self._load()
+        registry[kind][name] = {
+            "id": created.id,
+            "hash": key,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **extra,
+        }
+        self._known[(kind, name)] = (key, created)
+        self._save(registry)
+
+    async def _track(self, kind: str, object_id: str, file_ids: Optional[list[str]] = None) -> None:
+        if self.janitor is None:
+            return
+        await self.janitor.track(kind, object_id, SHARED_OWNER)
+        for file_id in file_ids or []:
+            await self.janitor.track("file", file_id, SHARED_OWNER)
+
+    def _load(self) -> dict:
+        registry = load_json(self.path, "agent registry")
+        if registry is None or registry.get("format") != REGISTRY_FORMAT:
+            return {"format": REGISTRY_FORMAT, "agents": {}, "vector_stores": {}}
+        return registry
+
+    def _save(self, registry: dict) -> None:
+        save_json(self.path, registry, "agent registry")
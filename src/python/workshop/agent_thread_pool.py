@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+from typing import Optional
+
+from azure.ai.projects.aio import AIProjectClient
+from azure.ai.projects.models import AgentThread
+
+from resource_janitor import ResourceJanitor
+
+logger = logging.getLogger(__name__)
+
+
+class AgentThreadPool:
+    """Agent threads created ahead of time, so a new chat gets one without a round trip.
+
+    A background task keeps up to `size` unused threads ready and tops the pool up after
+    each hand-out. Threads that sat unused for longer than `ttl` seconds are deleted instead
+    of handed out, and close() deletes all unused threads; threads handed out belong to
+    their chat from then on. With a janitor, pooled threads are tracked under the "thread_pool"
+    owner and deleted through it.
+    """
+
+    OWNER = "thread_pool"
+
+    def __init__(
+        self,
+        project_client: AIProjectClient,
+        size: int = 4,
+        ttl: float = 1800.0,
+        janitor: Optional[ResourceJanitor] = None,
+    ) -> None:
+        if size < 0:
+            raise ValueError(f"Invalid thread pool size: {size}")
+        self.project_client = project_client
+        self.size = size
+        self.ttl = ttl
+        self.janitor = janitor
+
+        # Unused threads paired with the monotonic time they were created
+        self._ready: deque[tuple[AgentThread, float]] = deque()
+        self._creating = 0
+        self._wakeup = asyncio.Event()
+        self._refill_task: Optional[asyncio.Task] = None
+        # Deletions of expired threads run in the background; referenced here until they finish
+        self._deletions: set[asyncio.Task] = set()
+        self._closed = False
+
+        self._stats = {
+            "acquired": 0,
+            "hits": 0,
+            "misses": 0,
+            "created": 0,
+            "expired": 0,
+            "deleted": 0,
+            "create_failures": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    def start(self) -> None:
+        """Start the background refill; the pool fills up without delaying the caller."""
+        self._closed = False
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill_loop())
+        self._wakeup.set()
+
+    async def acquire(self) -> AgentThread:
+        """Hand out a ready thread, or create one on the spot when the pool is empty."""
+        start = time.monotonic()
+        thread = self._take_ready()
+        if thread is not None:
+            self._stats["hits"] += 1
+        else:
+            self._stats["misses"] += 1
+            thread = await self._create_thread()
+        if not self._closed:
+            self._wakeup.set()
+
+        waited = time.monotonic() - start
+        self._stats["acquired"] += 1
+        self._stats["wait_time_total"] += waited
+        self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+        return thread
+
+    async def close(self) -> None:
+        """Stop refilling and delete the threads nobody took."""
+        self._closed = True
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+            self._refill_task = None
+        await asyncio.gather(*self._deletions, return_exceptions=True)
+        unused = [thread for thread, _ in self._ready]
+        self._ready.clear()
+        await self._delete(unused)
+
+    def _take_ready(self) -> Optional[AgentThread]:
+        expired = []
+        thread = None
+        while self._ready:
+            candidate, created_at = self._ready.popleft()
+            if time.monotonic() - created_at > self.ttl:
+                expired.append(candidate)
+                continue
+            thread = candidate
+            break
+        self._delete_later(expired)
+        return thread
+
+    async def _refill_loop(self) -> None:
+        while True:
+            # Woken by hand-outs, and at least once per ttl to replace threads that went stale
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.ttl)
+            self._wakeup.clear()
+            self._reap_expired()
+            missing = self.size - len(self._ready) - self._creating
+            if missing <= 0:
+                continue
+            self._creating += missing
+            try:
+                results = await asyncio.gather(*(self._create_thread() for _ in range(missing)), return_exceptions=True)
+            finally:
+                self._creating -= missing
+            failed = 0
+            for result in results:
+                if isinstance(result, BaseException):
+                    failed += 1
+                    self._stats["create_failures"] += 1
+                    logger.warning("Could not pre-create an agent thread: %s", result)
+                else:
+                    self._ready.append((result, time.monotonic()))
+            if failed:
+                # Back off instead of hammering a failing service; acquire() still works meanwhile
+                await asyncio.sleep(min(self.ttl, 30.0))
+                self._wakeup.set()
+
+    def _reap_expired(self) -> None:
+        now = time.monotonic()
+        expired = [thread for thread, created_at in self._ready if now - created_at > self.ttl]
+        if expired:
+            self._ready = deque(item for item in self._ready if now - item[1] <= self.ttl)
+            self._delete_later(expired)
+
+    def _delete_later(self, threads: list[AgentThread]) -> None:
+        if not threads:
+            return
+        self._stats["expired"] += len(threads)
+        task = asyncio.create_task(self._delete(threads))
+        self._deletions.add(task)
+        task.add_done_callback(self._deletions.discard)
+
+    async def _create_thread(self) -> AgentThread:
+        thread = await self.project_client.agents.create_thread()
+        self._stats["created"] += 1
+        if self.janitor is not None:
+            await self.janitor.track("thread", thread.id, self.OWNER)
+        return thread
+
+    async def _delete(self, threads: list[AgentThread]) -> None:
+        if self.janitor is not None:
+            report = await self.janitor.delete([("thread", thread.id) for thread in threads])
+            self._stats["deleted"] += report["deleted"]["thread"] + report["already_gone"]
+            return
+        results = await asyncio.gather(
+            *(self.project_client.agents.delete_thread(thread.id) for thread in threads), return_exceptions=True
+        )
+        for thread, result in zip(threads, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning("Could not delete unused agent thread %s: %s", thread.id, result)
+            else:
+                self._stats["deleted"] += 1
+
+    def metrics(self) -> dict:
+        """Return a snapshot of the pool counters."""
+        acquired = self._stats["acquired"]
+        return {
+            **self._stats,
+            "ready": len(self._ready),
+            "size": self.size,
+            "wait_time_avg": self._stats["wait_time_total"] / acquired if acquired else 0.0,
+        }
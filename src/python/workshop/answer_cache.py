@@ -0,0 +1,83 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+from query_cache import QueryCache
+
+# Starting a message with one of these skips the cached answer and refreshes it
+NO_CACHE_PREFIXES = ("/fresh", "/nocache")
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = " ?!.,;:"
+
+
+def normalize_question(question: str) -> str:
+    return _WHITESPACE_PATTERN.sub(" ", question).strip().strip(_TRAILING_PUNCTUATION).lower()
+
+
+def parse_opt_out(content: str) -> tuple[str, bool]:
+    """Strip an opt-out prefix; returns the question and whether the cache may be used."""
+    stripped = content.lstrip()
+    for prefix in NO_CACHE_PREFIXES:
+        if stripped.lower().startswith(prefix):
+            return stripped[len(prefix) :].strip(), False
+    return content, True
+
+
+class CachedAnswer:
+    """The markdown of a whole chat turn and the chart files it produced."""
+
+    def __init__(self, markdown: str, files: Optional[list[Path]] = None) -> None:
+        self.markdown = markdown
+        self.files = files or []
+
+    def to_json(self) -> str:
+        return json.dumps({"markdown": self.markdown, "files": [str(path) for path in self.files]})
+
+    @classmethod
+    def from_json(cls, value: str) -> "CachedAnswer":
+        data = json.loads(value)
+        return cls(data["markdown"], [Path(path) for path in data["files"]])
+
+
+class AnswerCache:
+    """Cache of complete agent answers keyed on the question, the chat so far, the instructions and the data version.
+
+    The chat so far is a hash chained over its earlier questions and answers (see
+    extend_history), so a follow-up such as "and for 2023?" is only answered from the cache
+    within the same conversation. Storage, TTL, size eviction and hit/miss counters come
+    from QueryCache.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024, ttl: float = 3600.0) -> None:
+        self._store = QueryCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+
+    @staticmethod
+    def make_key(question: str, instructions: str, db_version: str, history: str = "") -> str:
+        instructions_hash = hashlib.sha256(instructions.encode("utf-8")).hexdigest()
+        key = f"{normalize_question(question)}\n{history}\n{instructions_hash}\n{db_version}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def extend_history(history: str, question: str, answer: str) -> str:
+        """Hash of the chat after one more turn; the empty string stands for a new chat."""
+        turn = json.dumps([history, normalize_question(question), answer])
+        return hashlib.sha256(turn.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[CachedAnswer]:
+        value = await self._store.get(key)
+        if value is None:
+            return None
+        answer = CachedAnswer.from_json(value)
+        # A chart that was cleaned up from disk cannot be replayed; regenerate the answer instead
+        if not all(path.exists() for path in answer.files):
+            return None
+        return answer
+
+    async def set(self, key: str, answer: CachedAnswer) -> None:
+        await self._store.set(key, answer.to_json())
+
+    def stats(self) -> dict:
+        return self._store.stats()
@@ -1,10 +1,21 @@
 import os
+import asyncio
 import logging
+from typing import Optional
 import chainlit as cl
+from chainlit.config import config as chainlit_config
+from chainlit.session import WebsocketSession
 from dotenv import load_dotenv
 from azure.identity.aio import DefaultAzureCredential
 from azure.ai.projects.aio import AIProjectClient
+from pathlib import Path
+from agent_registry import AgentRegistry
+from agent_thread_pool import AgentThreadPool
+from answer_cache import AnswerCache, CachedAnswer, parse_opt_out
 from FinancialData import FinancialData
+from intent_router import IntentRouter
+from query_cache import QueryCache
+from resource_janitor import ResourceJanitor, format_reclaim_report
 from stream_event_handler2 import StreamEventHandler2
 from terminal_colors import TerminalColors as tc
 from utilities import Utilities
@@ -31,6 +42,20 @@ MAX_PROMPT_TOKENS = 20480
 TEMPERATURE = 0.1
 TOP_P = 0.1
 INSTRUCTIONS_FILE = "instructions/code_interpreter.txt"
+# Optional SQLite file shared by several server processes for query result cache hits
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH")
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "256"))
+# Agent and vector store IDs reused across chats and restarts while their configuration is unchanged
+AGENT_REGISTRY_PATH = Path(os.getenv("AGENT_REGISTRY_PATH", Path(__file__).with_name("app.agents.json")))
+# Agent threads created ahead of time for new chats, and how long an unused one is kept
+AGENT_THREAD_POOL_SIZE = int(os.getenv("AGENT_THREAD_POOL_SIZE", "4"))
+AGENT_THREAD_TTL = float(os.getenv("AGENT_THREAD_TTL", "1800"))
+# Ledger of the remote objects the app created, shared by server processes to find those of crashed ones
+RESOURCE_LEDGER_PATH = Path(os.getenv("RESOURCE_LEDGER_PATH", Path(__file__).with_name("app.resources.db")))
+JANITOR_SWEEP_INTERVAL = float(os.getenv("JANITOR_SWEEP_INTERVAL", "900"))
+# Replaced agents and vector stores are deleted this long after the registry stopped listing them
+JANITOR_MIN_AGE = float(os.getenv("JANITOR_MIN_AGE", "3600"))
 
 project_client = AIProjectClient.from_connection_string(
     conn_str=PROJECT_CONNECTION_STRING,
@@ -38,54 +63,108 @@ project_client = AIProjectClient.from_connection_string(
 )
 
 utilities = Utilities()
-FinancialData = FinancialData(utilities)
+FinancialData = FinancialData(utilities, query_cache=QueryCache(disk_path=QUERY_CACHE_PATH))
+intent_router = IntentRouter(FinancialData)
+answer_cache = AnswerCache(max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl=ANSWER_CACHE_TTL)
+janitor = ResourceJanitor(project_client, RESOURCE_LEDGER_PATH)
+agent_registry = AgentRegistry(project_client, utilities, AGENT_REGISTRY_PATH, janitor=janitor)
+# Shared objects the registry no longer lists are orphans
+janitor.keep = agent_registry.ids
+thread_pool = AgentThreadPool(project_client, size=AGENT_THREAD_POOL_SIZE, ttl=AGENT_THREAD_TTL, janitor=janitor)
 
+functions = AsyncFunctionTool(
+    {
+        FinancialData.async_fetch_data_using_sqlite_query,
+        FinancialData.get_book_details,
+        FinancialData.get_journal_entries,
+        FinancialData.get_balances,
+        FinancialData.get_latest_balance_summary,
+    }
+)
+# Built once per process by the first setup_agent() call
+toolset: Optional[AsyncToolSet] = None
+startup_lock = asyncio.Lock()
+# Session ID -> task deleting the chat's thread once its disconnected session has expired
+pending_reclaims: dict[str, asyncio.Task] = {}
 
-async def setup_agent_and_thread() -> tuple[Agent, AgentThread]:
-    try:
-        toolset = AsyncToolSet()
 
-        await FinancialData.connect()
-        db_schema = await FinancialData.get_database_info()
+async def load_instructions() -> str:
+    # Opens the shared connection pool on first use; the schema is cached per database version
+    await FinancialData.connect()
+    db_schema = await FinancialData.get_database_info()
 
-        instructions = utilities.load_instructions(INSTRUCTIONS_FILE)
-        instructions = instructions.replace("{database_schema_string}", db_schema)
+    instructions = utilities.load_instructions(INSTRUCTIONS_FILE)
+    return instructions.replace("{database_schema_string}", db_schema)
 
-        functions = AsyncFunctionTool({FinancialData.async_fetch_data_using_sqlite_query})
-        toolset.add(functions)
 
-        # Save functions in user session
-        cl.user_session.set("functions", functions)
+async def load_toolset() -> AsyncToolSet:
+    tools = AsyncToolSet()
+    tools.add(functions)
 
-        # Add vector store
-        vs = await utilities.create_vector_store(
-            project_client, [DATA_SHEET_FILE], "Contoso Vector"
-        )
-        toolset.add(FileSearchTool(vector_store_ids=[vs.id]))
+    # Add vector store; uploaded once and reused until the handbook changes
+    vs = await agent_registry.get_vector_store([DATA_SHEET_FILE], "Contoso Vector")
+    tools.add(FileSearchTool(vector_store_ids=[vs.id]))
 
-        # Add code interpreter
-        toolset.add(CodeInterpreterTool())
+    # Add code interpreter
+    tools.add(CodeInterpreterTool())
+    return tools
 
-        agent = await project_client.agents.create_agent(
-            name=AGENT_NAME,
-            model=API_DEPLOYMENT_NAME,
-            instructions=instructions,
-            toolset=toolset,
-            temperature=TEMPERATURE,
-        )
 
-        project_client.agents.enable_auto_function_calls(toolset=toolset)
-        thread = await project_client.agents.create_thread()
+async def setup_agent() -> Agent:
+    """Return the agent for the current database schema, doing the process-wide setup on the first call."""
+    global toolset
+    if toolset is None:
+        async with startup_lock:
+            if toolset is None:
+                thread_pool.start()
+                janitor.start(JANITOR_SWEEP_INTERVAL, JANITOR_MIN_AGE)
+                # The database and the handbook upload do not depend on each other
+                instructions, tools = await asyncio.gather(load_instructions(), load_toolset())
+                project_client.agents.enable_auto_function_calls(toolset=tools)
+                toolset = tools
+                return await get_agent(instructions)
+    return await get_agent(await load_instructions())
+
+
+async def get_agent(instructions: str) -> Agent:
+    # Shared by all chats; a new agent is created only when the instructions, schema or tools change
+    return await agent_registry.get_agent(
+        name=AGENT_NAME,
+        model=API_DEPLOYMENT_NAME,
+        instructions=instructions,
+        toolset=toolset,
+        temperature=TEMPERATURE,
+    )
+
+
+async def setup_agent_and_thread() -> tuple[Agent, AgentThread]:
+    try:
+        agent = await setup_agent()
+        thread = await thread_pool.acquire()
+        # The thread now belongs to this chat and is deleted when it ends
+        await janitor.track("thread", thread.id, cl.context.session.id)
+
+        # Save functions in user session
+        cl.user_session.set("functions", functions)
 
         return agent, thread
 
     except Exception as e:
         logging.exception(f"⚠️ Error in setup_agent_and_thread: {e}")
         return None, None
-    
+
+
+@cl.on_app_startup
+async def on_app_startup() -> None:
+    # Chats opened later find the agent ready and a thread waiting; on failure the first chat retries
+    try:
+        await setup_agent()
+    except Exception as e:
+        logging.exception(f"⚠️ Error in on_app_startup: {e}")
+
 
 @cl.on_chat_start
-async def on_chat_start():
+async def on_chat_start() -> None:
     agent, thread = await setup_agent_and_thread()
     if not agent or not thread:
         await cl.Message("🚫 Agent initialization failed. Check logs for details.").send()
@@ -96,28 +175,104 @@ async def on_chat_start():
     await cl.Message(f"👋 Welcome! Agent `{agent.name}` is ready.").send()
 
 
+@cl.on_chat_end
+async def on_chat_end() -> None:
+    # A closed tab does not stop the turn in flight; cancelling it interrupts its SQL statement
+    # (see FinancialData._deadline) so the pooled connection is free for other sessions.
+    # The stop button already cancels the same task.
+    session = cl.context.session
+    task = session.current_task
+    if task and not task.done():
+        task.cancel()
+    # A dropped connection also ends the chat, but Chainlit restores the session, thread included,
+    # when the client reconnects within the session timeout; only a cleared session is gone for good
+    if session.to_clear:
+        await janitor.reclaim(session.id)
+        return
+    pending = pending_reclaims.pop(session.id, None)
+    if pending:
+        pending.cancel()
+    pending_reclaims[session.id] = asyncio.create_task(reclaim_when_expired(session.id))
+
+
+async def reclaim_when_expired(session_id: str) -> None:
+    try:
+        # Chainlit drops a disconnected session once session_timeout passed without a reconnect
+        await asyncio.sleep(chainlit_config.project.session_timeout + 5)
+        if WebsocketSession.get_by_id(session_id) is None:
+            await janitor.reclaim(session_id)
+    finally:
+        if pending_reclaims.get(session_id) is asyncio.current_task():
+            del pending_reclaims[session_id]
+
+
+@cl.on_app_shutdown
+async def on_app_shutdown() -> None:
+    logging.info(f"Database pool metrics: {FinancialData.pool_metrics()}")
+    logging.info(f"Query cache stats: {FinancialData.cache_stats()}")
+    logging.info(f"Answer cache stats: {answer_cache.stats()}")
+    await thread_pool.close()
+    logging.info(f"Agent thread pool metrics: {thread_pool.metrics()}")
+    for pending in pending_reclaims.values():
+        pending.cancel()
+    # Threads of chats still open; the shared agent and vector store stay for the next start
+    logging.info(format_reclaim_report(await janitor.close(), "Reclaimed at shutdown"))
+    logging.info(f"Resource janitor stats: {janitor.stats()}")
+    await FinancialData.close()
+
+
+async def record_turn(thread_id: str, question: str, answer: str) -> None:
+    """Add a turn answered without an agent run to the thread, so later questions can follow up on it."""
+    await project_client.agents.create_message(thread_id=thread_id, role="user", content=question)
+    await project_client.agents.create_message(thread_id=thread_id, role="assistant", content=answer)
+
+
 @cl.on_message
-async def on_message(message: cl.Message):
+async def on_message(message: cl.Message) -> None:
     agent: Agent = cl.user_session.get("agent")
     thread: AgentThread = cl.user_session.get("thread")
     functions = cl.user_session.get("functions")  # get functions from session
 
+    # "/fresh <question>" skips the answer cache for this message
+    content, use_cache = parse_opt_out(message.content)
+    # Earlier turns of this chat; what a follow-up such as "and for 2023?" means depends on them
+    history = cl.user_session.get("history", "")
+
+    # Known question shapes are answered locally, without an agent run
+    local_answer = await intent_router.answer(content)
+    if local_answer:
+        await cl.Message(local_answer).send()
+        await record_turn(thread.id, content, local_answer)
+        cl.user_session.set("history", AnswerCache.extend_history(history, content, local_answer))
+        return
+
+    cache_key = AnswerCache.make_key(content, agent.instructions, FinancialData.file_version(), history)
+    if use_cache:
+        cached_answer = await answer_cache.get(cache_key)
+        if cached_answer:
+            await StreamEventHandler2.replay(cached_answer)
+            await record_turn(thread.id, content, cached_answer.markdown)
+            cl.user_session.set("history", AnswerCache.extend_history(history, content, cached_answer.markdown))
+            return
+
     # Create user message in backend
     await project_client.agents.create_message(
         thread_id=thread.id,
         role="user",
-        content=message.content,
+        content=content,
+    )
+
+    event_handler = StreamEventHandler2(
+        functions=functions,
+        project_client=project_client,
+        utilities=utilities
     )
 
     # Create the stream of the agent response
     stream = await project_client.agents.create_stream(
         thread_id=thread.id,
         agent_id=agent.id,
-        event_handler=StreamEventHandler2(
-            functions=functions,
-            project_client=project_client,
-            utilities=utilities
-        ),
+        event_handler=event_handler,
         max_completion_tokens=MAX_COMPLETION_TOKENS,
         max_prompt_tokens=MAX_PROMPT_TOKENS,
         temperature=TEMPERATURE,
@@ -132,3 +287,7 @@ async def on_message(message: cl.Message):
             if hasattr(event, "content"):
                 full_response += event.content
                 await cl.Message(event.content).send()
+
+    cl.user_session.set("history", AnswerCache.extend_history(history, content, event_handler.response_text))
+    if event_handler.response_text and not event_handler.failed:
+        await answer_cache.set(cache_key, CachedAnswer(event_handler.response_text, event_handler.files))
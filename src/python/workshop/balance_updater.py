@@ -0,0 +1,173 @@
+import argparse
+import csv
+import gzip
+import sqlite3
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence, TextIO
+
+from compact_schema import FACT_TABLE, is_compact, load_journal_entries
+from rollups import refresh_rollups
+from snapshot_manager import SnapshotManager
+
+# Recorded as LAST_UPDATED_BY on the balance rows an incremental load touches
+BALANCE_UPDATER = "balance_updater"
+CSV_BATCH_ROWS = 50_000
+
+DELTA_TABLE = "temp.journal_delta"
+BALANCE_DELTA_TABLE = "temp.balance_delta"
+
+JOURNAL_COLUMNS = (
+    "DOCUMENT_NUMBER", "SAP_BOOK_ID", "SAP_BOOK_NAME", "COST_CENTER", "TRANSACTION_CURRENCY", "VALUE",
+    "ENTRY_DATE", "POSTING_DATE", "USERNAME", "TRANSACTION_TYPE", "POSTED_BY", "APPROVED_BY",
+    "CREATED_TIMESTAMP", "UPDATED_TIMESTAMP", "SOURCE_SYSTEM", "REMARKS",
+)
+# The new journal rows, in the original journal_entries columns; a document sent twice counts once
+DELTA_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS journal_delta (
+    DOCUMENT_NUMBER TEXT PRIMARY KEY, SAP_BOOK_ID TEXT, SAP_BOOK_NAME TEXT, COST_CENTER TEXT,
+    TRANSACTION_CURRENCY TEXT, VALUE REAL, ENTRY_DATE TEXT, POSTING_DATE TEXT, USERNAME TEXT,
+    TRANSACTION_TYPE TEXT, POSTED_BY TEXT, APPROVED_BY TEXT, CREATED_TIMESTAMP TEXT, UPDATED_TIMESTAMP TEXT,
+    SOURCE_SYSTEM TEXT, REMARKS TEXT
+)
+"""
+# Per (book, date) count and exact sum of the delta; also the keys refresh_rollups recomputes
+BALANCE_DELTA_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS balance_delta (
+    SAP_BOOK_ID TEXT,
+    DATE TEXT,
+    TOTAL_JOURNALS INTEGER,
+    VALUE_CENTS INTEGER,
+    PRIMARY KEY (SAP_BOOK_ID, DATE)
+)
+"""
+
+_UPSERT_BALANCES = f"""
+INSERT INTO balance_records (SAP_BOOK_ID, DATE, TOTAL_JOURNALS, LAST_UPDATED_BY, BALANCE, DAILY_CHANGE)
+SELECT SAP_BOOK_ID, DATE, TOTAL_JOURNALS, ?, VALUE_CENTS / 100.0, ROUND(VALUE_CENTS / 100.0 / TOTAL_JOURNALS, 2)
+FROM {BALANCE_DELTA_TABLE}
+WHERE true
+ON CONFLICT (SAP_BOOK_ID, DATE) DO UPDATE SET
+    TOTAL_JOURNALS = TOTAL_JOURNALS + excluded.TOTAL_JOURNALS,
+    LAST_UPDATED_BY = excluded.LAST_UPDATED_BY,
+    BALANCE = ROUND(BALANCE + excluded.BALANCE, 2),
+    DAILY_CHANGE = ROUND((BALANCE + excluded.BALANCE) / (TOTAL_JOURNALS + excluded.TOTAL_JOURNALS), 2)
+"""
+
+
+def stage_journal_entries(conn: sqlite3.Connection, columns: Sequence[str], rows: Iterable[tuple]) -> None:
+    """Add rows, given with the original journal_entries columns, to the pending delta."""
+    conn.execute(DELTA_DDL)
+    conn.executemany(
+        f"INSERT OR REPLACE INTO {DELTA_TABLE} ({','.join(columns)}) VALUES ({','.join('?' for _ in columns)})", rows
+    )
+
+
+def apply_delta(conn: sqlite3.Connection, updated_by: str = BALANCE_UPDATER) -> dict:
+    """Append the staged journal rows and fold them into balance_records and the rollups.
+
+    Documents that are already in journal_entries are skipped, so reloading a day is harmless;
+    correcting an entry that was already posted still needs a full rebuild. The balances are
+    upserted from a GROUP BY over the delta alone and only the rollup rows of the affected books
+    and dates are recomputed. Runs inside the caller's transaction and empties the delta.
+    """
+    conn.execute(DELTA_DDL)
+    conn.execute(BALANCE_DELTA_DDL)
+    received = conn.execute(f"SELECT COUNT(*) FROM {DELTA_TABLE}").fetchone()[0]
+
+    compact = is_compact(conn)
+    journal_table = FACT_TABLE if compact else "journal_entries"
+    skipped = conn.execute(
+        f"""
+        DELETE FROM {DELTA_TABLE}
+        WHERE EXISTS (SELECT 1 FROM {journal_table} j WHERE j.DOCUMENT_NUMBER = journal_delta.DOCUMENT_NUMBER)
+        """
+    ).rowcount
+
+    if compact:
+        load_journal_entries(conn, DELTA_TABLE)
+    else:
+        columns = ", ".join(JOURNAL_COLUMNS)
+        conn.execute(f"INSERT INTO journal_entries ({columns}) SELECT {columns} FROM {DELTA_TABLE}")
+
+    conn.execute(
+        f"""
+        INSERT INTO {BALANCE_DELTA_TABLE} (SAP_BOOK_ID, DATE, TOTAL_JOURNALS, VALUE_CENTS)
+        SELECT SAP_BOOK_ID, ENTRY_DATE, COUNT(*), SUM(CAST(ROUND(VALUE * 100) AS INTEGER))
+        FROM {DELTA_TABLE}
+        GROUP BY SAP_BOOK_ID, ENTRY_DATE
+        """
+    )
+    balances = conn.execute(_UPSERT_BALANCES, (updated_by,)).rowcount
+    refresh_rollups(conn, BALANCE_DELTA_TABLE)
+
+    conn.execute(f"DELETE FROM {DELTA_TABLE}")
+    conn.execute(f"DELETE FROM {BALANCE_DELTA_TABLE}")
+    return {"journal_entries": received - skipped, "skipped": skipped, "balance_records": balances}
+
+
+def append_journal_entries(
+    conn: sqlite3.Connection, columns: Sequence[str], rows: Iterable[tuple], updated_by: str = BALANCE_UPDATER
+) -> dict:
+    """Stage and apply one batch of new journal rows; see apply_delta."""
+    stage_journal_entries(conn, columns, rows)
+    return apply_delta(conn, updated_by)
+
+
+def _open_text(path: Path) -> TextIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return path.open(newline="", encoding="utf-8")
+
+
+def read_csv_batches(path: Path, batch_rows: int = CSV_BATCH_ROWS) -> Iterator[tuple[list[str], list[tuple]]]:
+    """Yield (header, rows) batches from a journal CSV as written by the ledger generator."""
+    with _open_text(path) as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        batch: list[tuple] = []
+        for row in reader:
+            batch.append(tuple(row))
+            if len(batch) >= batch_rows:
+                yield header, batch
+                batch = []
+        if batch:
+            yield header, batch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Append new journal entries and update balances incrementally.")
+    parser.add_argument("db_path", type=Path, help="Path to financial_data.db")
+    parser.add_argument("csv_paths", type=Path, nargs="+", help="Journal CSV files (.csv or .csv.gz) with the new rows")
+    parser.add_argument("--updated-by", default=BALANCE_UPDATER, help="LAST_UPDATED_BY for the balance rows touched")
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Write straight into the current database file; only while nothing reads it",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    # By default the load goes into a copy of the current snapshot, which the app switches to once published
+    snapshots = SnapshotManager(args.db_path)
+    target = nullcontext(snapshots.current()) if args.in_place else snapshots.build()
+    with target as db_path:
+        conn = sqlite3.connect(db_path)
+        try:
+            # The whole load is one transaction: balances and rollups never reflect half a day
+            with conn:
+                for path in args.csv_paths:
+                    for header, rows in read_csv_batches(path):
+                        stage_journal_entries(conn, header, rows)
+                stats = apply_delta(conn, args.updated_by)
+        finally:
+            conn.close()
+    print(
+        f"✅ Appended {stats['journal_entries']} journal entries ({stats['skipped']} already loaded), "
+        f"{stats['balance_records']} balance records updated in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from db_indexes import create_indexes, drop_indexes, optimize
+
+# Rows per explicit transaction; large enough that commits are rare, small enough to bound the page cache
+BATCH_ROWS = 200_000
+CACHE_SIZE_MB = 256
+CONFLICT_CLAUSES = {"replace": "INSERT OR REPLACE", "ignore": "INSERT OR IGNORE", "abort": "INSERT"}
+
+
+class BulkLoader:
+    """One SQLite connection tuned for loading many rows, then indexing and compacting once.
+
+    During the load the rollback journal and fsyncs are off and the page cache is large, rows
+    are committed in explicit transactions of batch_rows, and the access-path indexes from
+    db_indexes are dropped so they are built once, in sorted order, at the end. With the journal
+    off a crash mid-load leaves the file unusable, so this is for building or rebuilding a
+    database that can be regenerated, not for writes to the copy the app is serving.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        batch_rows: int = BATCH_ROWS,
+        cache_size_mb: int = CACHE_SIZE_MB,
+        defer_indexes: bool = True,
+        vacuum: bool = True,
+    ) -> None:
+        self.db_path = db_path
+        self.batch_rows = batch_rows
+        self.defer_indexes = defer_indexes
+        self.vacuum = vacuum
+        # Autocommit mode; the loader issues BEGIN and COMMIT itself
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute(f"PRAGMA cache_size = -{cache_size_mb * 1024}")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        if defer_indexes:
+            drop_indexes(self.conn)
+
+        self.rows: dict[str, int] = {}
+        self._pending = 0
+        self._timings: dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    def begin(self) -> None:
+        """Open a transaction unless one is already running."""
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+
+    def count(self, table: str, rows: int) -> None:
+        """Record rows written inside the current transaction, committing once batch_rows is reached."""
+        self.rows[table] = self.rows.get(table, 0) + rows
+        self._pending += rows
+        if self._pending >= self.batch_rows:
+            self.commit()
+
+    def commit(self) -> None:
+        if self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+        self._pending = 0
+
+    def insert(self, table: str, columns: Sequence[str], rows: Sequence[tuple], conflict: str = "replace") -> None:
+        placeholders = ",".join("?" for _ in columns)
+        self.begin()
+        self.conn.executemany(
+            f"{CONFLICT_CLAUSES[conflict]} INTO {table} ({','.join(columns)}) VALUES ({placeholders})", rows
+        )
+        self.count(table, len(rows))
+
+    def finish(self) -> dict:
+        """Commit, build the deferred indexes, refresh planner statistics and compact the file.
+
+        Returns the load report; the connection is closed afterwards.
+        """
+        try:
+            self.commit()
+            self._timings["load"] = time.perf_counter() - self._start
+
+            phase_start = time.perf_counter()
+            created = create_indexes(self.conn) if self.defer_indexes else []
+            self._timings["index"] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            optimize(self.conn)
+            self._timings["analyze"] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            if self.vacuum:
+                self.conn.execute("VACUUM")
+            self._timings["vacuum"] = time.perf_counter() - phase_start
+        finally:
+            self.conn.close()
+
+        total_rows = sum(self.rows.values())
+        load_seconds = self._timings["load"]
+        return {
+            "rows": dict(self.rows),
+            "indexes_created": created,
+            "seconds": dict(self._timings),
+            "load_rows_per_second": total_rows / load_seconds if load_seconds else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close without the finishing steps, e.g. after a failed load."""
+        self.conn.close()
+
+
+def format_report(report: dict, title: str = "Bulk load") -> str:
+    lines = [f"# {title}", "", "| Table | Rows |", "|---|---:|"]
+    lines.extend(f"| {table} | {rows:,} |" for table, rows in report["rows"].items())
+    lines.extend(["", "| Phase | Seconds |", "|---|---:|"])
+    lines.extend(f"| {phase} | {seconds:.2f} |" for phase, seconds in report["seconds"].items())
+    lines.extend(["", f"Load throughput: {report['load_rows_per_second']:,.0f} rows/s"])
+    return "\n".join(lines)
+
+
+class _TimedBatches:
+    """Iterates generated batches and keeps the time spent generating them, to leave it out of the comparison."""
+
+    def __init__(self, chunks: Iterator) -> None:
+        self._chunks = chunks
+        self.seconds = 0.0
+
+    def __iter__(self) -> Iterator[list[tuple]]:
+        while True:
+            start = time.perf_counter()
+            chunk = next(self._chunks, None)
+            rows = chunk.rows() if chunk is not None else None
+            self.seconds += time.perf_counter() - start
+            if rows is None:
+                return
+            yield rows
+
+
+def _load_naively(db_path: Path, batches: _TimedBatches, columns: Sequence[str], ddl: Sequence[str]) -> float:
+    """The previous loading path: default pragmas, indexes in place, one INSERT OR REPLACE per batch."""
+    conn = sqlite3.connect(db_path)
+    try:
+        for statement in ddl:
+            conn.execute(statement)
+        create_indexes(conn)
+        start = time.perf_counter()
+        placeholders = ",".join("?" for _ in columns)
+        sql = f"INSERT OR REPLACE INTO journal_entries ({','.join(columns)}) VALUES ({placeholders})"
+        for rows in batches:
+            conn.executemany(sql, rows)
+        conn.commit()
+        conn.execute("ANALYZE")
+        return time.perf_counter() - start - batches.seconds
+    finally:
+        conn.close()
+
+
+def build_report(rows: int = 1_000_000, batch_rows: int = BATCH_ROWS, directory: Optional[Path] = None) -> str:
+    """Load the same generated journal rows the old way and through BulkLoader, and compare throughput.
+
+    Both loads go to temporary databases (in `directory`, to measure a particular disk) and end in
+    the same indexed, analyzed state. Time spent generating the rows is excluded from both.
+    """
+    # Imported here: the generator itself loads through this module
+    from ledger_generator import (
+        BOOKS_DDL,
+        DEFAULT_END_DATE,
+        JOURNAL_COLUMNS,
+        JOURNALS_DDL,
+        generate_books,
+        generate_journal_chunks,
+    )
+
+    books = generate_books(100)
+    entries_per_day = 10_000
+    days = max(rows // entries_per_day, 1)
+    end_date = datetime.strptime(DEFAULT_END_DATE, "%Y-%m-%d").date()
+    total = days * entries_per_day
+
+    def batches() -> _TimedBatches:
+        return _TimedBatches(generate_journal_chunks(books, days, entries_per_day, end_date))
+
+    with tempfile.TemporaryDirectory(dir=directory) as temp_dir:
+        before_seconds = _load_naively(
+            Path(temp_dir) / "before.db", batches(), JOURNAL_COLUMNS, [BOOKS_DDL, JOURNALS_DDL]
+        )
+
+        start = time.perf_counter()
+        loader = BulkLoader(Path(temp_dir) / "after.db", batch_rows=batch_rows, vacuum=False)
+        loader.conn.execute(BOOKS_DDL)
+        loader.conn.execute(JOURNALS_DDL)
+        timed = batches()
+        for batch in timed:
+            loader.insert("journal_entries", JOURNAL_COLUMNS, batch)
+        report = loader.finish()
+        after_seconds = time.perf_counter() - start - timed.seconds
+
+    lines = [
+        f"# Bulk load report ({total:,} journal rows)",
+        "",
+        "| Path | Seconds | Rows/s |",
+        "|---|---:|---:|",
+        f"| Before: default pragmas, indexes in place | {before_seconds:.2f} | {total / before_seconds:,.0f} |",
+        f"| After: BulkLoader, deferred indexes | {after_seconds:.2f} | {total / after_seconds:,.0f} |",
+        "",
+        f"Speed-up: {before_seconds / after_seconds:.1f}x",
+        "",
+        "After, by phase (load includes row generation):",
+    ]
+    lines.extend(f"    {phase}: {seconds:.2f}s" for phase, seconds in report["seconds"].items())
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the bulk loading path with plain inserts.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Journal rows to load in each run")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="Rows per transaction")
+    parser.add_argument("--dir", type=Path, help="Directory for the temporary databases (defaults to the system temp)")
+    args = parser.parse_args()
+    print(build_report(args.rows, args.batch_rows, args.dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from db_indexes import create_indexes, optimize
+
+# Dictionary tables: every distinct string is stored once and referenced by its integer ID
+DICTIONARY_TABLES = ("users", "cost_centers", "remarks", "transaction_types", "currencies")
+FACT_TABLE = "journal_facts"
+# Storage tables the agent never needs to see; it queries the journal_entries view instead
+INTERNAL_TABLES = (FACT_TABLE, *DICTIONARY_TABLES)
+
+# Journal rows keep only what books does not already hold. Dates are integer YYYYMMDD keys,
+# amounts integer cents and timestamps Unix seconds. The integer rowid, not the document number
+# text, is what every secondary index stores per row.
+FACT_DDL = f"""
+CREATE TABLE IF NOT EXISTS {FACT_TABLE} (
+    ID INTEGER PRIMARY KEY,
+    DOCUMENT_NUMBER TEXT NOT NULL UNIQUE,
+    SAP_BOOK_ID TEXT NOT NULL,
+    ENTRY_DATE INTEGER NOT NULL,
+    POSTING_DATE INTEGER,
+    VALUE_CENTS INTEGER NOT NULL,
+    TRANSACTION_TYPE_ID INTEGER,
+    CURRENCY_ID INTEGER,
+    COST_CENTER_ID INTEGER,
+    USERNAME_ID INTEGER,
+    POSTED_BY_ID INTEGER,
+    APPROVED_BY_ID INTEGER,
+    REMARKS_ID INTEGER,
+    CREATED_TIMESTAMP INTEGER,
+    UPDATED_TIMESTAMP INTEGER,
+    FOREIGN KEY(SAP_BOOK_ID) REFERENCES books(SAP_BOOK_ID)
+)
+"""
+
+_TIMESTAMP_FORMAT = "'%Y-%m-%dT%H:%M:%S'"
+
+
+def _lookup(table: str, column: str, name: str = "NAME", key: str = "ID") -> str:
+    return f"(SELECT {name} FROM {table} WHERE {key} = {FACT_TABLE}.{column})"
+
+
+# Same columns and names as the original journal_entries table, so existing prompts and SQL keep
+# working. Dates stay integers: comparisons with '20250101' still match through column affinity,
+# and filters on them use the fact table indexes. Computed columns are CAST to the type of the
+# original column, which gives them its affinity, so VALUE > '100' compares numerically as before.
+# Names are scalar lookups rather than joins, so a query pays only for the columns it reads
+# (SQLite keeps unused LEFT JOINs in aggregate queries).
+VIEW_DDL = f"""
+CREATE VIEW journal_entries AS
+SELECT
+    DOCUMENT_NUMBER,
+    SAP_BOOK_ID,
+    {_lookup("books", "SAP_BOOK_ID", "Bookname", "SAP_BOOK_ID")} AS SAP_BOOK_NAME,
+    {_lookup("cost_centers", "COST_CENTER_ID")} AS COST_CENTER,
+    {_lookup("currencies", "CURRENCY_ID")} AS TRANSACTION_CURRENCY,
+    CAST(VALUE_CENTS / 100.0 AS REAL) AS VALUE,
+    VALUE_CENTS,
+    ENTRY_DATE,
+    POSTING_DATE,
+    {_lookup("users", "USERNAME_ID")} AS USERNAME,
+    {_lookup("transaction_types", "TRANSACTION_TYPE_ID")} AS TRANSACTION_TYPE,
+    {_lookup("users", "POSTED_BY_ID")} AS POSTED_BY,
+    {_lookup("users", "APPROVED_BY_ID")} AS APPROVED_BY,
+    CAST(strftime({_TIMESTAMP_FORMAT}, CREATED_TIMESTAMP, 'unixepoch') AS TEXT) AS CREATED_TIMESTAMP,
+    CAST(strftime({_TIMESTAMP_FORMAT}, UPDATED_TIMESTAMP, 'unixepoch') AS TEXT) AS UPDATED_TIMESTAMP,
+    {_lookup("books", "SAP_BOOK_ID", "systementity", "SAP_BOOK_ID")} AS SOURCE_SYSTEM,
+    {_lookup("remarks", "REMARKS_ID")} AS REMARKS
+FROM {FACT_TABLE}
+"""
+
+# Published to the agent in the schema string when the database uses this layout
+COMPACT_DESCRIPTION = (
+    "journal_entries is a view: ENTRY_DATE and POSTING_DATE are integers YYYYMMDD (year = ENTRY_DATE / 10000), "
+    "VALUE_CENTS is the exact amount in integer cents (SUM(VALUE_CENTS) / 100.0 gives exact totals)"
+)
+
+# Text-layout staging table for the generators, which produce rows with the original columns
+STAGING_DDL = """
+CREATE TEMP TABLE IF NOT EXISTS journal_staging (
+    DOCUMENT_NUMBER TEXT, SAP_BOOK_ID TEXT, SAP_BOOK_NAME TEXT, COST_CENTER TEXT, TRANSACTION_CURRENCY TEXT,
+    VALUE REAL, ENTRY_DATE TEXT, POSTING_DATE TEXT, USERNAME TEXT, TRANSACTION_TYPE TEXT, POSTED_BY TEXT,
+    APPROVED_BY TEXT, CREATED_TIMESTAMP TEXT, UPDATED_TIMESTAMP TEXT, SOURCE_SYSTEM TEXT, REMARKS TEXT
+)
+"""
+
+# Dictionary table -> source columns of the text layout that it encodes
+_DICTIONARY_SOURCES = {
+    "users": ("USERNAME", "POSTED_BY", "APPROVED_BY"),
+    "cost_centers": ("COST_CENTER",),
+    "remarks": ("REMARKS",),
+    "transaction_types": ("TRANSACTION_TYPE",),
+    "currencies": ("TRANSACTION_CURRENCY",),
+}
+
+
+def _date_key(column: str) -> str:
+    # Handles YYYYMMDD text as well as ISO dates and timestamps
+    return f"CAST(replace(substr({column}, 1, 10), '-', '') AS INTEGER)"
+
+
+def is_compact(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FACT_TABLE,)).fetchone()
+    return row is not None
+
+
+def create_compact_schema(conn: sqlite3.Connection) -> None:
+    """Create the dictionary tables, the fact table and the journal_entries compatibility view."""
+    for table in DICTIONARY_TABLES:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (ID INTEGER PRIMARY KEY, NAME TEXT NOT NULL UNIQUE)")
+    conn.execute(FACT_DDL)
+    # Recreated, so databases converted before a change to the view pick it up
+    conn.execute("DROP VIEW IF EXISTS journal_entries")
+    conn.execute(VIEW_DDL)
+
+
+def load_journal_entries(conn: sqlite3.Connection, source_table: str) -> int:
+    """Encode the rows of a text-layout journal table into the compact tables; returns the rows loaded."""
+    for table, columns in _DICTIONARY_SOURCES.items():
+        distinct = " UNION ".join(
+            f"SELECT {column} FROM {source_table} WHERE {column} IS NOT NULL" for column in columns
+        )
+        conn.execute(f"INSERT OR IGNORE INTO {table} (NAME) {distinct}")
+
+    cursor = conn.execute(
+        f"""
+        INSERT OR REPLACE INTO {FACT_TABLE} (
+            DOCUMENT_NUMBER, SAP_BOOK_ID, ENTRY_DATE, POSTING_DATE, VALUE_CENTS, TRANSACTION_TYPE_ID, CURRENCY_ID,
+            COST_CENTER_ID, USERNAME_ID, POSTED_BY_ID, APPROVED_BY_ID, REMARKS_ID, CREATED_TIMESTAMP, UPDATED_TIMESTAMP
+        )
+        SELECT
+            s.DOCUMENT_NUMBER,
+            s.SAP_BOOK_ID,
+            {_date_key("s.ENTRY_DATE")},
+            {_date_key("s.POSTING_DATE")},
+            CAST(ROUND(s.VALUE * 100) AS INTEGER),
+            (SELECT ID FROM transaction_types WHERE NAME = s.TRANSACTION_TYPE),
+            (SELECT ID FROM currencies WHERE NAME = s.TRANSACTION_CURRENCY),
+            (SELECT ID FROM cost_centers WHERE NAME = s.COST_CENTER),
+            (SELECT ID FROM users WHERE NAME = s.USERNAME),
+            (SELECT ID FROM users WHERE NAME = s.POSTED_BY),
+            (SELECT ID FROM users WHERE NAME = s.APPROVED_BY),
+            (SELECT ID FROM remarks WHERE NAME = s.REMARKS),
+            CAST(strftime('%s', s.CREATED_TIMESTAMP) AS INTEGER),
+            CAST(strftime('%s', s.UPDATED_TIMESTAMP) AS INTEGER)
+        FROM {source_table} s
+        """
+    )
+    return cursor.rowcount
+
+
+def insert_journal_entries(conn: sqlite3.Connection, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+    """Insert generator rows, given with the original journal_entries columns, in the compact layout."""
+    conn.execute(STAGING_DDL)
+    conn.executemany(
+        f"INSERT INTO journal_staging ({','.join(columns)}) VALUES ({','.join('?' for _ in columns)})", rows
+    )
+    count = load_journal_entries(conn, "temp.journal_staging")
+    conn.execute("DELETE FROM temp.journal_staging")
+    return count
+
+
+def convert_database(conn: sqlite3.Connection) -> int:
+    """Replace a text-layout journal_entries table with the compact tables and the compatibility view."""
+    if is_compact(conn):
+        return 0
+    with conn:
+        conn.execute("ALTER TABLE journal_entries RENAME TO journal_entries_text")
+        create_compact_schema(conn)
+        count = load_journal_entries(conn, "journal_entries_text")
+        conn.execute("DROP TABLE journal_entries_text")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert the financial database to the compact journal layout.")
+    parser.add_argument("db_path", type=Path, help="Path to financial_data.db")
+    args = parser.parse_args()
+
+    size_before = args.db_path.stat().st_size
+    conn = sqlite3.connect(args.db_path)
+    try:
+        count = convert_database(conn)
+        create_indexes(conn)
+        optimize(conn)
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    size_after = args.db_path.stat().st_size
+    print(f"✅ Converted {count} journal entries: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
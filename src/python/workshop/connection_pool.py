@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class ConnectionPool:
+    """A bounded pool of read-only aiosqlite connections.
+
+    Each aiosqlite connection owns one worker thread, so handing every caller its own
+    connection lets concurrent chat turns run their queries in parallel.
+    """
+
+    def __init__(
+        self,
+        db_uri: str,
+        min_size: int = 2,
+        max_size: int = 8,
+        acquire_timeout: float = 10.0,
+        health_check_interval: float = 30.0,
+        on_connect: Optional[Callable[[aiosqlite.Connection], Awaitable[None]]] = None,
+    ) -> None:
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+        self.db_uri = db_uri
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        # Per-connection setup (ATTACH, temp views) that must run before the connection turns query-only
+        self.on_connect = on_connect
+
+        # Idle connections paired with the monotonic time they were returned to the pool
+        self._idle: deque[tuple[aiosqlite.Connection, float]] = deque()
+        self._in_use: set[aiosqlite.Connection] = set()
+        self._size = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+
+        self._stats = {
+            "acquired": 0,
+            "timeouts": 0,
+            "created": 0,
+            "closed": 0,
+            "health_check_failures": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    async def open(self) -> None:
+        """Open the minimum number of connections."""
+        async with self._cond:
+            self._closed = False
+            while self._size < self.min_size:
+                conn = await self._create_connection()
+                self._size += 1
+                self._idle.append((conn, time.monotonic()))
+
+    async def close(self) -> None:
+        """Close idle connections and any connection released after this call."""
+        async with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.popleft()
+                self._size -= 1
+                await self._close_connection(conn)
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection for the duration of the context."""
+        conn = await self._acquire()
+        broken = False
+        try:
+            yield conn
+        except aiosqlite.DatabaseError:
+            # Errors from bad SQL leave the connection usable, but a corrupt or closed
+            # connection must not go back to the pool; the health check decides which.
+            broken = not await self._is_healthy(conn)
+            raise
+        finally:
+            await self._release(conn, broken)
+
+    async def _acquire(self) -> aiosqlite.Connection:
+        start = time.monotonic()
+        async with self._cond:
+            try:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self._closed or self._idle or self._size < self.max_size),
+                    timeout=self.acquire_timeout,
+                )
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                raise PoolTimeoutError(
+                    f"No database connection available after {self.acquire_timeout:.1f}s "
+                    f"({len(self._in_use)} in use, max {self.max_size})"
+                ) from None
+
+            if self._closed:
+                raise PoolTimeoutError("The connection pool is closed.")
+
+            if self._idle:
+                conn, returned_at = self._idle.pop()
+            else:
+                # Reserve the slot before releasing the lock to create the connection
+                self._size += 1
+                conn, returned_at = None, None
+
+        try:
+            if conn is None:
+                conn = await self._create_connection()
+            elif time.monotonic() - returned_at > self.health_check_interval and not await self._is_healthy(conn):
+                self._stats["health_check_failures"] += 1
+                await self._close_connection(conn)
+                conn = await self._create_connection()
+        except BaseException:
+            async with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        self._in_use.add(conn)
+
+        waited = time.monotonic() - start
+        self._stats["acquired"] += 1
+        self._stats["wait_time_total"] += waited
+        self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+        return conn
+
+    async def _release(self, conn: aiosqlite.Connection, broken: bool) -> None:
+        async with self._cond:
+            self._in_use.discard(conn)
+            if broken or self._closed:
+                self._size -= 1
+                await self._close_connection(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    async def _create_connection(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.db_uri, uri=True)
+        try:
+            if self.on_connect is not None:
+                await self.on_connect(conn)
+            await conn.execute("PRAGMA query_only = ON;")
+        except BaseException:
+            await conn.close()
+            raise
+        self._stats["created"] += 1
+        logger.debug("Pool connection opened (%d open).", self._size)
+        return conn
+
+    async def _close_connection(self, conn: aiosqlite.Connection) -> None:
+        try:
+            await conn.close()
+        except aiosqlite.Error as e:
+            logger.warning("Error closing pooled connection: %s", e)
+        self._stats["closed"] += 1
+
+    async def _is_healthy(self, conn: aiosqlite.Connection) -> bool:
+        try:
+            async with conn.execute("SELECT 1;") as cursor:
+                await cursor.fetchone()
+            return True
+        except (aiosqlite.Error, ValueError):
+            return False
+
+    def metrics(self) -> dict:
+        """Return a snapshot of the pool counters."""
+        acquired = self._stats["acquired"]
+        return {
+            **self._stats,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "max_size": self.max_size,
+            "wait_time_avg": self._stats["wait_time_total"] / acquired if acquired else 0.0,
+        }
@@ -0,0 +1,328 @@
+import argparse
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from balance_updater import apply_delta, stage_journal_entries
+from bulk_loader import BulkLoader, format_report
+from compact_schema import create_compact_schema, insert_journal_entries, is_compact
+from ledger_generator import BALANCES_DDL, BOOKS_DDL, JOURNALS_DDL
+from rollups import ROLLUP_TABLES, build_rollups
+from snapshot_manager import SnapshotManager
+
+CHUNK_ROWS = 100_000
+DATE_FORMAT = "%Y%m%d"
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+REJECT_COLUMNS = ("SOURCE_LINE", "REJECT_REASON")
+
+# Table -> column -> (type, required), in load order: journals and balances are checked against the books
+TABLE_COLUMNS = {
+    "books": {
+        "SAP_BOOK_ID": ("text", True),
+        "Bookname": ("text", False),
+        "systementity": ("text", False),
+    },
+    "journal_entries": {
+        "DOCUMENT_NUMBER": ("text", True),
+        "SAP_BOOK_ID": ("text", True),
+        "SAP_BOOK_NAME": ("text", False),
+        "COST_CENTER": ("text", False),
+        "TRANSACTION_CURRENCY": ("text", False),
+        "VALUE": ("real", True),
+        "ENTRY_DATE": ("date", True),
+        "POSTING_DATE": ("date", False),
+        "USERNAME": ("text", False),
+        "TRANSACTION_TYPE": ("text", False),
+        "POSTED_BY": ("text", False),
+        "APPROVED_BY": ("text", False),
+        "CREATED_TIMESTAMP": ("timestamp", False),
+        "UPDATED_TIMESTAMP": ("timestamp", False),
+        "SOURCE_SYSTEM": ("text", False),
+        "REMARKS": ("text", False),
+    },
+    "balance_records": {
+        "SAP_BOOK_ID": ("text", True),
+        "DATE": ("date", True),
+        "TOTAL_JOURNALS": ("integer", False),
+        "LAST_UPDATED_BY": ("text", False),
+        "BALANCE": ("real", True),
+        "DAILY_CHANGE": ("real", False),
+    },
+}
+
+
+class IngestError(Exception):
+    """A file that cannot be ingested at all, e.g. because required columns are missing."""
+
+
+def _coerce(values: pd.Series, kind: str) -> tuple[pd.Series, pd.Series]:
+    """Convert one column of raw strings; returns the values (None when empty) and a mask of invalid cells.
+
+    Dates may be YYYYMMDD or YYYY-MM-DD and are stored as YYYYMMDD, like the generated data;
+    timestamps are parsed as ISO 8601 and stored to the second, in UTC when they carry an offset.
+    """
+    values = values.str.strip()
+    empty = values == ""
+    if kind == "text":
+        return values.where(~empty, None), pd.Series(False, index=values.index)
+
+    if kind in ("real", "integer"):
+        numbers = pd.to_numeric(values, errors="coerce")
+        invalid = ~empty & ~np.isfinite(numbers)
+        if kind == "integer":
+            invalid |= ~empty & (numbers % 1 != 0)
+            numbers = numbers.round()
+        coerced = numbers.astype(object).where(~empty & ~invalid, None)
+        if kind == "integer":
+            coerced = coerced.map(lambda number: None if number is None else int(number))
+        return coerced, invalid
+
+    if kind == "date":
+        digits = values.str.replace("-", "", regex=False)
+        parsed = pd.to_datetime(digits, format=DATE_FORMAT, errors="coerce")
+        invalid = ~empty & (parsed.isna() | (digits.str.len() != 8))
+        return digits.where(~empty & ~invalid, None), invalid
+
+    # Values already in the stored format only need checking; the slower ISO 8601 parse and
+    # reformatting is kept for the rest
+    canonical = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors="coerce").notna()
+    coerced = values.where(canonical, None)
+    other = ~empty & ~canonical
+    invalid = pd.Series(False, index=values.index)
+    if other.any():
+        parsed = pd.to_datetime(values[other], format="ISO8601", errors="coerce", utc=True)
+        coerced[other] = parsed.dt.strftime(TIMESTAMP_FORMAT).where(parsed.notna(), None)
+        invalid[other] = parsed.isna()
+    return coerced, invalid
+
+
+def validate_chunk(
+    chunk: pd.DataFrame, table: str, known_books: Optional[set[str]] = None
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a chunk of raw strings into coerced rows to load and rejected rows with a reason.
+
+    Every check runs on whole columns; a row is rejected for the first column that fails.
+    """
+    columns = TABLE_COLUMNS[table]
+    reason = pd.Series("", index=chunk.index, dtype=object)
+    coerced = {}
+    for column, (kind, required) in columns.items():
+        values, invalid = _coerce(chunk[column], kind)
+        failures = [(invalid, f"{column}: not a valid {kind}")]
+        if required:
+            failures.append((values.isna(), f"{column}: missing"))
+        if column == "SAP_BOOK_ID" and known_books is not None:
+            failures.append((values.notna() & ~values.isin(known_books), f"{column}: unknown book"))
+        for mask, message in failures:
+            reason = reason.mask((reason == "") & mask, message)
+        coerced[column] = values
+
+    rejected = reason != ""
+    rejects = chunk.loc[rejected, list(columns)].assign(REJECT_REASON=reason[rejected])
+    return pd.DataFrame(coerced).loc[~rejected], rejects
+
+
+def read_chunks(path: Path, table: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Read a CSV export in chunks of raw strings; compression is inferred from the file name."""
+    columns = list(TABLE_COLUMNS[table])
+    header = pd.read_csv(path, nrows=0).columns
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise IngestError(f"{path.name} is missing columns for {table}: {', '.join(missing)}")
+
+    reader = pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    line = 2  # the header is line 1
+    for chunk in reader:
+        chunk.index = pd.RangeIndex(line, line + len(chunk))
+        line += len(chunk)
+        yield chunk
+
+
+class Quarantine:
+    """Appends rejected rows, with their source line and reason, to <table>.rejects.csv."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.counts: dict[str, int] = {}
+
+    def write(self, table: str, rejects: pd.DataFrame) -> None:
+        if rejects.empty:
+            return
+        path = self.directory / f"{table}.rejects.csv"
+        first = table not in self.counts
+        if first:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        rejects.to_csv(path, mode="w" if first else "a", header=first, index_label=REJECT_COLUMNS[0])
+        self.counts[table] = self.counts.get(table, 0) + len(rejects)
+
+
+def _rows(frame: pd.DataFrame) -> list[tuple]:
+    # Missing cells become NULL whatever missing-value marker the column dtype uses
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def ingest(
+    db_path: Path,
+    files: dict[str, Path],
+    quarantine_dir: Path,
+    chunk_rows: int = CHUNK_ROWS,
+    update_balances: bool = False,
+    defer_indexes: bool = True,
+) -> dict:
+    """Load books, journal_entries and balance_records CSV exports into the financial database.
+
+    Rows are upserted on their keys through a BulkLoader, so loading an export again replaces
+    the rows instead of duplicating them. With update_balances, journals are appended through
+    balance_updater and their balances and rollups updated incrementally (for exports without
+    balances); otherwise the rollups are rebuilt at the end. Returns per-table counts and timings.
+    The loader runs with the journal off, so db_path should be a snapshot being built rather than
+    the file the app is serving; see SnapshotManager.build.
+    """
+    loader = BulkLoader(db_path, defer_indexes=defer_indexes)
+    quarantine = Quarantine(quarantine_dir)
+    tables: dict[str, dict] = {}
+    try:
+        conn = loader.conn
+        conn.execute(BOOKS_DDL)
+        compact = is_compact(conn)
+        if compact:
+            create_compact_schema(conn)
+        else:
+            conn.execute(JOURNALS_DDL)
+        conn.execute(BALANCES_DDL)
+
+        known_books: Optional[set[str]] = None
+        for table in TABLE_COLUMNS:
+            if table not in files:
+                continue
+            if table != "books":
+                loader.commit()
+                known_books = {row[0] for row in conn.execute("SELECT SAP_BOOK_ID FROM books")}
+
+            start = time.perf_counter()
+            read = loaded = 0
+            columns = list(TABLE_COLUMNS[table])
+            for chunk in read_chunks(files[table], table, chunk_rows):
+                valid, rejects = validate_chunk(chunk, table, known_books)
+                quarantine.write(table, rejects)
+                read += len(chunk)
+                loaded += len(valid)
+                rows = _rows(valid)
+                if table == "journal_entries" and update_balances:
+                    loader.begin()
+                    stage_journal_entries(conn, columns, rows)
+                    loader.count(table, len(rows))
+                elif table == "journal_entries" and compact:
+                    loader.begin()
+                    insert_journal_entries(conn, columns, rows)
+                    loader.count(table, len(rows))
+                else:
+                    loader.insert(table, columns, rows)
+            seconds = time.perf_counter() - start
+            tables[table] = {
+                "read": read,
+                "loaded": loaded,
+                "rejected": quarantine.counts.get(table, 0),
+                "seconds": seconds,
+                "rows_per_second": read / seconds if seconds else 0.0,
+            }
+
+        loader.begin()
+        if update_balances and "journal_entries" in files:
+            tables["journal_entries"]["delta"] = apply_delta(conn)
+        else:
+            loader.commit()
+            build_rollups(conn)
+        loader.commit()
+    except BaseException:
+        loader.close()
+        raise
+    return {"tables": tables, "load": loader.finish()}
+
+
+def format_ingest_report(report: dict) -> str:
+    lines = [
+        "# CSV ingestion",
+        "",
+        "| Table | Read | Loaded | Rejected | Seconds | Rows/s |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    for table, stats in report["tables"].items():
+        lines.append(
+            f"| {table} | {stats['read']:,} | {stats['loaded']:,} | {stats['rejected']:,} "
+            f"| {stats['seconds']:.2f} | {stats['rows_per_second']:,.0f} |"
+        )
+    delta = report["tables"].get("journal_entries", {}).get("delta")
+    if delta:
+        lines.extend(
+            ["", f"Appended {delta['journal_entries']:,} new journals ({delta['skipped']:,} already loaded), "
+             f"{delta['balance_records']:,} balance records updated"]
+        )
+    lines.extend(["", format_report(report["load"], "Database load")])
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load ERP CSV exports (.csv, .csv.gz, ...) into the financial database."
+    )
+    parser.add_argument("db_path", type=Path, help="Path to financial_data.db")
+    parser.add_argument("--books", type=Path, help="books export")
+    parser.add_argument("--journals", type=Path, help="journal_entries export")
+    parser.add_argument("--balances", type=Path, help="balance_records export")
+    parser.add_argument("--quarantine-dir", type=Path, default=Path("quarantine"), help="Where rejected rows go")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows read and validated at a time")
+    parser.add_argument(
+        "--update-balances",
+        action="store_true",
+        help="Append the journals and update balances and rollups from them (for exports without balances)",
+    )
+    parser.add_argument(
+        "--keep-indexes",
+        action="store_true",
+        help="Keep indexes in place; faster for loads much smaller than the table",
+    )
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help=(
+            "Write straight into the current database file with the journal off and an exclusive lock; "
+            "only while nothing reads it"
+        ),
+    )
+    args = parser.parse_args()
+
+    exports = (("books", args.books), ("journal_entries", args.journals), ("balance_records", args.balances))
+    files = {table: path for table, path in exports if path is not None}
+    if not files:
+        parser.error("nothing to load: pass --books, --journals and/or --balances")
+    if args.update_balances and args.balances:
+        parser.error("--update-balances derives balances from the journals; it cannot be combined with --balances")
+
+    # By default the load goes into a copy of the current snapshot, so the running app keeps reading the
+    # current one until the new one is published; a crash mid-load never touches the file being served
+    snapshots = SnapshotManager(args.db_path)
+    if args.in_place:
+        target = nullcontext(snapshots.current())
+    else:
+        target = snapshots.build(copy_current=snapshots.current().exists())
+    try:
+        with target as db_path:
+            report = ingest(
+                db_path, files, args.quarantine_dir, args.chunk_rows, args.update_balances, not args.keep_indexes
+            )
+    except IngestError as error:
+        print(f"❌ {error}")
+        raise SystemExit(1) from None
+    print(format_ingest_report(report))
+    if any(stats["rejected"] for stats in report["tables"].values()):
+        print(f"⚠️ Rejected rows were written to {args.quarantine_dir}")
+    print(f"✅ Rollup tables up to date: {', '.join(ROLLUP_TABLES)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Index name -> (table, columns), matching the agent's access paths: one book over a date
+# range, one date (or range) across books, and the latest balance snapshot.
+INDEXES = {
+    "idx_journal_book_date": ("journal_entries", ("SAP_BOOK_ID", "ENTRY_DATE", "VALUE")),
+    "idx_journal_date_book": ("journal_entries", ("ENTRY_DATE", "SAP_BOOK_ID", "VALUE")),
+    "idx_journal_type": ("journal_entries", ("TRANSACTION_TYPE",)),
+    # Compact layout (compact_schema.py), where journal_entries is a view over journal_facts
+    "idx_facts_book_date": ("journal_facts", ("SAP_BOOK_ID", "ENTRY_DATE", "VALUE_CENTS")),
+    "idx_facts_date_book": ("journal_facts", ("ENTRY_DATE", "SAP_BOOK_ID", "VALUE_CENTS")),
+    "idx_facts_type": ("journal_facts", ("TRANSACTION_TYPE_ID",)),
+    "idx_balance_book_date": ("balance_records", ("SAP_BOOK_ID", "DATE")),
+    "idx_balance_date_book": ("balance_records", ("DATE", "SAP_BOOK_ID", "BALANCE")),
+}
+
+# SQL the agent typically writes for the questions in the repository's `nn` sample
+REPORT_QUERIES = [
+    (
+        "provide the top 10 book and balances",
+        "SELECT SAP_BOOK_ID, SUM(BALANCE) AS TOTAL_BALANCE FROM balance_records "
+        "GROUP BY SAP_BOOK_ID ORDER BY TOTAL_BALANCE DESC LIMIT 10",
+    ),
+    ("give me details of book B0001", "SELECT * FROM books WHERE SAP_BOOK_ID = 'B0001'"),
+    (
+        "provide me journal entries for book B0058",
+        "SELECT * FROM journal_entries WHERE SAP_BOOK_ID = 'B0058' ORDER BY ENTRY_DATE DESC LIMIT 30",
+    ),
+    (
+        "provide me summary of the balances for the latest date",
+        "SELECT COUNT(*), SUM(BALANCE), AVG(BALANCE) FROM balance_records "
+        "WHERE DATE = (SELECT MAX(DATE) FROM balance_records)",
+    ),
+    (
+        "provide me balances for book B0058",
+        "SELECT DATE, BALANCE FROM balance_records WHERE SAP_BOOK_ID = 'B0058' ORDER BY DATE DESC LIMIT 30",
+    ),
+    (
+        "journal totals for book B0059 this month",
+        "SELECT SUM(VALUE) FROM journal_entries WHERE SAP_BOOK_ID = 'B0059' AND ENTRY_DATE >= "
+        "(SELECT substr(MAX(ENTRY_DATE), 1, 6) FROM journal_entries)",
+    ),
+]
+
+
+def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
+    # Views cannot be indexed, so only real tables count
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row is not None
+
+
+def _has_equivalent_index(conn: sqlite3.Connection, table: str, columns: tuple[str, ...]) -> bool:
+    """True when an existing index (including a primary key) starts with the same columns."""
+    for index in conn.execute(f"PRAGMA index_list('{table}')").fetchall():
+        index_columns = tuple(row[2] for row in conn.execute(f"PRAGMA index_info('{index[1]}')").fetchall())
+        if index_columns[: len(columns)] == columns:
+            return True
+    return False
+
+
+def create_indexes(conn: sqlite3.Connection) -> list[str]:
+    """Create the access-path indexes, skipping ones an existing index already covers."""
+    created = []
+    for name, (table, columns) in INDEXES.items():
+        if not _table_exists(conn, table) or _has_equivalent_index(conn, table, columns):
+            continue
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+        created.append(name)
+    conn.commit()
+    return created
+
+
+def drop_indexes(conn: sqlite3.Connection) -> None:
+    for name in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+
+
+def optimize(conn: sqlite3.Connection) -> None:
+    """Refresh planner statistics after a bulk load."""
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    conn.commit()
+
+
+def _measure(conn: sqlite3.Connection, sql: str, runs: int) -> tuple[list[str], float]:
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        timings.append(time.perf_counter() - start)
+    return plan, statistics.median(timings) * 1000
+
+
+def build_report(db_path: Path, runs: int = 5) -> str:
+    """Compare plans and median latencies of REPORT_QUERIES without and with the indexes.
+
+    Works on a temporary copy, so the database itself is left untouched.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        copy_path = Path(temp_dir) / db_path.name
+        with sqlite3.connect(db_path) as source, sqlite3.connect(copy_path) as copy:
+            source.backup(copy)
+
+        conn = sqlite3.connect(copy_path)
+        try:
+            drop_indexes(conn)
+            conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+            without = [_measure(conn, sql, runs) for _, sql in REPORT_QUERIES]
+            create_indexes(conn)
+            optimize(conn)
+            with_indexes = [_measure(conn, sql, runs) for _, sql in REPORT_QUERIES]
+        finally:
+            conn.close()
+
+    lines = [
+        f"# Index report for {db_path}",
+        "",
+        "| Question | Without (ms) | With (ms) | Speed-up |",
+        "|---|---:|---:|---:|",
+    ]
+    for (question, _), (_, before), (_, after) in zip(REPORT_QUERIES, without, with_indexes, strict=True):
+        lines.append(f"| {question} | {before:.2f} | {after:.2f} | {before / max(after, 1e-6):.1f}x |")
+    lines.append("")
+    for (question, sql), (plan_before, _), (plan_after, _) in zip(REPORT_QUERIES, without, with_indexes, strict=True):
+        lines.extend([f"## {question}", "", f"`{sql}`", "", "Without indexes:"])
+        lines.extend(f"    {step}" for step in plan_before)
+        lines.append("With indexes:")
+        lines.extend(f"    {step}" for step in plan_after)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create the financial database indexes or report on their effect.")
+    parser.add_argument("db_path", type=Path, help="Path to financial_data.db")
+    parser.add_argument("--report", action="store_true", help="Print a with/without index comparison instead")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per query in the report")
+    args = parser.parse_args()
+
+    if args.report:
+        print(build_report(args.db_path, args.runs))
+        return
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        created = create_indexes(conn)
+        optimize(conn)
+    finally:
+        conn.close()
+    print(f"✅ Created indexes: {', '.join(created) or 'none (already present)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import json
+import re
+from typing import Optional
+
+from FinancialData import FinancialData
+
+CONFIDENCE_THRESHOLD = 0.8
+
+_BOOK_PATTERN = re.compile(r"\bbook\s*(?:id\s*)?[:#]?\s*(B\d{4})\b", re.IGNORECASE)
+_DATE_PATTERN = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_TOP_PATTERN = re.compile(r"\btop\s+(\d{1,3})\b", re.IGNORECASE)
+
+# Intent -> keyword patterns that must all match
+_INTENT_PATTERNS = {
+    "journal_entries": [re.compile(r"\bjournals?\b|\bjournal\s+entr(y|ies)\b|\bentries\b", re.IGNORECASE)],
+    "balances": [re.compile(r"\bbalances?\b", re.IGNORECASE)],
+    "book_details": [re.compile(r"\bdetails?\b|\binfo(rmation)?\b|\babout\b", re.IGNORECASE)],
+    "latest_summary": [
+        re.compile(r"\bsummary\b|\btotals?\b|\boverview\b", re.IGNORECASE),
+        re.compile(r"\bbalances?\b", re.IGNORECASE),
+        re.compile(r"\blatest\b|\bmost recent\b|\btoday\b", re.IGNORECASE),
+    ],
+    "top_books": [
+        re.compile(r"\btop\s+\d{1,3}\b", re.IGNORECASE),
+        re.compile(r"\bbooks?\b", re.IGNORECASE),
+        re.compile(r"\bbalances?\b", re.IGNORECASE),
+    ],
+}
+# Phrases that mean the user wants more than a lookup; the agent handles those
+_AGENT_ONLY_PATTERN = re.compile(
+    r"\b(chart|graph|plot|visuali[sz]e|trend|compare|comparison|why|explain|predict|forecast|"
+    r"not working|error|issue|problem|help me|handbook|policy|translate)\b",
+    re.IGNORECASE,
+)
+# Aggregates, rankings and year filters; the templates return rows as stored, not computed over them
+_AGGREGATE_PATTERN = re.compile(
+    r"\b(highest|lowest|largest|smallest|biggest|max(imum)?|min(imum)?|how many|count|number of|totals?|sum|"
+    r"average|avg|mean|median|trend|(per|by|each) (day|week|month|quarter|year)|(19|20)\d{2})\b",
+    re.IGNORECASE,
+)
+
+
+class Intent:
+    """A recognized question shape with the parameters pulled out of the text."""
+
+    def __init__(self, name: str, params: dict, confidence: float) -> None:
+        self.name = name
+        self.params = params
+        self.confidence = confidence
+
+    def __repr__(self) -> str:
+        return f"Intent({self.name!r}, {self.params!r}, confidence={self.confidence:.2f})"
+
+
+def to_markdown_table(columns: list[str], rows: list[list]) -> str:
+    def cell(value: object) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            return f"{value:,.2f}"
+        return str(value).replace("|", "\\|")
+
+    lines = [f"| {' | '.join(columns)} |", f"|{'|'.join('---' for _ in columns)}|"]
+    lines.extend(f"| {' | '.join(cell(value) for value in row)} |" for row in rows)
+    return "\n".join(lines)
+
+
+class IntentRouter:
+    """Answer known question shapes locally, without an Agent Service round trip.
+
+    A keyword classifier recognizes a handful of templates (book details, journal entries,
+    balances, latest summary, top books), extracts the book ID and dates, runs the matching
+    FinancialData fast-path tool and renders the result as a Markdown table. Anything it is
+    not confident about, including questions asking for an aggregate, ranking or year over
+    those rows, is left to the agent.
+    """
+
+    def __init__(self, financial_data: FinancialData, threshold: float = CONFIDENCE_THRESHOLD) -> None:
+        self.financial_data = financial_data
+        self.threshold = threshold
+
+    def classify(self, text: str) -> Optional[Intent]:
+        matched = [name for name, patterns in _INTENT_PATTERNS.items() if all(p.search(text) for p in patterns)]
+        if not matched:
+            return None
+
+        book_ids = {book_id.upper() for book_id in _BOOK_PATTERN.findall(text)}
+        dates = _DATE_PATTERN.findall(text)
+        params: dict = {}
+
+        # The more specific templates win when several match
+        if "top_books" in matched:
+            name = "top_books"
+            params["top_n"] = int(_TOP_PATTERN.search(text).group(1))
+        elif "latest_summary" in matched and not book_ids:
+            name = "latest_summary"
+        elif book_ids and "journal_entries" in matched:
+            name = "journal_entries"
+        elif book_ids and "balances" in matched:
+            name = "balances"
+        elif book_ids and "book_details" in matched:
+            name = "book_details"
+        else:
+            return None
+
+        confidence = 0.95
+        if name in {"journal_entries", "balances", "book_details"}:
+            if len(book_ids) != 1:
+                return None
+            params["book_id"] = book_ids.pop()
+        if name in {"journal_entries", "balances"}:
+            if len(dates) > 2:
+                confidence -= 0.3
+            if dates:
+                params["from_date"] = min(dates)
+                params["to_date"] = max(dates) if len(dates) > 1 else ""
+        # Competing templates or agent-only phrasing make a local answer less likely to be right
+        confidence -= 0.1 * (len(matched) - 1)
+        if _AGENT_ONLY_PATTERN.search(text):
+            confidence -= 0.5
+        # Full dates are parameters, not year filters
+        aggregates = {match.group(0).lower() for match in _AGGREGATE_PATTERN.finditer(_DATE_PATTERN.sub(" ", text))}
+        if name == "latest_summary":
+            # The summary template reports the totals itself
+            aggregates -= {"total", "totals"}
+        if aggregates:
+            confidence -= 0.5
+        return Intent(name, params, confidence)
+
+    async def answer(self, text: str) -> Optional[str]:
+        """Return a Markdown answer for a confidently recognized question, or None to use the agent."""
+        intent = self.classify(text)
+        if intent is None or intent.confidence < self.threshold:
+            return None
+
+        fd = self.financial_data
+        if intent.name == "book_details":
+            title = f"Details for book {intent.params['book_id']}"
+            result = await fd.get_book_details(intent.params["book_id"])
+        elif intent.name == "journal_entries":
+            title = f"Journal entries for book {intent.params['book_id']}"
+            result = await fd.get_journal_entries(**intent.params)
+        elif intent.name == "balances":
+            title = f"Balances for book {intent.params['book_id']}"
+            result = await fd.get_balances(**intent.params)
+        elif intent.name == "top_books":
+            title = f"Top {intent.params['top_n']} books by balance"
+            result = await fd.get_latest_balance_summary(top_n=intent.params["top_n"])
+        else:
+            title = "Balance summary"
+            result = await fd.get_latest_balance_summary()
+
+        return self._render(title, json.loads(result))
+
+    def _render(self, title: str, result: object) -> Optional[str]:
+        if isinstance(result, str):
+            return f"**{title}**\n\n{result}"
+        if "columns" not in result:
+            # A failed tool call; let the agent deal with it
+            return None
+
+        parts = [f"**{title}**"]
+        if "latest_date" in result:
+            parts[0] += f" for {result['latest_date']}"
+        if result.get("summary"):
+            parts.append(to_markdown_table(list(result["summary"]), [list(result["summary"].values())]))
+        parts.append(to_markdown_table(result["columns"], result["data"]))
+        if result.get("page"):
+            parts.append(f"_Page {result['page']}, {result['page_size']} entries per page._")
+        return "\n\n".join(parts)
@@ -0,0 +1,605 @@
+import argparse
+import csv
+import gzip
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+import numpy as np
+
+from bulk_loader import BulkLoader, format_report
+from compact_schema import create_compact_schema, insert_journal_entries
+from rollups import ROLLUP_TABLES, build_rollups
+
+BOOKS_CSV = "books.csv"
+JOURNALS_CSV = "journal_entries.csv"
+BALANCES_CSV = "balance_records.csv"
+SQLITE_DB = "financial_data.db"
+
+# Rows generated and written at a time; memory use depends on this, not on the dataset size
+CHUNK_SIZE = 50_000
+COMPRESSIONS = ("none", "gzip", "zstd")
+DEFAULT_SEED = 42
+# Fixed default for the newest entry date, so a seed always produces the same dataset
+DEFAULT_END_DATE = "2025-06-30"
+
+BOOK_COLUMNS = ("SAP_BOOK_ID", "Bookname", "systementity")
+JOURNAL_COLUMNS = (
+    "DOCUMENT_NUMBER",
+    "SAP_BOOK_ID",
+    "SAP_BOOK_NAME",
+    "COST_CENTER",
+    "TRANSACTION_CURRENCY",
+    "VALUE",
+    "ENTRY_DATE",
+    "POSTING_DATE",
+    "USERNAME",
+    "TRANSACTION_TYPE",
+    "POSTED_BY",
+    "APPROVED_BY",
+    "CREATED_TIMESTAMP",
+    "UPDATED_TIMESTAMP",
+    "SOURCE_SYSTEM",
+    "REMARKS",
+)
+BALANCE_COLUMNS = ("SAP_BOOK_ID", "DATE", "TOTAL_JOURNALS", "LAST_UPDATED_BY", "BALANCE", "DAILY_CHANGE")
+
+BOOK_NAME_SAMPLES = ["General Ledger", "Accounts Payable", "Accounts Receivable", "Fixed Assets", "Inventory"]
+SYSTEM_ENTITIES = ["SAP", "Oracle", "NetSuite", "Dynamics", "QuickBooks"]
+
+# Value pools the columns are drawn from by index, as object arrays so a draw is one take()
+TRANSACTION_TYPES = np.array(["Credit", "Debit", "Transfer"], dtype=object)
+REMARKS_SAMPLES = np.array(["Monthly accrual", "Correction", "Initial entry", "Reclassification"], dtype=object)
+COST_CENTERS = np.array([f"CC{i}" for i in range(1000, 10000)], dtype=object)
+USERS = np.array([f"user_{i}" for i in range(1, 51)], dtype=object)
+POSTERS = USERS[:20]
+BALANCE_UPDATERS = USERS[:10]
+APPROVERS = np.array([f"manager_{i}" for i in range(1, 6)], dtype=object)
+APPROVAL_MISSING_RATE = 0.3
+MIN_VALUE_CENTS = 10_000
+MAX_VALUE_CENTS = 1_000_000
+MAX_POSTING_DELAY_DAYS = 3
+
+BOOKS_DDL = """
+CREATE TABLE IF NOT EXISTS books (
+    SAP_BOOK_ID TEXT PRIMARY KEY,
+    Bookname TEXT,
+    systementity TEXT
+)
+"""
+JOURNALS_DDL = """
+CREATE TABLE IF NOT EXISTS journal_entries (
+    DOCUMENT_NUMBER TEXT PRIMARY KEY,
+    SAP_BOOK_ID TEXT,
+    SAP_BOOK_NAME TEXT,
+    COST_CENTER TEXT,
+    TRANSACTION_CURRENCY TEXT,
+    VALUE REAL,
+    ENTRY_DATE TEXT,
+    POSTING_DATE TEXT,
+    USERNAME TEXT,
+    TRANSACTION_TYPE TEXT,
+    POSTED_BY TEXT,
+    APPROVED_BY TEXT,
+    CREATED_TIMESTAMP TEXT,
+    UPDATED_TIMESTAMP TEXT,
+    SOURCE_SYSTEM TEXT,
+    REMARKS TEXT,
+    FOREIGN KEY(SAP_BOOK_ID) REFERENCES books(SAP_BOOK_ID)
+)
+"""
+BALANCES_DDL = """
+CREATE TABLE IF NOT EXISTS balance_records (
+    SAP_BOOK_ID TEXT,
+    DATE TEXT,
+    TOTAL_JOURNALS INTEGER,
+    LAST_UPDATED_BY TEXT,
+    BALANCE REAL,
+    DAILY_CHANGE REAL,
+    PRIMARY KEY (SAP_BOOK_ID, DATE),
+    FOREIGN KEY(SAP_BOOK_ID) REFERENCES books(SAP_BOOK_ID)
+)
+"""
+
+
+def _rng(seed: int, *stream: int) -> np.random.Generator:
+    # Every (day, chunk) gets its own stream, so a day's rows do not depend on the days generated before it
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=stream))
+
+
+def generate_books(count: int, seed: int = DEFAULT_SEED) -> list[tuple]:
+    rng = _rng(seed)
+    names = rng.integers(0, len(BOOK_NAME_SAMPLES), count)
+    suffixes = rng.integers(1, 11, count)
+    systems = rng.integers(0, len(SYSTEM_ENTITIES), count)
+    return [
+        (f"B{str(i + 1).zfill(4)}", f"{BOOK_NAME_SAMPLES[names[i]]} {suffixes[i]}", SYSTEM_ENTITIES[systems[i]])
+        for i in range(count)
+    ]
+
+
+class JournalChunk:
+    """Up to chunk_size journal rows of one entry date, held as NumPy columns."""
+
+    def __init__(self, entry_date: str, day: int, columns: dict[str, np.ndarray], book_index: np.ndarray) -> None:
+        self.entry_date = entry_date
+        self.day = day
+        self.columns = columns
+        # Position of each row's book in the book list, for the balance aggregation
+        self.book_index = book_index
+
+    def __len__(self) -> int:
+        return len(self.book_index)
+
+    def rows(self) -> list[tuple]:
+        """Rows as tuples in JOURNAL_COLUMNS order, the shape csv and executemany take."""
+        return list(zip(*(self.columns[name].tolist() for name in JOURNAL_COLUMNS), strict=True))
+
+    def to_batch(self, book_count: int, render_csv: bool = False) -> "JournalBatch":
+        # Integer cents keep the balance totals exact however many rows are folded in
+        cents = np.rint(self.columns["VALUE"] * 100).astype(np.int64)
+        batch = JournalBatch(
+            self.entry_date,
+            self.day,
+            self.rows(),
+            np.bincount(self.book_index, weights=cents, minlength=book_count).astype(np.int64),
+            np.bincount(self.book_index, minlength=book_count),
+        )
+        if render_csv:
+            batch.csv_text()
+        return batch
+
+
+class JournalBatch:
+    """A chunk in the form the sinks write: row tuples, optionally pre-rendered CSV text, and the
+    chunk's per-book value and row counts for the balances. Small enough to pickle between processes.
+    """
+
+    def __init__(self, entry_date: str, day: int, rows: list[tuple], cents: np.ndarray, counts: np.ndarray) -> None:
+        self.entry_date = entry_date
+        self.day = day
+        self.rows = rows
+        self.cents = cents
+        self.counts = counts
+        self._csv_text: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def csv_text(self) -> str:
+        if self._csv_text is None:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(self.rows)
+            self._csv_text = buffer.getvalue()
+        return self._csv_text
+
+
+def generate_chunk(
+    books: list[tuple],
+    day: int,
+    chunk_number: int,
+    entries_per_day: int,
+    end_date: date,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = CHUNK_SIZE,
+) -> JournalChunk:
+    """Build one chunk of the day `day` days before end_date, drawing a whole column at a time.
+
+    The output depends only on the arguments: document numbers come from the day and row position,
+    and the random stream from (seed, day, chunk number).
+    """
+    book_ids = np.array([book[0] for book in books], dtype=object)
+    book_names = np.array([book[1] for book in books], dtype=object)
+    book_systems = np.array([book[2] for book in books], dtype=object)
+
+    entry_date_dt = end_date - timedelta(days=day)
+    entry_date = entry_date_dt.strftime("%Y%m%d")
+    posting_dates = np.array(
+        [(entry_date_dt + timedelta(days=delay)).strftime("%Y%m%d") for delay in range(MAX_POSTING_DELAY_DAYS + 1)],
+        dtype=object,
+    )
+    day_start = np.datetime64(entry_date_dt.isoformat(), "s")
+
+    first = chunk_number * chunk_size
+    size = min(chunk_size, entries_per_day - first)
+    rng = _rng(seed, day, chunk_number)
+
+    book_index = rng.integers(0, len(books), size)
+    value_cents = rng.integers(MIN_VALUE_CENTS, MAX_VALUE_CENTS + 1, size)
+    approved_by = APPROVERS.take(rng.integers(0, len(APPROVERS), size))
+    approved_by[rng.random(size) < APPROVAL_MISSING_RATE] = None
+    created = day_start + rng.integers(0, 86_400, size).astype("timedelta64[s]")
+    updated = created + rng.integers(0, 3_600, size).astype("timedelta64[s]")
+    document_base = day * entries_per_day + first + 1
+
+    columns = {
+        "DOCUMENT_NUMBER": np.array(
+            [f"DOC{entry_date}{str(number).zfill(6)}" for number in range(document_base, document_base + size)],
+            dtype=object,
+        ),
+        "SAP_BOOK_ID": book_ids.take(book_index),
+        "SAP_BOOK_NAME": book_names.take(book_index),
+        "COST_CENTER": COST_CENTERS.take(rng.integers(0, len(COST_CENTERS), size)),
+        "TRANSACTION_CURRENCY": np.full(size, "USD", dtype=object),
+        "VALUE": value_cents / 100,
+        "ENTRY_DATE": np.full(size, entry_date, dtype=object),
+        "POSTING_DATE": posting_dates.take(rng.integers(0, len(posting_dates), size)),
+        "USERNAME": USERS.take(rng.integers(0, len(USERS), size)),
+        "TRANSACTION_TYPE": TRANSACTION_TYPES.take(rng.integers(0, len(TRANSACTION_TYPES), size)),
+        "POSTED_BY": POSTERS.take(rng.integers(0, len(POSTERS), size)),
+        "APPROVED_BY": approved_by,
+        "CREATED_TIMESTAMP": np.datetime_as_string(created, unit="s").astype(object),
+        "UPDATED_TIMESTAMP": np.datetime_as_string(updated, unit="s").astype(object),
+        "SOURCE_SYSTEM": book_systems.take(book_index),
+        "REMARKS": REMARKS_SAMPLES.take(rng.integers(0, len(REMARKS_SAMPLES), size)),
+    }
+    return JournalChunk(entry_date, day, columns, book_index)
+
+
+def chunk_tasks(days: int, entries_per_day: int, chunk_size: int, first_day: int = 0) -> Iterator[tuple[int, int]]:
+    """(day, chunk number) pairs in output order: newest date first, chunks of a day in row order."""
+    chunks_per_day = -(-entries_per_day // chunk_size)
+    for day in range(first_day, first_day + days):
+        for chunk_number in range(chunks_per_day):
+            yield day, chunk_number
+
+
+def generate_journal_chunks(
+    books: list[tuple],
+    days: int,
+    entries_per_day: int,
+    end_date: date,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = CHUNK_SIZE,
+    first_day: int = 0,
+) -> Iterator[JournalChunk]:
+    """Yield journal chunks for days first_day .. first_day + days - 1, newest date first.
+
+    Chunks never span two dates.
+    """
+    for day, chunk_number in chunk_tasks(days, entries_per_day, chunk_size, first_day):
+        yield generate_chunk(books, day, chunk_number, entries_per_day, end_date, seed, chunk_size)
+
+
+class BalanceAccumulator:
+    """Merges the per-book partial totals of journal batches into balances for the date being written.
+
+    Batches arrive date by date, whichever process built them, so once a date is finished its
+    balances are final and can be flushed; only one array of totals per book is held at a time.
+    """
+
+    def __init__(self, books: list[tuple], seed: int = DEFAULT_SEED) -> None:
+        self.books = books
+        self.seed = seed
+        self._date: Optional[str] = None
+        self._day: Optional[int] = None
+        self._cents = np.zeros(len(books), dtype=np.int64)
+        self._counts = np.zeros(len(books), dtype=np.int64)
+
+    def add(self, batch: JournalBatch) -> None:
+        self._date, self._day = batch.entry_date, batch.day
+        self._cents += batch.cents
+        self._counts += batch.counts
+
+    def flush(self) -> list[tuple]:
+        """Return balance rows in BALANCE_COLUMNS order for the current date, and reset."""
+        if self._date is None:
+            return []
+        present = np.flatnonzero(self._counts)
+        updaters = BALANCE_UPDATERS.take(_rng(self.seed, self._day).integers(0, len(BALANCE_UPDATERS), len(present)))
+        balances = [
+            (
+                self.books[index][0],
+                self._date,
+                int(self._counts[index]),
+                updater,
+                int(self._cents[index]) / 100,
+                round(int(self._cents[index]) / 100 / int(self._counts[index]), 2),
+            )
+            for index, updater in zip(present.tolist(), updaters.tolist(), strict=True)
+        ]
+        self._cents[:] = 0
+        self._counts[:] = 0
+        self._date = self._day = None
+        return balances
+
+
+def open_csv(path: Path, compression: str = "none") -> TextIO:
+    """Open a CSV file for writing, compressed on the fly when asked (.gz or .zst is added to the name)."""
+    if compression == "gzip":
+        # mtime=0 keeps the header, and so the whole file, identical between runs
+        compressed = gzip.GzipFile(path.with_name(f"{path.name}.gz"), "wb", compresslevel=6, mtime=0)
+        return io.TextIOWrapper(compressed, newline="", encoding="utf-8")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("zstd compression needs the zstandard package: pip install zstandard") from e
+        raw = path.with_name(f"{path.name}.zst").open("wb")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), newline="", encoding="utf-8")
+    return path.open("w", newline="", encoding="utf-8")
+
+
+class CsvSink:
+    """Appends books, journal and balance rows to their CSV files as chunks arrive."""
+
+    def __init__(self, directory: Path, compression: str = "none") -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self._files: dict[str, TextIO] = {}
+        try:
+            for name, csv_name, columns in (
+                ("books", BOOKS_CSV, BOOK_COLUMNS),
+                ("journals", JOURNALS_CSV, JOURNAL_COLUMNS),
+                ("balances", BALANCES_CSV, BALANCE_COLUMNS),
+            ):
+                self._files[name] = open_csv(directory / csv_name, compression)
+                csv.writer(self._files[name]).writerow(columns)
+        except BaseException:
+            self.close()
+            raise
+
+    def write_books(self, rows: list[tuple]) -> None:
+        csv.writer(self._files["books"]).writerows(rows)
+
+    def write_journals(self, batch: JournalBatch) -> None:
+        # Rendered by the worker process in a parallel run
+        self._files["journals"].write(batch.csv_text())
+
+    def write_balances(self, rows: list[tuple]) -> None:
+        csv.writer(self._files["balances"]).writerows(rows)
+
+    def finish(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for file in self._files.values():
+            file.close()
+
+
+class SqliteSink:
+    """Inserts chunks into the financial database through a BulkLoader, then builds rollups and indexes once."""
+
+    def __init__(self, db_path: Path, compact: bool = False) -> None:
+        self.compact = compact
+        self.loader = BulkLoader(db_path)
+        conn = self.loader.conn
+        try:
+            conn.execute(BOOKS_DDL)
+            if compact:
+                create_compact_schema(conn)
+            else:
+                conn.execute(JOURNALS_DDL)
+            conn.execute(BALANCES_DDL)
+        except BaseException:
+            self.loader.close()
+            raise
+
+    def write_books(self, rows: list[tuple]) -> None:
+        self.loader.insert("books", BOOK_COLUMNS, rows)
+
+    def write_journals(self, batch: JournalBatch) -> None:
+        if self.compact:
+            self.loader.begin()
+            insert_journal_entries(self.loader.conn, JOURNAL_COLUMNS, batch.rows)
+            self.loader.count("journal_entries", len(batch.rows))
+        else:
+            self.loader.insert("journal_entries", JOURNAL_COLUMNS, batch.rows)
+
+    def write_balances(self, rows: list[tuple]) -> None:
+        self.loader.insert("balance_records", BALANCE_COLUMNS, rows)
+
+    def finish(self) -> None:
+        """Commit the load and build rollups and indexes; only for a run that wrote every row."""
+        try:
+            self.loader.commit()
+            build_rollups(self.loader.conn)
+            print(f"✅ Rollup tables built: {', '.join(ROLLUP_TABLES)}")
+        except BaseException:
+            self.loader.close()
+            raise
+        # Indexes are built after the bulk load, then the planner statistics refreshed and the file compacted
+        report = self.loader.finish()
+        print(f"✅ Indexes created: {', '.join(report['indexes_created'])}")
+        print(format_report(report, "SQLite bulk load"))
+
+    def close(self) -> None:
+        """Let go of the database without the finishing steps, e.g. after a failed run."""
+        self.loader.close()
+
+
+# Set in each worker process by _init_worker: (books, entries_per_day, end_date, seed, chunk_size, render_csv)
+_worker_config: Optional[tuple] = None
+
+
+def _init_worker(*config: object) -> None:
+    global _worker_config
+    _worker_config = config
+
+
+def _build_batch(task: tuple[int, int]) -> JournalBatch:
+    books, entries_per_day, end_date, seed, chunk_size, render_csv = _worker_config
+    day, chunk_number = task
+    chunk = generate_chunk(books, day, chunk_number, entries_per_day, end_date, seed, chunk_size)
+    return chunk.to_batch(len(books), render_csv)
+
+
+def generate_batches(
+    books: list[tuple],
+    days: int,
+    entries_per_day: int,
+    end_date: date,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int = 1,
+    render_csv: bool = False,
+) -> Iterator[JournalBatch]:
+    """Yield journal batches in output order, built in this process or across a pool of workers.
+
+    Workers take (day, chunk) tasks in date order and their batches come back through the
+    executor's result queue; the caller is the single writer. At most two batches per worker
+    are in flight, which bounds memory when the writer is the slower side, and consuming them
+    in submission order makes the output identical to a single-process run.
+    """
+    tasks = chunk_tasks(days, entries_per_day, chunk_size)
+    if workers <= 1:
+        for day, chunk_number in tasks:
+            yield generate_chunk(books, day, chunk_number, entries_per_day, end_date, seed, chunk_size).to_batch(
+                len(books), render_csv
+            )
+        return
+
+    config = (books, entries_per_day, end_date, seed, chunk_size, render_csv)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=config) as pool:
+        pending: deque = deque()
+        try:
+            for task in tasks:
+                pending.append(pool.submit(_build_batch, task))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _close_sinks(sinks: list) -> None:
+    """Close every sink without its finishing steps; one that fails to close does not keep the others open."""
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as error:
+            print(f"⚠️ Could not close {type(sink).__name__}: {error}")
+
+
+def generate(
+    db_path: Path = Path(SQLITE_DB),
+    csv_dir: Path = Path(),
+    books: int = 100,
+    days: int = 1000,
+    entries_per_day: int = 1000,
+    seed: int = DEFAULT_SEED,
+    end_date: str = DEFAULT_END_DATE,
+    chunk_size: int = CHUNK_SIZE,
+    compression: str = "none",
+    compact: bool = False,
+    write_csv: bool = True,
+    write_db: bool = True,
+    workers: int = 1,
+) -> dict:
+    """Stream a synthetic ledger to the CSV files and the SQLite DB in one pass; returns run statistics.
+
+    The same arguments always produce the same rows, whatever the number of workers.
+    """
+    start = time.perf_counter()
+    sinks = []
+    journal_count = balance_count = 0
+    write_seconds = 0.0
+    try:
+        # Opened inside the try, so the sinks already open are closed when a later one fails to open
+        if write_db:
+            sinks.append(SqliteSink(db_path, compact))
+        if write_csv:
+            sinks.append(CsvSink(csv_dir, compression))
+
+        book_records = generate_books(books, seed)
+        for sink in sinks:
+            sink.write_books(book_records)
+
+        balances = BalanceAccumulator(book_records, seed)
+        last = datetime.strptime(end_date, "%Y-%m-%d").date()
+        current_date = None
+        batches = generate_batches(
+            book_records, days, entries_per_day, last, seed, chunk_size, workers, render_csv=write_csv
+        )
+        for batch in batches:
+            write_start = time.perf_counter()
+            if current_date is not None and batch.entry_date != current_date:
+                balance_rows = balances.flush()
+                for sink in sinks:
+                    sink.write_balances(balance_rows)
+                balance_count += len(balance_rows)
+            current_date = batch.entry_date
+            for sink in sinks:
+                sink.write_journals(batch)
+            balances.add(batch)
+            journal_count += len(batch)
+            write_seconds += time.perf_counter() - write_start
+
+        balance_rows = balances.flush()
+        for sink in sinks:
+            sink.write_balances(balance_rows)
+        balance_count += len(balance_rows)
+
+        # Rollups, indexes and statistics only for a complete run, so a partial ledger never looks finished
+        for sink in sinks:
+            sink.finish()
+    except BaseException:
+        _close_sinks(sinks)
+        raise
+
+    elapsed = time.perf_counter() - start
+    return {
+        "books": len(book_records),
+        "journal_entries": journal_count,
+        "balance_records": balance_count,
+        "workers": workers,
+        "seconds": elapsed,
+        # Share of the run the single writer was busy; near 1.0 means more workers will not help
+        "writer_utilization": write_seconds / elapsed if elapsed else 0.0,
+        "rows_per_second": journal_count / elapsed if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the sample financial data as CSV files and a SQLite DB.")
+    parser.add_argument("--db", type=Path, default=Path(SQLITE_DB), help="SQLite database to create or extend")
+    parser.add_argument("--csv-dir", type=Path, default=Path(), help="Directory for the CSV files")
+    parser.add_argument("--no-csv", action="store_true", help="Only write the SQLite database")
+    parser.add_argument("--no-db", action="store_true", help="Only write the CSV files")
+    parser.add_argument("--books", type=int, default=100)
+    parser.add_argument("--days", type=int, default=1000)
+    parser.add_argument("--entries-per-day", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Same seed and sizes, same dataset")
+    parser.add_argument("--end-date", default=DEFAULT_END_DATE, help="Newest entry date, YYYY-MM-DD")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows generated and written at a time")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Generator processes feeding the single writer"
+    )
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="none", help="Compress the CSV files")
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Store journal entries with integer dates, integer cents and lookup tables behind a journal_entries view",
+    )
+    args = parser.parse_args()
+
+    stats = generate(
+        db_path=args.db,
+        csv_dir=args.csv_dir,
+        books=args.books,
+        days=args.days,
+        entries_per_day=args.entries_per_day,
+        seed=args.seed,
+        end_date=args.end_date,
+        chunk_size=args.chunk_size,
+        compression=args.compression,
+        compact=args.compact,
+        write_csv=not args.no_csv,
+        write_db=not args.no_db,
+        workers=args.workers,
+    )
+    print(
+        f"✅ {stats['journal_entries']:,} journal entries and {stats['balance_records']:,} balance records "
+        f"in {stats['seconds']:.1f}s ({stats['rows_per_second']:,.0f} rows/s, {stats['workers']} workers, "
+        f"writer busy {stats['writer_utilization']:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ from azure.identity import DefaultAzureCredential
 from dotenv import load_dotenv
 
 from FinancialData import FinancialData
+from intent_router import IntentRouter
+from resource_janitor import ResourceJanitor, format_reclaim_report
 from stream_event_handler import StreamEventHandler
 from terminal_colors import TerminalColors as tc
 from utilities import Utilities
@@ -43,16 +45,22 @@ INSTRUCTIONS_FILE = None
 toolset = AsyncToolSet()
 utilities = Utilities()
 FinancialData = FinancialData(utilities)
+intent_router = IntentRouter(FinancialData)
 
 
 project_client = AIProjectClient.from_connection_string(
     credential=DefaultAzureCredential(),
     conn_str=PROJECT_CONNECTION_STRING,
 )
+janitor = ResourceJanitor(project_client)
 
 functions = AsyncFunctionTool(
     {
         FinancialData.async_fetch_data_using_sqlite_query,
+        FinancialData.get_book_details,
+        FinancialData.get_journal_entries,
+        FinancialData.get_balances,
+        FinancialData.get_latest_balance_summary,
     }
 )
 
@@ -144,16 +152,26 @@ async def initialize() -> tuple[Agent, AgentThread]:
 async def cleanup(agent: Agent, thread: AgentThread) -> None:
     """Cleanup the resources."""
     existing_files = await project_client.agents.list_files()
-    for f in existing_files.data:
-        await project_client.agents.delete_file(f.id)
-    await project_client.agents.delete_thread(thread.id)
-    await project_client.agents.delete_agent(agent.id)
+    resources = [("file", f.id) for f in existing_files.data]
+    resources += [("thread", thread.id), ("agent", agent.id)]
+    # Deleted concurrently, with retries for throttling
+    report = await janitor.delete(resources)
+    print(format_reclaim_report(report))
     await FinancialData.close()
 
 
 async def post_message(thread_id: str, content: str, agent: Agent, thread: AgentThread) -> None:
     """Post a message to the Foundry Agent Service."""
     try:
+        # Known question shapes are answered locally, without an agent run
+        local_answer = await intent_router.answer(content)
+        if local_answer:
+            utilities.log_msg_green(local_answer)
+            # The thread still gets the turn, so the agent knows what the next question follows up on
+            await project_client.agents.create_message(thread_id=thread_id, role="user", content=content)
+            await project_client.agents.create_message(thread_id=thread_id, role="assistant", content=local_answer)
+            return
+
         await project_client.agents.create_message(
             thread_id=thread_id,
             role="user",
@@ -174,6 +192,10 @@ async def post_message(thread_id: str, content: str, agent: Agent, thread: Agent
 
         async with stream as s:
             await s.until_done()
+    except asyncio.CancelledError:
+        # Ctrl+C cancels the turn; a running tool query is interrupted by FinancialData on the way out
+        utilities.log_msg_purple("The request was cancelled.")
+        raise
     except Exception as e:
         utilities.log_msg_purple(
             f"An error occurred posting the message: {e!s}")
@@ -0,0 +1,291 @@
+import argparse
+import re
+import sqlite3
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+from compact_schema import is_compact
+from db_indexes import create_indexes, optimize
+from snapshot_manager import SnapshotManager
+
+PARTITION_DIR = "partitions"
+PARTITION_TABLE = "journal_partitions"
+# Cold partitions listed in the main database; each file holds one period of journal_entries
+PARTITION_DDL = f"""
+CREATE TABLE IF NOT EXISTS {PARTITION_TABLE} (
+    NAME TEXT PRIMARY KEY,
+    FILE TEXT NOT NULL,
+    FIRST_DATE TEXT NOT NULL,
+    LAST_DATE TEXT NOT NULL,
+    ROWS INTEGER NOT NULL
+)
+"""
+# Period key length in YYYYMMDD digits
+GRANULARITIES = {"year": 4, "month": 6}
+
+_DATE_LITERAL = r"'(\d{4}-?\d{2}-?\d{2})'"
+_COMPARISON_PATTERN = re.compile(rf"(?<![\w.])(?:\w+\.)?ENTRY_DATE\s*(>=|<=|>|<|=)\s*{_DATE_LITERAL}", re.IGNORECASE)
+_BETWEEN_PATTERN = re.compile(
+    rf"(?<![\w.])(?:\w+\.)?ENTRY_DATE\s+BETWEEN\s+{_DATE_LITERAL}\s+AND\s+{_DATE_LITERAL}", re.IGNORECASE
+)
+_WHERE_PATTERN = re.compile(
+    r"\bwhere\b(.*?)(?:\bgroup\s+by\b|\bhaving\b|\border\s+by\b|\blimit\b|\bwindow\b|$)", re.IGNORECASE | re.DOTALL
+)
+_SELECT_PATTERN = re.compile(r"\bselect\b", re.IGNORECASE)
+# Anything that could make a date comparison something other than a plain conjunct of the WHERE clause
+_UNSAFE_PATTERN = re.compile(r"\b(or|case|union|intersect|except|not(?!\s+null))\b", re.IGNORECASE)
+_TABLE_PATTERN = re.compile(
+    r"(?<![\w.])journal_entries\b(?:\s+(?:as\s+)?(?!(?:where|group|order|limit|join|left|right|full|inner|cross|"
+    r"natural|on|using|having|window|union|indexed|not)\b)(\w+))?",
+    re.IGNORECASE,
+)
+
+
+class PartitionError(Exception):
+    """Raised when journals cannot be split into partitions."""
+
+
+class Partition:
+    """One cold period of journal entries in its own database file."""
+
+    def __init__(self, name: str, path: Path, first_date: str, last_date: str, rows: int) -> None:
+        self.name = name
+        self.path = path
+        # YYYYMMDD digits, whatever the date style of the data
+        self.first_date = first_date
+        self.last_date = last_date
+        self.rows = rows
+
+    def overlaps(self, lower: Optional[str], upper: Optional[str]) -> bool:
+        return (lower is None or self.last_date >= lower) and (upper is None or self.first_date <= upper)
+
+
+def _digits(value: str) -> str:
+    return value.replace("-", "")
+
+
+def _period_bounds(period: str, iso: bool) -> tuple[str, str]:
+    """First date of the period and first date of the next one, as prefixes in the data's date style."""
+    year, month = int(period[:4]), int(period[4:6] or 0)
+    if not month:
+        return str(year), str(year + 1)
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    separator = "-" if iso else ""
+    return f"{year}{separator}{month:02d}", f"{next_year}{separator}{next_month:02d}"
+
+
+def split_journals(
+    db_path: Path, partition_dir: Path, granularity: str = "year", keep_hot: int = 1
+) -> list[Partition]:
+    """Move all but the latest keep_hot periods of journal_entries into one database file per period.
+
+    The latest periods stay in the main database, where loaders keep appending to them. A
+    partition is written once and never modified afterwards, so it can be compacted, copied
+    and cached on its own; a period is split off only after it is closed.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if is_compact(conn):
+            raise PartitionError("Partitioning supports the text journal_entries layout, not the compact one.")
+        width = GRANULARITIES[granularity]
+        periods = [
+            row[0]
+            for row in conn.execute(
+                f"SELECT DISTINCT substr(replace(ENTRY_DATE, '-', ''), 1, {width}) FROM journal_entries ORDER BY 1"
+            )
+        ]
+        cold = periods[: max(len(periods) - keep_hot, 0)]
+        # Every partition is attached to each pooled connection, so check the limit before writing anything
+        attached = len(cold)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (PARTITION_TABLE,)).fetchone():
+            attached += conn.execute(f"SELECT COUNT(*) FROM {PARTITION_TABLE}").fetchone()[0]
+        limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if attached > limit:
+            raise PartitionError(
+                f"{attached} partitions would be attached but SQLite allows {limit}; "
+                "use coarser partitions or a larger --keep-hot."
+            )
+        conn.execute(PARTITION_DDL)
+
+        sample = conn.execute("SELECT ENTRY_DATE FROM journal_entries LIMIT 1").fetchone()
+        iso = bool(sample and "-" in str(sample[0]))
+        (ddl,) = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'journal_entries'"
+        ).fetchone()
+        partition_dir.mkdir(parents=True, exist_ok=True)
+
+        partitions = []
+        for period in cold:
+            path = partition_dir / f"journal_{period}.db"
+            if path.exists():
+                raise PartitionError(f"{path} already exists; partitions are immutable once written.")
+            lower, upper = _period_bounds(period, iso)
+            conn.execute("ATTACH DATABASE ? AS new_partition", (str(path),))
+            try:
+                with conn:
+                    conn.execute(ddl.replace("journal_entries", "new_partition.journal_entries", 1))
+                    conn.execute(
+                        "INSERT INTO new_partition.journal_entries "
+                        "SELECT * FROM main.journal_entries WHERE ENTRY_DATE >= ? AND ENTRY_DATE < ?",
+                        (lower, upper),
+                    )
+                    rows, first_date, last_date = conn.execute(
+                        "SELECT COUNT(*), MIN(ENTRY_DATE), MAX(ENTRY_DATE) FROM new_partition.journal_entries"
+                    ).fetchone()
+                    conn.execute(
+                        "DELETE FROM main.journal_entries WHERE ENTRY_DATE >= ? AND ENTRY_DATE < ?", (lower, upper)
+                    )
+                    partition = Partition(f"p{period}", path, _digits(first_date), _digits(last_date), rows)
+                    conn.execute(
+                        f"INSERT INTO {PARTITION_TABLE} VALUES (?, ?, ?, ?, ?)",
+                        (partition.name, path.name, partition.first_date, partition.last_date, rows),
+                    )
+            except BaseException:
+                conn.execute("DETACH DATABASE new_partition")
+                path.unlink(missing_ok=True)
+                raise
+            conn.execute("DETACH DATABASE new_partition")
+
+            partition_conn = sqlite3.connect(path)
+            try:
+                create_indexes(partition_conn)
+                optimize(partition_conn)
+                partition_conn.execute("VACUUM")
+            finally:
+                partition_conn.close()
+            partitions.append(partition)
+
+        conn.execute("VACUUM")
+        return partitions
+    finally:
+        conn.close()
+
+
+class PartitionRouter:
+    """Presents the hot journal table and the cold partitions as one journal_entries view.
+
+    attach() runs on every new pooled connection: it attaches each partition read-only and
+    creates a temporary journal_entries view, a UNION ALL of all of them, that shadows the
+    main table for unqualified names. SQLite pushes WHERE clauses into each branch, so every
+    partition is searched through its own indexes. route() goes further for date-bounded
+    queries and rewrites them to read only the partitions whose dates overlap the bounds.
+    """
+
+    def __init__(self, partitions: list[Partition], columns: list[str]) -> None:
+        self.partitions = partitions
+        self.columns = columns
+
+    @classmethod
+    def load(cls, db_file: Path, partition_dir: Path) -> "PartitionRouter":
+        """Read the partition list of a database file; empty for a database that was never split."""
+        conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        try:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (PARTITION_TABLE,)).fetchone():
+                return cls([], [])
+            partitions = [
+                Partition(name, partition_dir / file, first_date, last_date, rows)
+                for name, file, first_date, last_date, rows in conn.execute(
+                    f"SELECT NAME, FILE, FIRST_DATE, LAST_DATE, ROWS FROM {PARTITION_TABLE} ORDER BY FIRST_DATE"
+                )
+            ]
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(journal_entries)")]
+            return cls(partitions, columns)
+        finally:
+            conn.close()
+
+    async def attach(self, conn: aiosqlite.Connection) -> None:
+        if not self.partitions:
+            return
+        for partition in self.partitions:
+            await conn.execute(f"ATTACH DATABASE ? AS {partition.name}", (f"file:{partition.path}?mode=ro",))
+        await conn.execute(f"CREATE TEMP VIEW journal_entries AS {self._union(self.partitions)}")
+
+    def _union(self, partitions: list[Partition]) -> str:
+        columns = ", ".join(self.columns)
+        schemas = ["main", *(partition.name for partition in partitions)]
+        return " UNION ALL ".join(f"SELECT {columns} FROM {schema}.journal_entries" for schema in schemas)
+
+    @staticmethod
+    def date_bounds(sql: str) -> tuple[Optional[str], Optional[str]]:
+        """Entry date bounds a query puts on journal_entries, as YYYYMMDD digits; None where unbounded.
+
+        Only comparisons with date literals that are plain conjuncts of the WHERE clause of a
+        single SELECT count; anything more involved is treated as unbounded.
+        """
+        if len(_SELECT_PATTERN.findall(sql)) != 1:
+            return None, None
+        where = _WHERE_PATTERN.search(sql)
+        if where is None or _UNSAFE_PATTERN.search(where.group(1)):
+            return None, None
+
+        lowers, uppers = [], []
+        for operator, value in _COMPARISON_PATTERN.findall(where.group(1)):
+            if operator in (">", ">=", "="):
+                lowers.append(_digits(value))
+            if operator in ("<", "<=", "="):
+                uppers.append(_digits(value))
+        for low, high in _BETWEEN_PATTERN.findall(where.group(1)):
+            lowers.append(_digits(low))
+            uppers.append(_digits(high))
+        return max(lowers, default=None), min(uppers, default=None)
+
+    def route(self, sql: str, lower: Optional[str | int] = None, upper: Optional[str | int] = None) -> str:
+        """Rewrite a journal query to read only the partitions that can hold matching rows.
+
+        lower and upper are explicit entry date bounds in either date style; without them the
+        bounds are taken from the SQL. Queries the router is not sure about are returned as is
+        and go through the full view.
+        """
+        if not self.partitions or sql.lower().count("journal_entries") != 1:
+            return sql
+        if lower is None and upper is None:
+            lower, upper = self.date_bounds(sql)
+        lower = _digits(str(lower)) if lower else None
+        upper = _digits(str(upper)) if upper and upper != "~" else None
+        if lower is None and upper is None:
+            return sql
+
+        selected = [partition for partition in self.partitions if partition.overlaps(lower, upper)]
+        if len(selected) == len(self.partitions):
+            return sql
+        union = self._union(selected)
+        return _TABLE_PATTERN.sub(lambda match: f"({union}) AS {match.group(1) or 'journal_entries'}", sql, count=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Split closed periods of journal_entries into partition files.")
+    parser.add_argument("db_path", type=Path, help="Path to financial_data.db")
+    parser.add_argument("--granularity", choices=sorted(GRANULARITIES), default="year", help="Period per partition")
+    parser.add_argument("--keep-hot", type=int, default=1, help="Latest periods that stay in the main database")
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Split the current database file itself; only while nothing reads it",
+    )
+    args = parser.parse_args()
+
+    partition_dir = args.db_path.parent / PARTITION_DIR
+    # By default the split goes into a copy of the current snapshot: pools load the partition list only
+    # when they open, and the app opens new pools when a snapshot is published
+    snapshots = SnapshotManager(args.db_path)
+    target = nullcontext(snapshots.current()) if args.in_place else snapshots.build()
+    try:
+        with target as db_path:
+            partitions = split_journals(db_path, partition_dir, args.granularity, args.keep_hot)
+    except PartitionError as error:
+        print(f"❌ {error}")
+        raise SystemExit(1) from None
+    for partition in partitions:
+        print(
+            f"✅ {partition.path.name}: {partition.rows:,} journal entries, "
+            f"{partition.first_date}-{partition.last_date}"
+        )
+    if not partitions:
+        print("Nothing to split: every period is still hot.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Quoted literals and identifiers are kept verbatim; everything else is case/whitespace folded
+_LITERAL_PATTERN = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_DISK_PRUNE_EVERY = 64
+
+
+def normalize_sql(sql: str) -> str:
+    """Fold case and whitespace outside of string literals and drop trailing semicolons."""
+    parts = _LITERAL_PATTERN.split(sql.strip())
+    normalized = []
+    for index, part in enumerate(parts):
+        # split() with a capturing group puts the literals at the odd indexes
+        normalized.append(part if index % 2 else _WHITESPACE_PATTERN.sub(" ", part).lower())
+    return "".join(normalized).strip().rstrip(";").strip()
+
+
+class QueryCache:
+    """LRU + TTL cache of serialized query results, optionally backed by a shared on-disk store.
+
+    Entries are keyed on the normalized SQL together with the database version, so a new
+    database version simply stops matching older entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: float = 600.0,
+        disk_path: Optional[str | Path] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_path = Path(disk_path) if disk_path else None
+
+        # key -> (value, expires_at), most recently used last
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._bytes = 0
+        self._disk: Optional[aiosqlite.Connection] = None
+        self._disk_writes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "oversized": 0,
+        }
+
+    @staticmethod
+    def make_key(sql: str, db_version: str) -> str:
+        return hashlib.sha256(f"{db_version}\n{normalize_sql(sql)}".encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value or None, counting the lookup as a hit or miss."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+            self._remove(key)
+            self._stats["expirations"] += 1
+
+        value = await self._disk_get(key)
+        if value is not None:
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+            self._store(key, value)
+            return value
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        if not self._store(key, value):
+            return
+        await self._disk_set(key, value)
+
+    def invalidate(self) -> None:
+        """Drop every in-memory entry, e.g. after the database changed underneath us."""
+        self._entries.clear()
+        self._bytes = 0
+        self._stats["invalidations"] += 1
+
+    async def close(self) -> None:
+        if self._disk:
+            await self._disk.close()
+            self._disk = None
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+        }
+
+    def _store(self, key: str, value: str) -> bool:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            self._stats["oversized"] += 1
+            return False
+
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+        return True
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0].encode("utf-8"))
+
+    async def _disk_connection(self) -> Optional[aiosqlite.Connection]:
+        if self.disk_path is None:
+            return None
+        if self._disk is None:
+            try:
+                self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+                self._disk = await aiosqlite.connect(self.disk_path)
+                # WAL lets several server processes read and write the store concurrently
+                await self._disk.execute("PRAGMA journal_mode = WAL;")
+                await self._disk.execute("PRAGMA synchronous = NORMAL;")
+                await self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS query_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, expires_at REAL NOT NULL)"
+                )
+                await self._disk.commit()
+            except aiosqlite.Error as e:
+                logger.warning("Disabling on-disk query cache %s: %s", self.disk_path, e)
+                self.disk_path = None
+                self._disk = None
+        return self._disk
+
+    async def _disk_get(self, key: str) -> Optional[str]:
+        disk = await self._disk_connection()
+        if disk is None:
+            return None
+        try:
+            query = "SELECT value FROM query_cache WHERE key = ? AND expires_at > ?;"
+            async with disk.execute(query, (key, time.time())) as cursor:
+                row = await cursor.fetchone()
+            return row[0] if row else None
+        except aiosqlite.Error as e:
+            logger.warning("On-disk query cache read failed: %s", e)
+            return None
+
+    async def _disk_set(self, key: str, value: str) -> None:
+        disk = await self._disk_connection()
+        if disk is None:
+            return
+        try:
+            await disk.execute(
+                "INSERT OR REPLACE INTO query_cache (key, value, size, expires_at) VALUES (?, ?, ?, ?);",
+                (key, value, len(value.encode("utf-8")), time.time() + self.ttl),
+            )
+            self._disk_writes += 1
+            if self._disk_writes % _DISK_PRUNE_EVERY == 0:
+                await self._disk_prune(disk)
+            await disk.commit()
+        except aiosqlite.Error as e:
+            logger.warning("On-disk query cache write failed: %s", e)
+
+    async def _disk_prune(self, disk: aiosqlite.Connection) -> None:
+        """Drop expired rows, then the soonest-expiring rows until the store fits in max_bytes."""
+        await disk.execute("DELETE FROM query_cache WHERE expires_at <= ?;", (time.time(),))
+        await disk.execute(
+            """
+            DELETE FROM query_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY expires_at DESC) AS running_size FROM query_cache
+                ) WHERE running_size > ?
+            );
+            """,
+            (self.max_bytes,),
+        )
@@ -0,0 +1,135 @@
+import re
+from typing import Optional
+
+import aiosqlite
+
+from query_cache import normalize_sql
+
+
+class GuardAction:
+    ALLOW = "allow"
+    REWRITE = "rewrite"
+    REJECT = "reject"
+
+
+# Finding -> action. The most severe action across all findings wins.
+DEFAULT_POLICY = {
+    "full_scan": GuardAction.REWRITE,
+    "full_scan_aggregate": GuardAction.ALLOW,
+    "temp_sort": GuardAction.ALLOW,
+    "cartesian_join": GuardAction.REJECT,
+}
+# journal_facts backs the journal_entries view in the compact layout
+LARGE_TABLES = ("journal_entries", "journal_facts")
+MAX_LIMIT = 1000
+
+_SEVERITY = {GuardAction.ALLOW: 0, GuardAction.REWRITE: 1, GuardAction.REJECT: 2}
+# Tables of attached databases, such as journal partitions, are named with their schema: SCAN main.journal_entries
+_SCAN_PATTERN = re.compile(
+    r"^SCAN (?:TABLE )?(?:[\w\"]+\.)?(?P<table>[\w\"]+)(?: AS \w+)?(?P<index> USING (?:COVERING )?INDEX .+)?$"
+)
+_TABLE_REFERENCE_PATTERN = re.compile(r"\b(?:from|join)\s+(\w+)(?:\s+(?:as\s+)?(\w+))?")
+_NOT_AN_ALIAS = {
+    "where", "on", "using", "join", "left", "right", "inner", "outer", "cross", "natural",
+    "group", "order", "having", "limit", "window", "union", "except", "intersect",
+}
+_AGGREGATE_PATTERN = re.compile(r"\bgroup\s+by\b|\b(count|sum|avg|min|max|total|group_concat)\s*\(")
+_HINTS = {
+    "full_scan": "Filter on SAP_BOOK_ID and/or an ENTRY_DATE range, or add a LIMIT.",
+    "full_scan_aggregate": "Aggregate over a filtered range, or use the balance_records table.",
+    "temp_sort": "Sort on an indexed column or reduce the rows before ORDER BY.",
+    "cartesian_join": "Join the tables on a key column (e.g. SAP_BOOK_ID) instead of a cross join.",
+}
+
+
+class GuardDecision:
+    """Outcome of checking one query: the action, why, and the SQL to execute."""
+
+    def __init__(self, action: str, sql: str, findings: list[str], plan: list[str]) -> None:
+        self.action = action
+        self.sql = sql
+        self.findings = findings
+        self.plan = plan
+
+    def to_dict(self, executed_sql: Optional[str] = None, row_limit: Optional[int] = None) -> dict:
+        """The decision as reported to the model.
+
+        A REWRITE reports the query that actually ran: self.sql unless the caller enforced the
+        limit some other way, in which case it passes the SQL it ran and the row limit it applied.
+        """
+        report = {
+            "action": self.action,
+            "findings": self.findings,
+            "hints": [_HINTS[finding] for finding in self.findings],
+            "plan": self.plan,
+        }
+        if self.action == GuardAction.REWRITE:
+            report["executed_query"] = executed_sql or self.sql
+            if row_limit is not None:
+                report["row_limit"] = row_limit
+        return report
+
+
+class QueryGuard:
+    """Inspect model-written SQL with EXPLAIN QUERY PLAN before running it.
+
+    Full scans of large tables, sorts through a temporary b-tree and cartesian joins are
+    allowed, rewritten with a clamped LIMIT, or rejected according to the policy.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[dict[str, str]] = None,
+        large_tables: tuple[str, ...] = LARGE_TABLES,
+        max_limit: int = MAX_LIMIT,
+    ) -> None:
+        self.policy = {**DEFAULT_POLICY, **(policy or {})}
+        self.large_tables = {table.lower() for table in large_tables}
+        self.max_limit = max_limit
+
+    async def check(self, conn: aiosqlite.Connection, sql: str) -> GuardDecision:
+        async with conn.execute(f"EXPLAIN QUERY PLAN {sql.strip().rstrip(';')}") as cursor:
+            rows = await cursor.fetchall()
+        plan = [row[3] for row in rows]
+        findings = self._findings(rows, sql)
+
+        action = GuardAction.ALLOW
+        for finding in findings:
+            candidate = self.policy.get(finding, GuardAction.ALLOW)
+            if _SEVERITY[candidate] > _SEVERITY[action]:
+                action = candidate
+        effective_sql = self.clamp_limit(sql) if action == GuardAction.REWRITE else sql
+        return GuardDecision(action, effective_sql, findings, plan)
+
+    def clamp_limit(self, sql: str) -> str:
+        """Bound the number of rows the statement can produce, whatever LIMIT it already has."""
+        inner = sql.strip().rstrip(";")
+        return f"SELECT * FROM (\n{inner}\n) LIMIT {self.max_limit}"
+
+    def _findings(self, rows: list[tuple], sql: str) -> list[str]:
+        findings = []
+        normalized = normalize_sql(sql)
+        aggregates = bool(_AGGREGATE_PATTERN.search(normalized))
+        # The plan names aliased tables by their alias, so map aliases back to table names
+        aliases = {}
+        for table, alias in _TABLE_REFERENCE_PATTERN.findall(normalized):
+            aliases[table] = table
+            if alias and alias not in _NOT_AN_ALIAS:
+                aliases[alias] = table
+        full_scans_by_parent: dict[int, int] = {}
+        for _, parent, _, detail in rows:
+            if detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail:
+                findings.append("temp_sort")
+                continue
+            match = _SCAN_PATTERN.match(detail)
+            if not match or match.group("index"):
+                continue
+            full_scans_by_parent[parent] = full_scans_by_parent.get(parent, 0) + 1
+            table = match.group("table").strip('"').lower()
+            if aliases.get(table, table) in self.large_tables:
+                findings.append("full_scan_aggregate" if aggregates else "full_scan")
+
+        # Two unindexed scans in the same loop nest means every row is paired with every row
+        if any(count > 1 for count in full_scans_by_parent.values()):
+            findings.append("cartesian_join")
+        return list(dict.fromkeys(findings))
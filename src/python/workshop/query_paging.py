@@ -0,0 +1,111 @@
+import base64
+import hashlib
+import json
+import re
+from typing import Iterable, Optional
+
+from query_cache import normalize_sql
+
+# Key columns of the journal and balance tables, in order of preference for keyset paging
+KEYSET_CANDIDATES = (
+    ("DOCUMENT_NUMBER",),
+    ("SAP_BOOK_ID", "DATE"),
+)
+
+_PAGEABLE_PATTERN = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_ORDERED_PATTERN = re.compile(r"\b(order\s+by|limit)\b")
+# A normalized SELECT returning the rows of one table as they are: no joins, grouping or compound parts
+_SINGLE_TABLE_PATTERN = re.compile(
+    r"^select (?P<columns>.+?) from (?P<table>\w+)(?: (?:as )?\w+)?(?: where (?!.*\bgroup by\b).*)?$"
+)
+
+
+def is_pageable(sql: str) -> bool:
+    """Only plain SELECT statements can be wrapped in a sub-query and paged."""
+    return bool(_PAGEABLE_PATTERN.match(sql))
+
+
+def query_hash(sql: str) -> str:
+    return hashlib.sha256(normalize_sql(sql).encode("utf-8")).hexdigest()[:16]
+
+
+def single_table(sql: str) -> Optional[str]:
+    """The table a plain single-table SELECT reads, or None when its rows may repeat or combine table rows."""
+    match = _SINGLE_TABLE_PATTERN.match(normalize_sql(sql))
+    return match.group("table") if match else None
+
+
+def choose_keyset(sql: str, columns: list[str], unique_keys: Iterable[tuple[str, ...]] = ()) -> Optional[list[str]]:
+    """Pick unique key columns for keyset pagination, or None to fall back to OFFSET paging.
+
+    A key with duplicates would skip rows between pages, so a candidate is only used when it is
+    one of unique_keys, the unique indexes of the single table the query reads (see single_table),
+    and selected from it unchanged. Queries with their own ORDER BY or LIMIT keep their row order,
+    so they are paged by offset.
+    """
+    normalized = normalize_sql(sql)
+    match = _SINGLE_TABLE_PATTERN.match(normalized)
+    if match is None or _ORDERED_PATTERN.search(normalized):
+        return None
+    selected = {item.strip().split(".")[-1] for item in match.group("columns").split(",")}
+    unique = {tuple(key.upper() for key in unique_key) for unique_key in unique_keys}
+    available = {column.upper(): column for column in columns}
+    for candidate in KEYSET_CANDIDATES:
+        if candidate not in unique or not all(key in available for key in candidate):
+            continue
+        if "*" in selected or all(key.lower() in selected for key in candidate):
+            return [available[key] for key in candidate]
+    return None
+
+
+def build_page_query(
+    sql: str, key_columns: Optional[list[str]], after: Optional[list], offset: int, limit: int
+) -> tuple[str, list]:
+    """Wrap the query so SQLite itself stops after one page of rows."""
+    # Newlines keep a trailing "-- comment" in the model's SQL from swallowing the closing parenthesis
+    inner = f"\n{sql.strip().rstrip(';')}\n"
+    if key_columns:
+        keys = ", ".join(_quote(key) for key in key_columns)
+        where = f" WHERE ({keys}) > ({', '.join('?' for _ in key_columns)})" if after else ""
+        return f"SELECT * FROM ({inner}){where} ORDER BY {keys} LIMIT ?", [*(after or []), limit]
+    return f"SELECT * FROM ({inner}) LIMIT ? OFFSET ?", [limit, offset]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def check_page_state(state: dict, key_columns: Optional[list[str]]) -> None:
+    """Reject a decoded continuation token whose paging state does not fit the query.
+
+    Tokens come back from the model, so key_columns, which the caller derives from the query
+    again, decide how the page is read; a token must name exactly those keys, with one value
+    each, or carry a plain row offset when there are none.
+    """
+    served = state.get("n")
+    valid = isinstance(served, int) and served >= 0
+    if key_columns:
+        after = state.get("a")
+        valid = valid and state.get("k") == key_columns and isinstance(after, list) and len(after) == len(key_columns)
+        valid = valid and all(value is None or isinstance(value, (str, int, float)) for value in after)
+    else:
+        offset = state.get("o")
+        valid = valid and "k" not in state and isinstance(offset, int) and offset >= 0
+    if not valid:
+        raise ValueError("Invalid continuation token.")
+
+
+def encode_token(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid continuation token.") from e
+    if not isinstance(state, dict) or "h" not in state or "v" not in state:
+        raise ValueError("Invalid continuation token.")
+    return state
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import aiosqlite
+from azure.ai.projects.aio import AIProjectClient
+from azure.core.exceptions import AzureError, HttpResponseError, ResourceNotFoundError
+
+logger = logging.getLogger(__name__)
+
+_DELETE_METHODS = {
+    "thread": "delete_thread",
+    "agent": "delete_agent",
+    "vector_store": "delete_vector_store",
+    "file": "delete_file",
+}
+# Deleted in this order: nothing references threads and agents, vector stores still list their files
+_PHASES = (("thread", "agent"), ("vector_store",), ("file",))
+# Owner of agents, vector stores and files kept across processes, e.g. by the agent registry
+SHARED_OWNER = "shared"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def format_reclaim_report(report: dict, title: str = "Reclaimed") -> str:
+    deleted = ", ".join(
+        f"{count} {kind.replace('_', ' ')}{'s' if count != 1 else ''}"
+        for kind, count in report["deleted"].items()
+        if count
+    )
+    return (
+        f"{title} {deleted or 'nothing'} in {report['seconds']:.1f}s "
+        f"({report['already_gone']} already gone, {report['failed']} failed)"
+    )
+
+
+class ResourceJanitor:
+    """Tracks the agents, threads, vector stores and files the app creates and deletes them again.
+
+    Every object is recorded with an owner (a chat session, the thread pool, or SHARED_OWNER
+    for objects reused across processes) in memory and, with ledger_path, in a small SQLite
+    ledger shared by the server processes on this machine. reclaim() deletes what this
+    process owns; sweep() deletes what crashed processes left behind, and shared objects
+    keep() has stopped returning for some time; the ledger records when a sweep first found
+    one missing. Deletes run concurrently, at most `concurrency` at a time, and throttling or
+    server errors are retried with exponential backoff. An object is forgotten once deleted
+    or found missing; failures stay recorded for the next sweep.
+    """
+
+    def __init__(
+        self,
+        project_client: AIProjectClient,
+        ledger_path: Optional[str | Path] = None,
+        concurrency: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        keep: Optional[Callable[[], set[str]]] = None,
+    ) -> None:
+        self.project_client = project_client
+        self.ledger_path = Path(ledger_path) if ledger_path else None
+        self.retries = retries
+        self.backoff = backoff
+        # IDs of shared objects still in use; without it shared objects are never swept
+        self.keep = keep
+
+        # object_id -> (kind, owner) of what this process created
+        self._tracked: dict[str, tuple[str, str]] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._ledger: Optional[aiosqlite.Connection] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._stats = {"tracked": 0, "deleted": 0, "already_gone": 0, "failed": 0, "sweeps": 0, "seconds_total": 0.0}
+
+    async def track(self, kind: str, object_id: str, owner: str) -> None:
+        """Record a created object; tracking it again moves it to a new owner."""
+        if kind not in _DELETE_METHODS:
+            raise ValueError(f"Unknown resource kind: {kind}")
+        self._tracked[object_id] = (kind, owner)
+        self._stats["tracked"] += 1
+        ledger = await self._ledger_connection()
+        if ledger is None:
+            return
+        try:
+            await ledger.execute(
+                "INSERT OR REPLACE INTO resources (id, kind, owner, pid, created_at) VALUES (?, ?, ?, ?, ?);",
+                (object_id, kind, owner, None if owner == SHARED_OWNER else os.getpid(), time.time()),
+            )
+            await ledger.commit()
+        except aiosqlite.Error as e:
+            logger.warning("Resource ledger write failed: %s", e)
+
+    async def reclaim(self, owner: Optional[str] = None) -> dict:
+        """Delete what this process created for one owner, or everything it owns except shared objects."""
+        resources = [
+            (kind, object_id)
+            for object_id, (kind, object_owner) in self._tracked.items()
+            if object_owner == owner or (owner is None and object_owner != SHARED_OWNER)
+        ]
+        return await self.delete(resources)
+
+    async def sweep(self, min_age: float = 3600.0) -> dict:
+        """Delete recorded objects whose process is gone, and shared objects keep() dropped at least min_age ago."""
+        ledger = await self._ledger_connection()
+        if ledger is None:
+            return await self.delete([])
+        async with ledger.execute("SELECT id, kind, pid, delisted_at FROM resources;") as cursor:
+            rows = await cursor.fetchall()
+
+        keep = self.keep() if self.keep is not None else None
+        now = time.time()
+        orphans = []
+        # Shared objects keep() stopped or started listing again since the last sweep
+        delisted, relisted = [], []
+        for object_id, kind, pid, delisted_at in rows:
+            if pid is not None:
+                if pid != os.getpid() and not _process_alive(pid):
+                    orphans.append((kind, object_id))
+            elif keep is None:
+                continue
+            elif object_id in keep:
+                if delisted_at is not None:
+                    relisted.append(object_id)
+            elif delisted_at is None:
+                # Chats started before the registry replaced it may still use it; the grace period starts now
+                delisted.append(object_id)
+            elif now - delisted_at >= min_age:
+                orphans.append((kind, object_id))
+        await self._mark_delisted(delisted, now)
+        await self._mark_delisted(relisted, None)
+        self._stats["sweeps"] += 1
+        return await self.delete(orphans)
+
+    async def delete(self, resources: Iterable[tuple[str, str]]) -> dict:
+        """Delete (kind, object_id) pairs, tracked or not, and report what was reclaimed and how long it took."""
+        start = time.perf_counter()
+        resources = list(dict.fromkeys(resources))
+        report = {"deleted": dict.fromkeys(_DELETE_METHODS, 0), "already_gone": 0, "failed": 0, "seconds": 0.0}
+        forgotten = []
+        for phase in _PHASES:
+            batch = [(kind, object_id) for kind, object_id in resources if kind in phase]
+            outcomes = await asyncio.gather(*(self._delete_one(kind, object_id) for kind, object_id in batch))
+            for (kind, object_id), outcome in zip(batch, outcomes, strict=True):
+                if outcome == "deleted":
+                    report["deleted"][kind] += 1
+                elif outcome == "missing":
+                    report["already_gone"] += 1
+                else:
+                    report["failed"] += 1
+                    continue
+                forgotten.append(object_id)
+        await self._forget(forgotten)
+
+        report["seconds"] = time.perf_counter() - start
+        self._stats["deleted"] += sum(report["deleted"].values())
+        self._stats["already_gone"] += report["already_gone"]
+        self._stats["failed"] += report["failed"]
+        self._stats["seconds_total"] += report["seconds"]
+        if resources:
+            logger.info(format_reclaim_report(report))
+        return report
+
+    def start(self, interval: float = 900.0, min_age: float = 3600.0) -> None:
+        """Sweep for orphans now and then every interval seconds, in the background."""
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep_loop(interval, min_age))
+
+    async def close(self) -> dict:
+        """Stop sweeping, delete everything this process owns except shared objects, and close the ledger."""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._sweep_task
+            self._sweep_task = None
+        report = await self.reclaim()
+        if self._ledger is not None:
+            await self._ledger.close()
+            self._ledger = None
+        return report
+
+    async def _sweep_loop(self, interval: float, min_age: float) -> None:
+        while True:
+            try:
+                await self.sweep(min_age)
+            except Exception as e:
+                logger.warning("Orphan sweep failed: %s", e)
+            await asyncio.sleep(interval)
+
+    async def _delete_one(self, kind: str, object_id: str) -> str:
+        method = getattr(self.project_client.agents, _DELETE_METHODS[kind])
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    await method(object_id)
+                return "deleted"
+            except ResourceNotFoundError:
+                return "missing"
+            except AzureError as e:
+                # Client errors other than throttling will not get better by retrying
+                status = e.status_code if isinstance(e, HttpResponseError) else None
+                if attempt == self.retries or (status is not None and status < 500 and status != 429):
+                    logger.warning("Could not delete %s %s: %s", kind, object_id, e)
+                    return "failed"
+            await asyncio.sleep(self.backoff * 2**attempt)
+        return "failed"
+
+    async def _forget(self, object_ids: list[str]) -> None:
+        for object_id in object_ids:
+            self._tracked.pop(object_id, None)
+        ledger = await self._ledger_connection()
+        if ledger is None or not object_ids:
+            return
+        try:
+            await ledger.executemany("DELETE FROM resources WHERE id = ?;", [(object_id,) for object_id in object_ids])
+            await ledger.commit()
+        except aiosqlite.Error as e:
+            logger.warning("Resource ledger write failed: %s", e)
+
+    async def _mark_delisted(self, object_ids: list[str], delisted_at: Optional[float]) -> None:
+        ledger = await self._ledger_connection()
+        if ledger is None or not object_ids:
+            return
+        try:
+            await ledger.executemany(
+                "UPDATE resources SET delisted_at = ? WHERE id = ?;",
+                [(delisted_at, object_id) for object_id in object_ids],
+            )
+            await ledger.commit()
+        except aiosqlite.Error as e:
+            logger.warning("Resource ledger write failed: %s", e)
+
+    async def _ledger_connection(self) -> Optional[aiosqlite.Connection]:
+        if self.ledger_path is None:
+            return None
+        if self._ledger is None:
+            try:
+                self.ledger_path.parent.mkdir(parents=True, exist_ok=True)
+                self._ledger = await aiosqlite.connect(self.ledger_path)
+                # WAL lets several server processes record and sweep concurrently
+                await self._ledger.execute("PRAGMA journal_mode = WAL;")
+                await self._ledger.execute("PRAGMA synchronous = NORMAL;")
+                await self._ledger.execute(
+                    "CREATE TABLE IF NOT EXISTS resources ("
+                    "id TEXT PRIMARY KEY, kind TEXT NOT NULL, owner TEXT NOT NULL, pid INTEGER, "
+                    "created_at REAL NOT NULL, delisted_at REAL)"
+                )
+                async with self._ledger.execute("PRAGMA table_info(resources);") as cursor:
+                    columns = {row[1] for row in await cursor.fetchall()}
+                if "delisted_at" not in columns:
+                    # Ledger written by an older version; another process may be adding the column too
+                    with suppress(aiosqlite.OperationalError):
+                        await self._ledger.execute("ALTER TABLE resources ADD COLUMN delisted_at REAL;")
+                await self._ledger.commit()
+            except aiosqlite.Error as e:
+                logger.warning("Disabling resource ledger %s: %s", self.ledger_path, e)
+                self.ledger_path = None
+                self._ledger = None
+        return self._ledger
+
+    def stats(self) -> dict:
+        return {**self._stats, "tracked_now": len(self._tracked)}
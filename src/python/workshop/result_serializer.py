@@ -0,0 +1,85 @@
+import asyncio
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+# Results whose JSON is estimated at this many bytes or more are encoded off the event loop
+OFFLOAD_THRESHOLD_BYTES = 64 * 1024
+# Rows measured to estimate the encoded size of a result
+SIZE_SAMPLE_ROWS = 20
+
+
+def _default(value: object) -> str:
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def encode_split(columns: list[str], rows: list[tuple], extra: Optional[dict] = None, compact: bool = True) -> str:
+    """Encode rows in the same shape as DataFrame.to_json(orient="split", index=False)."""
+    payload = {"columns": columns, "data": rows}
+    if extra:
+        payload.update(extra)
+    if compact:
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_default)
+    return json.dumps(payload, default=_default)
+
+
+def estimate_size(rows: list[tuple]) -> int:
+    """Rough size in bytes of the rows as JSON, measured on a sample of them."""
+    if not rows:
+        return 0
+    sample = rows[:SIZE_SAMPLE_ROWS]
+    # Each value plus its separator and, for text, its quotes
+    sample_size = sum(len(str(value)) + 3 for row in sample for value in row)
+    return sample_size * len(rows) // len(sample)
+
+
+class ResultSerializer:
+    """Serialize sqlite row tuples straight to split-oriented JSON, without pandas.
+
+    Small results are encoded inline; large ones go to an executor so a big result
+    does not stall the token streams of every other session on the event loop.
+    """
+
+    def __init__(
+        self,
+        compact: bool = True,
+        offload_threshold: int = OFFLOAD_THRESHOLD_BYTES,
+        use_processes: bool = False,
+        max_workers: int = 2,
+    ) -> None:
+        self.compact = compact
+        self.offload_threshold = offload_threshold
+        self.use_processes = use_processes
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    @staticmethod
+    def columns_from_description(description: Optional[tuple]) -> list[str]:
+        return [column[0] for column in description] if description else []
+
+    def serialize(self, columns: list[str], rows: list[tuple], extra: Optional[dict] = None) -> str:
+        return encode_split(columns, rows, extra, self.compact)
+
+    async def serialize_async(self, columns: list[str], rows: list[tuple], extra: Optional[dict] = None) -> str:
+        if estimate_size(rows) < self.offload_threshold:
+            return self.serialize(columns, rows, extra)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), partial(encode_split, columns, rows, extra, self.compact)
+        )
+
+    def close(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="serializer")
+        return self._executor
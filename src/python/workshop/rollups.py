@@ -0,0 +1,161 @@
+import argparse
+import sqlite3
+from pathlib import Path
+
+# DATE is YYYYMMDD in the bulk generator and YYYY-MM-DD in the sample data; this folds both to digits
+_DATE_DIGITS = "replace(DATE, '-', '')"
+
+# Table -> (DDL, rebuild SQL, description published to the agent in the schema string)
+ROLLUP_TABLES = {
+    "latest_balances": (
+        """
+        CREATE TABLE IF NOT EXISTS latest_balances (
+            SAP_BOOK_ID TEXT PRIMARY KEY,
+            Bookname TEXT,
+            DATE TEXT,
+            BALANCE REAL,
+            TOTAL_JOURNALS INTEGER,
+            DAILY_CHANGE REAL
+        )
+        """,
+        """
+        INSERT INTO latest_balances (SAP_BOOK_ID, Bookname, DATE, BALANCE, TOTAL_JOURNALS, DAILY_CHANGE)
+        SELECT b.SAP_BOOK_ID, k.Bookname, b.DATE, b.BALANCE, b.TOTAL_JOURNALS, b.DAILY_CHANGE
+        FROM balance_records b
+        JOIN (SELECT SAP_BOOK_ID, MAX(DATE) AS DATE FROM balance_records {where} GROUP BY SAP_BOOK_ID) latest
+            ON latest.SAP_BOOK_ID = b.SAP_BOOK_ID AND latest.DATE = b.DATE
+        LEFT JOIN books k ON k.SAP_BOOK_ID = b.SAP_BOOK_ID
+        """,
+        "latest balance row for each book",
+    ),
+    "book_monthly_totals": (
+        """
+        CREATE TABLE IF NOT EXISTS book_monthly_totals (
+            SAP_BOOK_ID TEXT,
+            MONTH TEXT,
+            TOTAL_JOURNALS INTEGER,
+            TOTAL_VALUE REAL,
+            PRIMARY KEY (SAP_BOOK_ID, MONTH)
+        )
+        """,
+        f"""
+        INSERT INTO book_monthly_totals (SAP_BOOK_ID, MONTH, TOTAL_JOURNALS, TOTAL_VALUE)
+        SELECT SAP_BOOK_ID, substr({_DATE_DIGITS}, 1, 6), SUM(TOTAL_JOURNALS), ROUND(SUM(BALANCE), 2)
+        FROM balance_records {{where}}
+        GROUP BY 1, 2
+        """,
+        "journal count and value per book per month (MONTH is YYYYMM)",
+    ),
+    "book_yearly_totals": (
+        """
+        CREATE TABLE IF NOT EXISTS book_yearly_totals (
+            SAP_BOOK_ID TEXT,
+            YEAR TEXT,
+            TOTAL_JOURNALS INTEGER,
+            TOTAL_VALUE REAL,
+            PRIMARY KEY (SAP_BOOK_ID, YEAR)
+        )
+        """,
+        f"""
+        INSERT INTO book_yearly_totals (SAP_BOOK_ID, YEAR, TOTAL_JOURNALS, TOTAL_VALUE)
+        SELECT SAP_BOOK_ID, substr({_DATE_DIGITS}, 1, 4), SUM(TOTAL_JOURNALS), ROUND(SUM(BALANCE), 2)
+        FROM balance_records {{where}}
+        GROUP BY 1, 2
+        """,
+        "journal count and value per book per year (YEAR is YYYY)",
+    ),
+    "daily_balance_summary": (
+        """
+        CREATE TABLE IF NOT EXISTS daily_balance_summary (
+            DATE TEXT PRIMARY KEY,
+            BOOK_COUNT INTEGER,
+            TOTAL_JOURNALS INTEGER,
+            TOTAL_BALANCE REAL,
+            AVG_BALANCE REAL,
+            MIN_BALANCE REAL,
+            MAX_BALANCE REAL
+        )
+        """,
+        """
+        INSERT INTO daily_balance_summary
+            (DATE, BOOK_COUNT, TOTAL_JOURNALS, TOTAL_BALANCE, AVG_BALANCE, MIN_BALANCE, MAX_BALANCE)
+        SELECT DATE, COUNT(*), SUM(TOTAL_JOURNALS), ROUND(SUM(BALANCE), 2), ROUND(AVG(BALANCE), 2),
+            MIN(BALANCE), MAX(BALANCE)
+        FROM balance_records {where}
+        GROUP BY DATE
+        """,
+        "totals across all books for each date; the latest date is MAX(DATE)",
+    ),
+}
+
+
+# Table -> (its key columns, the same keys computed from balance_records, and the smallest DATE a
+# group can contain given its first date m). Dates sort as text in both formats, and a date's
+# year or month prefix sorts before every date of that period.
+_ROLLUP_KEYS = {
+    "latest_balances": (("SAP_BOOK_ID",), ("SAP_BOOK_ID",), "m"),
+    "book_monthly_totals": (
+        ("SAP_BOOK_ID", "MONTH"),
+        ("SAP_BOOK_ID", f"substr({_DATE_DIGITS}, 1, 6)"),
+        "substr(m, 1, length(m) - 2)",
+    ),
+    "book_yearly_totals": (
+        ("SAP_BOOK_ID", "YEAR"),
+        ("SAP_BOOK_ID", f"substr({_DATE_DIGITS}, 1, 4)"),
+        "substr(m, 1, 4)",
+    ),
+    "daily_balance_summary": (("DATE",), ("DATE",), "m"),
+}
+
+
+def build_rollups(conn: sqlite3.Connection) -> None:
+    """Rebuild every rollup table from balance_records in one transaction."""
+    with conn:
+        for table, (ddl, rebuild, _) in ROLLUP_TABLES.items():
+            conn.execute(ddl)
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(rebuild.format(where=""))
+
+
+def refresh_rollups(conn: sqlite3.Connection, delta_table: str) -> None:
+    """Recompute only the rollup rows touched by the (SAP_BOOK_ID, DATE) balance keys in delta_table.
+
+    Each rebuild query is restricted to the affected groups, and to balance dates from the start
+    of the earliest affected period, so the cost follows the delta rather than the history. Runs
+    inside the caller's transaction.
+    """
+    for table, (ddl, rebuild, _) in ROLLUP_TABLES.items():
+        columns, keys, lower_bound = _ROLLUP_KEYS[table]
+        keys_sql = ", ".join(keys)
+        conn.execute(ddl)
+        conn.execute(f"DELETE FROM {table} WHERE ({', '.join(columns)}) IN (SELECT {keys_sql} FROM {delta_table})")
+        where = (
+            f"WHERE DATE >= (SELECT {lower_bound} FROM (SELECT MIN(DATE) AS m FROM {delta_table})) "
+            f"AND ({keys_sql}) IN (SELECT {keys_sql} FROM {delta_table})"
+        )
+        conn.execute(rebuild.format(where=where))
+
+
+def describe_rollups(table_names: list[str]) -> str:
+    """One line for the schema string pointing the agent at the pre-aggregated tables that exist."""
+    present = [f"{table} ({ROLLUP_TABLES[table][2]})" for table in ROLLUP_TABLES if table in table_names]
+    if not present:
+        return ""
+    return f"Summary tables (pre-aggregated, prefer them over scanning journal_entries): {'; '.join(present)}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the rollup tables of the financial database.")
+    parser.add_argument("db_path", type=Path, help="Path to financial_data.db")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    try:
+        build_rollups(conn)
+    finally:
+        conn.close()
+    print(f"✅ Rollup tables rebuilt: {', '.join(ROLLUP_TABLES)}")
+
+
+if __name__ == "__main__":
+    main()
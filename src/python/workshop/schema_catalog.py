@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+from compact_schema import COMPACT_DESCRIPTION, FACT_TABLE, INTERNAL_TABLES
+from partitions import PARTITION_TABLE
+from rollups import describe_rollups
+from utilities import load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FORMAT = 2
+
+
+class SchemaCatalog:
+    """Schema string and distinct-value lists for the agent instructions, computed once per database version.
+
+    The distinct lists need full scans of journal_entries, so the result is kept in memory
+    and in a sidecar JSON file next to the database; chat start-up then no longer scales
+    with the size of the table.
+    """
+
+    def __init__(self, db_path: Path, sidecar_path: Optional[Path] = None) -> None:
+        self.db_path = db_path
+        self.sidecar_path = sidecar_path or db_path.with_name(f"{db_path.name}.catalog.json")
+        self._version: Optional[str] = None
+        self._catalog: Optional[dict] = None
+        self._lock = asyncio.Lock()
+
+    async def get_database_info(self, conn: aiosqlite.Connection, version: str) -> str:
+        return self.render(await self.get(conn, version))
+
+    async def get(self, conn: aiosqlite.Connection, version: str) -> dict:
+        """Return the catalog for this database version, building it only when no stored copy matches."""
+        if self._version == version:
+            return self._catalog
+        async with self._lock:
+            if self._version == version:
+                return self._catalog
+
+            catalog = self._load_sidecar(version)
+            if catalog is None:
+                catalog = await self._build(conn)
+                catalog["format"] = CATALOG_FORMAT
+                catalog["version"] = version
+                self._save_sidecar(catalog)
+            self._version, self._catalog = version, catalog
+            return catalog
+
+    @staticmethod
+    def render(catalog: dict) -> str:
+        database_info = "\n".join(
+            [
+                f"Table {table['table_name']} Schema: Columns: {', '.join(table['column_names'])}"
+                for table in catalog["tables"]
+            ]
+        )
+        rollups = describe_rollups([table["table_name"] for table in catalog["tables"]])
+        if rollups:
+            database_info += f"\n{rollups}"
+        if catalog["compact"]:
+            database_info += f"\n{COMPACT_DESCRIPTION}"
+        database_info += f"\nTransaction Types: {', '.join(catalog['transaction_types'])}"
+        database_info += f"\nCurrencies: {', '.join(catalog['currencies'])}"
+        database_info += f"\nYears: {', '.join(catalog['years'])}"
+        database_info += "\n\n"
+        return database_info
+
+    async def _build(self, conn: aiosqlite.Connection) -> dict:
+        logger.info("Building schema catalog for %s", self.db_path)
+        tables = []
+        table_names = await self._get_table_names(conn)
+        # In the compact layout the distinct lists come from the small dictionary tables
+        compact = FACT_TABLE in table_names
+        for table_name in table_names:
+            if table_name in INTERNAL_TABLES or table_name == PARTITION_TABLE:
+                continue
+            columns_names = await self._get_column_info(conn, table_name)
+            tables.append({"table_name": table_name, "column_names": columns_names})
+        return {
+            "tables": tables,
+            "compact": compact,
+            "transaction_types": await self._get_transaction_types(conn, compact),
+            "currencies": await self._get_currencies(conn, compact),
+            "years": await self._get_years(conn, compact),
+        }
+
+    def _load_sidecar(self, version: str) -> Optional[dict]:
+        catalog = load_json(self.sidecar_path, "schema catalog")
+        if catalog is None or catalog.get("format") != CATALOG_FORMAT or catalog.get("version") != version:
+            return None
+        return catalog
+
+    def _save_sidecar(self, catalog: dict) -> None:
+        save_json(self.sidecar_path, catalog, "schema catalog")
+
+    async def _get_table_names(self, conn: aiosqlite.Connection) -> list:
+        async with conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view');") as tables:
+            # sqlite_sequence, sqlite_stat1 (from ANALYZE) and friends are internal
+            return [table[0] async for table in tables if not table[0].startswith("sqlite_")]
+
+    async def _get_column_info(self, conn: aiosqlite.Connection, table_name: str) -> list:
+        async with conn.execute(f"PRAGMA table_info('{table_name}');") as columns:
+            return [f"{col[1]}: {col[2]}" async for col in columns]
+
+    # Sorted by name: the list ends up in the agent instructions, whose hash must not follow the physical row order
+    async def _get_transaction_types(self, conn: aiosqlite.Connection, compact: bool) -> list:
+        if compact:
+            query = "SELECT NAME FROM transaction_types ORDER BY NAME;"
+        else:
+            query = "SELECT DISTINCT TRANSACTION_TYPE FROM journal_entries ORDER BY TRANSACTION_TYPE;"
+        async with conn.execute(query) as cursor:
+            result = await cursor.fetchall()
+        return [row[0] for row in result if row[0] is not None]
+
+    async def _get_currencies(self, conn: aiosqlite.Connection, compact: bool) -> list:
+        if compact:
+            query = "SELECT NAME FROM currencies ORDER BY NAME;"
+        else:
+            query = "SELECT DISTINCT TRANSACTION_CURRENCY FROM journal_entries ORDER BY TRANSACTION_CURRENCY;"
+        async with conn.execute(query) as cursor:
+            result = await cursor.fetchall()
+        return [row[0] for row in result if row[0] is not None]
+
+    async def _get_years(self, conn: aiosqlite.Connection, compact: bool) -> list:
+        if compact:
+            # Integer date keys: a walk of the date index with integer division, no string slicing
+            query = f"SELECT DISTINCT ENTRY_DATE / 10000 AS year FROM {FACT_TABLE} ORDER BY year;"
+        else:
+            query = "SELECT DISTINCT substr(ENTRY_DATE, 1, 4) AS year FROM journal_entries ORDER BY year;"
+        async with conn.execute(query) as cursor:
+            result = await cursor.fetchall()
+        return [str(row[0]) for row in result if row[0] is not None]
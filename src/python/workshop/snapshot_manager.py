@@ -0,0 +1,175 @@
+import argparse
+import logging
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "snapshots"
+# Published snapshots kept besides the current one, for readers that have not switched yet
+KEEP_SNAPSHOTS = 2
+
+
+class SnapshotError(Exception):
+    """Raised when a database file is not fit to be published."""
+
+
+class SnapshotManager:
+    """Publishes immutable copies of the financial database for the read-only app to switch to.
+
+    Loaders never write to the file the app is reading. They build a new snapshot, by default a
+    VACUUM INTO copy of the current one, write to it, and publish it. Publishing rewrites a small
+    pointer file (<db>.current) with an atomic rename, so readers see either the old snapshot or
+    the new one and can keep their open connections on the old file until they drain. Until the
+    first snapshot is published the pointer does not exist and the plain database file is current.
+    """
+
+    def __init__(self, db_path: Path, keep: int = KEEP_SNAPSHOTS) -> None:
+        self.db_path = db_path
+        self.keep = keep
+        self.pointer_path = db_path.with_name(f"{db_path.name}.current")
+        self.snapshot_dir = db_path.parent / SNAPSHOT_DIR
+
+    def pointer_signature(self) -> Optional[tuple[int, int]]:
+        """A cheap stat of the pointer file, to notice a publish without reading it."""
+        try:
+            stat = self.pointer_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino
+
+    def current(self) -> Path:
+        """Return the database file readers should open now."""
+        try:
+            name = self.pointer_path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return self.db_path
+        path = self.pointer_path.parent / name
+        if not name or not path.exists():
+            logger.warning(
+                "Snapshot pointer %s names a missing file %r; using %s", self.pointer_path, name, self.db_path
+            )
+            return self.db_path
+        return path
+
+    def new_snapshot_path(self) -> Path:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        return self.snapshot_dir / f"{self.db_path.stem}-{stamp}-{os.getpid()}{self.db_path.suffix}"
+
+    def copy_current(self, target: Path) -> None:
+        """Write a compacted copy of the current snapshot to target with VACUUM INTO."""
+        source = sqlite3.connect(f"file:{self.current()}?mode=ro", uri=True)
+        try:
+            source.execute("VACUUM INTO ?", (str(target),))
+        finally:
+            source.close()
+
+    @contextmanager
+    def build(self, copy_current: bool = True) -> Iterator[Path]:
+        """Yield the path of a new snapshot to write to, and publish it when the block succeeds.
+
+        The snapshot starts as a copy of the current database, or empty with copy_current=False.
+        A failed build is deleted and never becomes visible.
+        """
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self.new_snapshot_path()
+        try:
+            if copy_current:
+                self.copy_current(path)
+            yield path
+            self.publish(path)
+        except BaseException:
+            self._remove(path)
+            raise
+
+    def publish(self, path: Path) -> Path:
+        """Check a finished database file, move it into the snapshot directory and make it current."""
+        path = path.resolve()
+        self._prepare(path)
+        if path.parent != self.snapshot_dir.resolve():
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            target = self.new_snapshot_path()
+            path.replace(target)
+            path = target
+
+        temp_path = self.pointer_path.with_name(f"{self.pointer_path.name}.{os.getpid()}.tmp")
+        with temp_path.open("w", encoding="utf-8") as file:
+            file.write(os.path.relpath(path, self.pointer_path.parent))
+            file.flush()
+            os.fsync(file.fileno())
+        temp_path.replace(self.pointer_path)
+        logger.info("Published database snapshot %s", path)
+        self.prune()
+        return path
+
+    def prune(self) -> list[Path]:
+        """Delete snapshots older than the current one and the `keep` before it; returns those removed."""
+        current = self.current().resolve()
+        snapshots = sorted(self.snapshot_dir.glob(f"{self.db_path.stem}-*{self.db_path.suffix}"), reverse=True)
+        older = [path for path in snapshots if path.resolve() != current]
+        removed = []
+        for path in older[self.keep :]:
+            # A reader may still hold the file open (and on Windows it cannot be deleted); next time then
+            if self._remove(path):
+                removed.append(path)
+        return removed
+
+    @staticmethod
+    def _prepare(path: Path) -> None:
+        # Readers open snapshots read-only, which needs a rollback-journal database with
+        # everything in the main file, and the file must be complete before anyone sees it
+        conn = sqlite3.connect(path)
+        try:
+            (result,) = conn.execute("PRAGMA quick_check").fetchone()
+            if result != "ok":
+                raise SnapshotError(f"{path.name} failed the integrity check: {result}")
+            conn.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            conn.close()
+        with path.open("rb") as file:
+            os.fsync(file.fileno())
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink(missing_ok=True)
+            path.with_name(f"{path.name}-journal").unlink(missing_ok=True)
+            return True
+        except OSError as e:
+            logger.warning("Could not remove snapshot %s: %s", path, e)
+            return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish and manage snapshots of the financial database.")
+    parser.add_argument("db_path", type=Path, help="Path to financial_data.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show the current snapshot")
+    publish = commands.add_parser("publish", help="Publish a finished database file, e.g. from the ledger generator")
+    publish.add_argument("source", type=Path, help="Database file to publish; it is moved, not copied")
+    commands.add_parser("compact", help="Publish a VACUUM INTO copy of the current snapshot")
+    commands.add_parser("prune", help="Delete old snapshots")
+    args = parser.parse_args()
+
+    manager = SnapshotManager(args.db_path)
+    if args.command == "publish":
+        path = manager.publish(args.source)
+        print(f"✅ Published {path}")
+    elif args.command == "compact":
+        with manager.build() as path:
+            pass
+        print(f"✅ Published {path}")
+    elif args.command == "prune":
+        removed = manager.prune()
+        print(f"✅ Removed {len(removed)} old snapshots")
+    else:
+        current = manager.current()
+        print(f"Current database: {current} ({current.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
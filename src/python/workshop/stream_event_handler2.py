@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import Any
 import chainlit as cl
 
@@ -15,6 +16,7 @@ from azure.ai.projects.models import (
     ThreadRun,
 )
 
+from answer_cache import CachedAnswer
 from utilities import Utilities
 
 
@@ -26,8 +28,21 @@ class StreamEventHandler2(AsyncAgentEventHandler[str]):
         self.project_client = project_client
         self.util = utilities
         self.msg = None
+        # Everything shown for this turn, so the answer can be cached and replayed
+        self.response_text = ""
+        self.files: list[Path] = []
+        self.failed = False
         super().__init__()
 
+    @staticmethod
+    async def replay(answer: CachedAnswer) -> None:
+        """Send a cached answer to the user as if it had just been streamed."""
+        await cl.Message(answer.markdown).send()
+        for file_path in answer.files:
+            await cl.Message(
+                content="📊 Generated chart:", elements=[cl.Image(path=str(file_path), name=file_path.name)]
+            ).send()
+
 
 
 
@@ -35,6 +50,7 @@ class StreamEventHandler2(AsyncAgentEventHandler[str]):
     async def on_message_delta(self, delta: MessageDeltaChunk) -> None:
         token = delta.text
         self.util.log_token_blue(token)
+        self.response_text += token
 
         # If this is the first token, create a streaming message
         if self.msg is None:
@@ -52,10 +68,21 @@ class StreamEventHandler2(AsyncAgentEventHandler[str]):
 
 
 
+    async def on_thread_message(self, message: ThreadMessage) -> None:
+        """Download and show the charts of a completed message."""
+        if message.status != MessageStatus.COMPLETED or not message.image_contents:
+            return
+        for file_path in await self.util.get_files(message, self.project_client):
+            self.files.append(file_path)
+            await cl.Message(
+                content="📊 Generated chart:", elements=[cl.Image(path=str(file_path), name=file_path.name)]
+            ).send()
+
     async def on_thread_run(self, run: ThreadRun) -> None:
         """Handle thread run events"""
 
         if run.status == RunStatus.FAILED:
+            self.failed = True
             print(f"Run failed. Error: {run.last_error}")
             print(f"Thread ID: {run.thread_id}")
             print(f"Run ID: {run.id}")
@@ -70,6 +97,7 @@ class StreamEventHandler2(AsyncAgentEventHandler[str]):
         pass
 
     async def on_error(self, data: str) -> None:
+        self.failed = True
         print(f"An error occurred: {data}")
         await cl.Message(f"⚠️ Error occurred during streaming: {data}").send()
 
@@ -79,17 +107,3 @@ class StreamEventHandler2(AsyncAgentEventHandler[str]):
         """Handle unhandled events."""
         # print(f"Unhandled Event Type: {event_type}, Data: {event_data}")
         print(f"Unhandled Event Type: {event_type}")
-
-
-
-async def on_thread_message(self, message: ThreadMessage) -> None:
-    if message.status == MessageStatus.COMPLETED:
-        content_list = message.content or []
-        for content in content_list:
-            if content["type"] == "text":
-                value = content["text"]["value"]
-                await cl.Message(value).send()
-            elif content["type"] == "image_file":
-                image_id = content["image_file"]["file_id"]
-                file = await self.project_client.files.get_file(file_id=image_id)
-                await cl.Message(content="📊 Generated Pie Chart:", files=[cl.File(name=file.name, path=file.url)]).send()
@@ -0,0 +1,49 @@
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from ledger_generator import generate
+from utilities import Utilities
+
+# Small enough to build in a second, large enough for several periods and pages per book
+LEDGER_SIZE = {"books": 10, "days": 60, "entries_per_day": 50, "end_date": "2025-06-30", "chunk_size": 1000}
+
+
+class SharedFiles(Utilities):
+    """Utilities whose shared files, and so the FinancialData database, live in a test directory."""
+
+    def __init__(self, root: Path) -> None:
+        super().__init__(upload_cache_path=root / "shared.uploads.json")
+        self.root = root
+
+    @property
+    def shared_files_path(self) -> Path:
+        return self.root
+
+
+def build_ledger(root: Path, compact: bool = False) -> Path:
+    """Generate the test ledger in the layout FinancialData expects under root; returns the database path."""
+    db_path = root / "database" / "financial_data.db"
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # The generator reports its progress on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(db_path=db_path, compact=compact, write_csv=False, **LEDGER_SIZE)
+    return db_path
+
+
+@pytest.fixture(scope="session")
+def plain_ledger(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return build_ledger(tmp_path_factory.mktemp("plain"))
+
+
+@pytest.fixture(scope="session")
+def compact_ledger(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return build_ledger(tmp_path_factory.mktemp("compact"), compact=True)
+
+
+@pytest.fixture
+def ledger(tmp_path: Path) -> Path:
+    """A text-layout ledger of the test's own, for tests that modify the database."""
+    return build_ledger(tmp_path)
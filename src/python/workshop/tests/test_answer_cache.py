@@ -0,0 +1,26 @@
+import asyncio
+
+from answer_cache import AnswerCache, CachedAnswer
+
+INSTRUCTIONS = "You are a finance assistant."
+
+
+def test_follow_ups_are_keyed_on_the_conversation() -> None:
+    first = AnswerCache.extend_history("", "Balances for book B0005 in 2024", "2024 balances ...")
+    other = AnswerCache.extend_history("", "Journal entries for book B0001 in 2024", "2024 entries ...")
+    keys = {AnswerCache.make_key("and for 2023?", INSTRUCTIONS, "v1", history) for history in ("", first, other)}
+    assert len(keys) == 3
+
+
+def test_same_conversation_hits_the_cache() -> None:
+    async def scenario() -> CachedAnswer:
+        cache = AnswerCache()
+        history = AnswerCache.extend_history("", "Balances for book B0005 in 2024", "2024 balances ...")
+        await cache.set(AnswerCache.make_key("and for 2023?", INSTRUCTIONS, "v1", history), CachedAnswer("2023 ..."))
+        # Same turns again, differently spaced and punctuated
+        history = AnswerCache.extend_history("", "balances for book  B0005 in 2024?", "2024 balances ...")
+        return await cache.get(AnswerCache.make_key("And for 2023", INSTRUCTIONS, "v1", history))
+
+    answer = asyncio.run(scenario())
+    assert answer is not None
+    assert answer.markdown == "2023 ..."
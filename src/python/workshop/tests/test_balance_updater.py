@@ -0,0 +1,107 @@
+import contextlib
+import csv
+import io
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from conftest import build_ledger
+
+from balance_updater import BALANCE_UPDATER, JOURNAL_COLUMNS, append_journal_entries, main
+from rollups import ROLLUP_TABLES, build_rollups
+from snapshot_manager import SnapshotManager
+from utilities import hash_file
+
+
+def journal(document: str, book_id: str, entry_date: str, value: float) -> tuple:
+    row = dict.fromkeys(JOURNAL_COLUMNS)
+    row.update(DOCUMENT_NUMBER=document, SAP_BOOK_ID=book_id, VALUE=value, ENTRY_DATE=entry_date)
+    return tuple(row[column] for column in JOURNAL_COLUMNS)
+
+
+def balance(conn: sqlite3.Connection, book_id: str, day: str) -> tuple:
+    return conn.execute(
+        "SELECT TOTAL_JOURNALS, BALANCE, LAST_UPDATED_BY FROM balance_records WHERE SAP_BOOK_ID = ? AND DATE = ?",
+        (book_id, day),
+    ).fetchone()
+
+
+def rollup_rows(conn: sqlite3.Connection) -> dict[str, list[tuple]]:
+    return {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall() for table in ROLLUP_TABLES}
+
+
+@pytest.fixture(params=["plain", "compact"])
+def layout_ledger(request: pytest.FixtureRequest, tmp_path: Path) -> Path:
+    return build_ledger(tmp_path, compact=request.param == "compact")
+
+
+def test_appended_journals_update_balances_and_rollups(layout_ledger: Path) -> None:
+    with sqlite3.connect(layout_ledger) as conn:
+        last_day = conn.execute("SELECT MAX(DATE) FROM balance_records").fetchone()[0]
+        journals, balance_before, _ = balance(conn, "B0003", last_day)
+        rows = [
+            journal("TEST-1", "B0003", last_day, 100.25),
+            journal("TEST-2", "B0003", last_day, -40.10),
+            journal("TEST-3", "B0004", "20250701", 12.5),
+        ]
+        with conn:
+            delta = append_journal_entries(conn, JOURNAL_COLUMNS, rows)
+
+        assert delta == {"journal_entries": 3, "skipped": 0, "balance_records": 2}
+        assert balance(conn, "B0003", last_day) == (journals + 2, round(balance_before + 60.15, 2), BALANCE_UPDATER)
+        assert balance(conn, "B0004", "20250701") == (1, 12.5, BALANCE_UPDATER)
+        count = conn.execute("SELECT COUNT(*) FROM journal_entries WHERE DOCUMENT_NUMBER LIKE 'TEST-%'")
+        assert count.fetchone()[0] == 3
+
+        refreshed = rollup_rows(conn)
+        build_rollups(conn)
+        assert refreshed == rollup_rows(conn)
+
+
+def test_documents_already_loaded_are_skipped(layout_ledger: Path) -> None:
+    rows = [journal("TEST-1", "B0001", "20250701", 10.0)]
+    with sqlite3.connect(layout_ledger) as conn:
+        with conn:
+            append_journal_entries(conn, JOURNAL_COLUMNS, rows)
+        with conn:
+            delta = append_journal_entries(conn, JOURNAL_COLUMNS, rows)
+
+        assert delta == {"journal_entries": 0, "skipped": 1, "balance_records": 0}
+        assert balance(conn, "B0001", "20250701") == (1, 10.0, BALANCE_UPDATER)
+
+
+def run_updater(monkeypatch: pytest.MonkeyPatch, db_path: Path, document: str, *args: str) -> None:
+    csv_path = db_path.parent / f"{document}.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(JOURNAL_COLUMNS)
+        writer.writerow(journal(document, "B0001", "20250701", 10.0))
+    monkeypatch.setattr(sys, "argv", ["balance_updater", str(db_path), str(csv_path), *args])
+    with contextlib.redirect_stdout(io.StringIO()):
+        main()
+
+
+def has_entry(db_path: Path, document: str) -> bool:
+    with sqlite3.connect(db_path) as conn:
+        count = conn.execute("SELECT COUNT(*) FROM journal_entries WHERE DOCUMENT_NUMBER = ?", (document,))
+        return count.fetchone()[0] == 1
+
+
+def test_main_loads_into_a_new_snapshot_by_default(ledger: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    served = hash_file(ledger)
+    run_updater(monkeypatch, ledger, "TEST-1")
+    current = SnapshotManager(ledger).current()
+    assert current != ledger
+    assert has_entry(current, "TEST-1")
+    assert hash_file(ledger) == served
+
+
+def test_main_in_place_writes_the_current_snapshot(ledger: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    run_updater(monkeypatch, ledger, "TEST-1")
+    published = SnapshotManager(ledger).current()
+    # A load in place goes to the published snapshot, not the stale base file
+    run_updater(monkeypatch, ledger, "TEST-2", "--in-place")
+    assert SnapshotManager(ledger).current() == published
+    assert has_entry(published, "TEST-2")
+    assert not has_entry(ledger, "TEST-2")
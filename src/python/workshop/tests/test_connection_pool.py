@@ -0,0 +1,29 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from connection_pool import ConnectionPool
+
+
+def test_closed_connections_leave_the_pool(tmp_path: Path) -> None:
+    db_path = tmp_path / "pool.db"
+    sqlite3.connect(db_path).close()
+
+    async def scenario() -> list[dict]:
+        pool = ConnectionPool(f"file:{db_path}?mode=ro", min_size=2, max_size=2)
+        await pool.open()
+        async with pool.acquire():
+            # One connection idle, one borrowed across the close
+            await pool.close()
+            during = pool.metrics()
+        after = pool.metrics()
+        await pool.open()
+        async with pool.acquire():
+            reopened = pool.metrics()
+        await pool.close()
+        return [during, after, reopened]
+
+    during, after, reopened = asyncio.run(scenario())
+    assert (during["size"], during["idle"], during["in_use"]) == (1, 0, 1)
+    assert (after["size"], after["idle"], after["in_use"]) == (0, 0, 0)
+    assert (reopened["size"], reopened["in_use"]) == (2, 1)
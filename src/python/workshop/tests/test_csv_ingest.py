@@ -0,0 +1,57 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+from csv_ingest import main
+from snapshot_manager import SnapshotManager
+from utilities import hash_file
+
+
+def run_ingest(monkeypatch: pytest.MonkeyPatch, db_path: Path, *args: str) -> None:
+    books = db_path.parent / "books.csv"
+    books.write_text("SAP_BOOK_ID,Bookname,systementity\nB9999,Test book,TEST\n", encoding="utf-8")
+    argv = ["csv_ingest", str(db_path), "--books", str(books), "--quarantine-dir", str(db_path.parent), *args]
+    monkeypatch.setattr(sys, "argv", argv)
+    main()
+
+
+def has_book(db_path: Path) -> bool:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM books WHERE SAP_BOOK_ID = 'B9999'").fetchone()[0] == 1
+
+
+def test_loads_into_a_new_snapshot_by_default(ledger: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    served = hash_file(ledger)
+    run_ingest(monkeypatch, ledger)
+    current = SnapshotManager(ledger).current()
+    assert current != ledger
+    assert has_book(current)
+    # The app never sees a half-loaded file
+    assert hash_file(ledger) == served
+
+
+def test_first_snapshot_of_a_new_database(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    db_path = tmp_path / "financial_data.db"
+    run_ingest(monkeypatch, db_path)
+    assert not db_path.exists()
+    assert has_book(SnapshotManager(db_path).current())
+
+
+def test_in_place_writes_the_database_itself(ledger: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    run_ingest(monkeypatch, ledger, "--in-place")
+    assert SnapshotManager(ledger).current() == ledger
+    assert has_book(ledger)
+
+
+def test_in_place_after_a_publish_writes_the_current_snapshot(ledger: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    served = hash_file(ledger)
+    run_ingest(monkeypatch, ledger)
+    published = SnapshotManager(ledger).current()
+    with sqlite3.connect(published) as conn:
+        conn.execute("DELETE FROM books WHERE SAP_BOOK_ID = 'B9999'")
+    run_ingest(monkeypatch, ledger, "--in-place")
+    assert SnapshotManager(ledger).current() == published
+    assert has_book(published)
+    assert hash_file(ledger) == served
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from conftest import SharedFiles
+
+from FinancialData import FinancialData
+
+
+def call_tool(db_path: Path, tool: str, *args: object) -> object:
+    async def run() -> str:
+        financial_data = FinancialData(SharedFiles(db_path.parent.parent))
+        await financial_data.connect()
+        try:
+            return await getattr(financial_data, tool)(*args)
+        finally:
+            await financial_data.close()
+
+    return json.loads(asyncio.run(run()))
+
+
+def normalized_rows(result: dict) -> list[list]:
+    # Dates are integer YYYYMMDD keys in the compact layout and text in the plain one
+    date_columns = [index for index, column in enumerate(result["columns"]) if column.endswith("_DATE")]
+    return [
+        [str(value) if index in date_columns else value for index, value in enumerate(row)] for row in result["data"]
+    ]
+
+
+@pytest.mark.parametrize(
+    ("from_date", "to_date", "page"),
+    [("", "", 1), ("", "", 2), ("2025-06-01", "", 1), ("", "2025-05-15", 1), ("2025-05-10", "2025-05-20", 1)],
+)
+def test_journal_entries_match_between_layouts(
+    plain_ledger: Path, compact_ledger: Path, from_date: str, to_date: str, page: int
+) -> None:
+    plain = call_tool(plain_ledger, "get_journal_entries", "B0005", from_date, to_date, page)
+    compact = call_tool(compact_ledger, "get_journal_entries", "B0005", from_date, to_date, page)
+
+    assert isinstance(plain, dict), plain
+    assert isinstance(compact, dict), compact
+    assert plain["data"]
+    assert normalized_rows(compact) == normalized_rows(plain)
+
+
+def test_compact_view_compares_values_numerically(plain_ledger: Path, compact_ledger: Path) -> None:
+    counts = []
+    for db_path in (plain_ledger, compact_ledger):
+        conn = sqlite3.connect(db_path)
+        try:
+            counts.append(conn.execute("SELECT COUNT(*) FROM journal_entries WHERE VALUE > '100'").fetchone()[0])
+        finally:
+            conn.close()
+    assert counts[0] == counts[1] > 0
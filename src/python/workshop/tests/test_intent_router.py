@@ -0,0 +1,45 @@
+import pytest
+
+from intent_router import CONFIDENCE_THRESHOLD, IntentRouter
+
+
+@pytest.fixture(scope="module")
+def router() -> IntentRouter:
+    # classify() never touches the data
+    return IntentRouter(financial_data=None)
+
+
+@pytest.mark.parametrize(
+    ("question", "intent"),
+    [
+        ("Show the journal entries for book B0005", "journal_entries"),
+        ("balances for book B0005 from 2025-05-01 to 2025-06-01", "balances"),
+        ("details about book B0003", "book_details"),
+        ("latest balance summary with totals", "latest_summary"),
+        ("top 5 books by balance", "top_books"),
+    ],
+)
+def test_lookups_are_answered_locally(router: IntentRouter, question: str, intent: str) -> None:
+    classified = router.classify(question)
+    assert classified is not None
+    assert classified.name == intent
+    assert classified.confidence >= CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "What was the highest balance for book B0005?",
+        "What was the lowest balance for book B0005?",
+        "how many journal entries does book B0005 have",
+        "total of the journal entries for book B0005",
+        "average balance for book B0005",
+        "balance trend for book B0005",
+        "journal entries for book B0005 in 2023",
+        "balances for book B0005 per month",
+        "latest balance summary, highest first",
+    ],
+)
+def test_aggregate_questions_go_to_the_agent(router: IntentRouter, question: str) -> None:
+    classified = router.classify(question)
+    assert classified is None or classified.confidence < CONFIDENCE_THRESHOLD
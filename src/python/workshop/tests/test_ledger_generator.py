@@ -0,0 +1,52 @@
+import contextlib
+import io
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import ledger_generator
+from db_indexes import INDEXES
+from ledger_generator import BOOKS_CSV, JOURNALS_CSV, BalanceAccumulator, generate
+from rollups import ROLLUP_TABLES
+
+SMALL = {"books": 3, "days": 5, "entries_per_day": 10, "end_date": "2025-06-30", "chunk_size": 10}
+
+
+def test_csv_files_go_into_a_new_directory(tmp_path: Path) -> None:
+    csv_dir = tmp_path / "exports" / "2025-06"
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = generate(csv_dir=csv_dir, write_db=False, **SMALL)
+    lines = (csv_dir / JOURNALS_CSV).read_text(encoding="utf-8").splitlines()
+    assert len(lines) == stats["journal_entries"] + 1
+    assert (csv_dir / BOOKS_CSV).exists()
+
+
+def test_open_sinks_are_closed_when_a_later_one_fails(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_: object) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ledger_generator, "open_csv", fail)
+    db_path = tmp_path / "financial_data.db"
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(OSError, match="disk full"):
+        generate(db_path, tmp_path / "csv", **SMALL)
+
+    # The database sink let go of its exclusive lock
+    with sqlite3.connect(db_path, timeout=0) as conn:
+        conn.execute("CREATE TABLE probe (id INTEGER)")
+
+
+def test_a_failed_run_is_not_finished(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_: object) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(BalanceAccumulator, "add", fail)
+    db_path = tmp_path / "financial_data.db"
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(KeyboardInterrupt):
+        generate(db_path, tmp_path / "csv", **SMALL)
+
+    # No rollups or indexes that would make the partial ledger look complete, and the lock is released
+    with sqlite3.connect(db_path, timeout=0) as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+        conn.execute("CREATE TABLE probe (id INTEGER)")
+    assert not names & {*ROLLUP_TABLES, *INDEXES}
@@ -0,0 +1,126 @@
+import asyncio
+import contextlib
+import io
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import aiosqlite
+import pytest
+
+from ledger_generator import generate
+from partitions import PARTITION_DIR, PARTITION_TABLE, PartitionError, PartitionRouter, main, split_journals
+from query_guard import GuardAction, QueryGuard
+from snapshot_manager import SnapshotManager
+
+
+@pytest.fixture
+def split_ledger(ledger: Path, tmp_path: Path) -> tuple[Path, Path]:
+    """An unsplit copy of the ledger and the ledger itself split into monthly partitions."""
+    reference = tmp_path / "reference.db"
+    shutil.copy(ledger, reference)
+    partitions = split_journals(ledger, ledger.parent / PARTITION_DIR, "month", keep_hot=1)
+    assert partitions, "the test ledger should span more than one month"
+    return reference, ledger
+
+
+async def _query(db_path: Path, sql: str, route: bool = False) -> list[tuple]:
+    router = PartitionRouter.load(db_path, db_path.parent / PARTITION_DIR)
+    conn = await aiosqlite.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        await router.attach(conn)
+        async with conn.execute(router.route(sql) if route else sql) as cursor:
+            return await cursor.fetchall()
+    finally:
+        await conn.close()
+
+
+async def _guard(db_path: Path, sql: str) -> list[str]:
+    router = PartitionRouter.load(db_path, db_path.parent / PARTITION_DIR)
+    conn = await aiosqlite.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        await router.attach(conn)
+        return (await QueryGuard().check(conn, sql)).findings
+    finally:
+        await conn.close()
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT COUNT(*), ROUND(SUM(VALUE), 2) FROM journal_entries",
+        "SELECT DOCUMENT_NUMBER FROM journal_entries WHERE ENTRY_DATE BETWEEN '20250601' AND '20250610' ORDER BY 1",
+        "SELECT SAP_BOOK_ID, COUNT(*) FROM journal_entries j WHERE j.ENTRY_DATE < '20250515' GROUP BY 1 ORDER BY 1",
+    ],
+)
+def test_split_database_returns_the_same_rows(split_ledger: tuple[Path, Path], sql: str) -> None:
+    reference, split = split_ledger
+    expected = asyncio.run(_query(reference, sql))
+    assert asyncio.run(_query(split, sql)) == expected
+    assert asyncio.run(_query(split, sql, route=True)) == expected
+
+
+def test_router_skips_partitions_outside_the_date_bounds(split_ledger: tuple[Path, Path]) -> None:
+    _, split = split_ledger
+    router = PartitionRouter.load(split, split.parent / PARTITION_DIR)
+    routed = router.route("SELECT * FROM journal_entries WHERE ENTRY_DATE >= '20250601'")
+    assert all(partition.name not in routed for partition in router.partitions)
+
+
+def test_guard_still_flags_full_scans_after_a_split(split_ledger: tuple[Path, Path]) -> None:
+    reference, split = split_ledger
+    sql = "SELECT * FROM journal_entries WHERE VALUE > 9990"
+    assert asyncio.run(_guard(reference, sql)) == ["full_scan"]
+    assert asyncio.run(_guard(split, sql)) == ["full_scan"]
+
+
+def test_guard_rewrites_a_full_scan_of_a_partitioned_table(split_ledger: tuple[Path, Path]) -> None:
+    _, split = split_ledger
+
+    async def check() -> str:
+        router = PartitionRouter.load(split, split.parent / PARTITION_DIR)
+        conn = await aiosqlite.connect(f"file:{split}?mode=ro", uri=True)
+        try:
+            await router.attach(conn)
+            return (await QueryGuard().check(conn, "SELECT * FROM journal_entries")).action
+        finally:
+            await conn.close()
+
+    assert asyncio.run(check()) == GuardAction.REWRITE
+
+
+def _table_state(db_path: Path) -> tuple[int, bool]:
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT COUNT(*) FROM journal_entries").fetchone()[0]
+        split = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (PARTITION_TABLE,)).fetchone()
+        return rows, split is not None
+    finally:
+        conn.close()
+
+
+def test_too_many_partitions_are_rejected_before_the_database_is_touched(tmp_path: Path) -> None:
+    db_path = tmp_path / "financial_data.db"
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate(db_path=db_path, books=1, days=400, entries_per_day=2, write_csv=False, end_date="2025-06-30")
+    before = _table_state(db_path)
+
+    with pytest.raises(PartitionError, match="partitions would be attached"):
+        split_journals(db_path, tmp_path / PARTITION_DIR, "month", keep_hot=1)
+    assert _table_state(db_path) == before
+    assert not (tmp_path / PARTITION_DIR).exists()
+
+
+def test_main_splits_a_new_snapshot_by_default(ledger: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    before = _table_state(ledger)
+    monkeypatch.setattr(sys, "argv", ["partitions.py", str(ledger), "--granularity", "month"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        main()
+
+    current = SnapshotManager(ledger).current()
+    assert current != ledger
+    assert _table_state(ledger) == before
+    rows, split = _table_state(current)
+    assert split
+    assert rows < before[0]
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from conftest import SharedFiles
+
+from FinancialData import FinancialData
+
+# Runs for minutes unless interrupted; touches no table, so the cost guard lets it through
+ENDLESS_QUERY = (
+    "WITH RECURSIVE counter(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM counter) "
+    "SELECT COUNT(*) FROM (SELECT x FROM counter LIMIT 10000000000)"
+)
+QUICK_QUERY = "SELECT COUNT(*) FROM books"
+
+
+def make_financial_data(db_path: Path, **options: object) -> FinancialData:
+    # A single pooled connection, so a statement left running would block the next query
+    return FinancialData(
+        SharedFiles(db_path.parent.parent), pool_min_size=1, pool_max_size=1, acquire_timeout=2.0, **options
+    )
+
+
+def test_query_past_its_deadline_is_interrupted(plain_ledger: Path) -> None:
+    async def run() -> tuple[dict, float, dict]:
+        financial_data = make_financial_data(plain_ledger, query_timeout=0.3)
+        await financial_data.connect()
+        try:
+            start = time.monotonic()
+            timed_out = json.loads(await financial_data.async_fetch_data_using_sqlite_query(ENDLESS_QUERY))
+            seconds = time.monotonic() - start
+            after = json.loads(await financial_data.async_fetch_data_using_sqlite_query(QUICK_QUERY))
+            return timed_out, seconds, after
+        finally:
+            await financial_data.close()
+
+    timed_out, seconds, after = asyncio.run(run())
+    assert timed_out["timeout_seconds"] == 0.3
+    assert "SQLite query timed out" in timed_out
+    assert seconds < 5
+    assert after["data"] == [[10]]
+
+
+def test_cancelled_turn_frees_its_connection(plain_ledger: Path) -> None:
+    async def run() -> tuple[float, dict]:
+        financial_data = make_financial_data(plain_ledger, query_timeout=600)
+        await financial_data.connect()
+        try:
+            task = asyncio.create_task(financial_data.async_fetch_data_using_sqlite_query(ENDLESS_QUERY))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            start = time.monotonic()
+            # Waits for the pooled connection, which the interrupted statement gives back at once
+            after = json.loads(await financial_data.async_fetch_data_using_sqlite_query(QUICK_QUERY))
+            return time.monotonic() - start, after
+        finally:
+            await financial_data.close()
+
+    seconds, after = asyncio.run(run())
+    assert after["data"] == [[10]]
+    assert seconds < 2
@@ -0,0 +1,60 @@
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+import pytest
+
+from query_guard import GuardAction, GuardDecision, QueryGuard
+
+
+def check(db_path: Path, sql: str, guard: Optional[QueryGuard] = None) -> GuardDecision:
+    async def run() -> GuardDecision:
+        async with aiosqlite.connect(f"file:{db_path}?mode=ro", uri=True) as conn:
+            return await (guard or QueryGuard()).check(conn, sql)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    ("sql", "findings", "action"),
+    [
+        ("SELECT * FROM journal_entries WHERE DOCUMENT_NUMBER = 'X'", [], GuardAction.ALLOW),
+        ("SELECT * FROM journal_entries WHERE SAP_BOOK_ID = 'B0001'", [], GuardAction.ALLOW),
+        ("SELECT * FROM journal_entries WHERE VALUE > 100", ["full_scan"], GuardAction.REWRITE),
+        ("SELECT * FROM journal_entries j WHERE j.REMARKS LIKE '%x%'", ["full_scan"], GuardAction.REWRITE),
+        (
+            "SELECT COUNT(*) FROM journal_entries WHERE REMARKS LIKE '%x%'",
+            ["full_scan_aggregate"],
+            GuardAction.ALLOW,
+        ),
+        ("SELECT * FROM books ORDER BY Bookname", ["temp_sort"], GuardAction.ALLOW),
+        ("SELECT * FROM books", [], GuardAction.ALLOW),
+        (
+            "SELECT * FROM journal_entries a, journal_entries b WHERE a.VALUE > b.VALUE",
+            ["full_scan", "cartesian_join"],
+            GuardAction.REJECT,
+        ),
+    ],
+)
+def test_plan_findings(plain_ledger: Path, sql: str, findings: list[str], action: str) -> None:
+    decision = check(plain_ledger, sql)
+    assert decision.findings == findings
+    assert decision.action == action
+
+
+def test_rewrite_clamps_the_limit(plain_ledger: Path) -> None:
+    sql = "SELECT * FROM journal_entries WHERE VALUE > 100 LIMIT 50000;"
+    decision = check(plain_ledger, sql, QueryGuard(max_limit=10))
+    assert decision.sql.endswith(") LIMIT 10")
+    assert decision.to_dict()["executed_query"] == decision.sql
+
+
+def test_compact_layout_flags_scans_of_the_fact_table(compact_ledger: Path) -> None:
+    decision = check(compact_ledger, "SELECT * FROM journal_entries WHERE VALUE > 100")
+    assert decision.findings == ["full_scan"]
+
+
+def test_policy_overrides_the_default_action(plain_ledger: Path) -> None:
+    guard = QueryGuard(policy={"full_scan": GuardAction.REJECT})
+    assert check(plain_ledger, "SELECT * FROM journal_entries", guard).action == GuardAction.REJECT
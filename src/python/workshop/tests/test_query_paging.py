@@ -0,0 +1,169 @@
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+from conftest import SharedFiles
+
+from FinancialData import FinancialData
+from query_guard import QueryGuard
+from query_paging import choose_keyset, decode_token, encode_token
+
+BALANCE_KEY = [("SAP_BOOK_ID", "DATE")]
+
+
+def fetch_all_pages(db_path: Path, sql: str, guard_limit: int = 1000) -> list[dict]:
+    """Every page of a query, following the continuation tokens."""
+
+    async def run() -> list[dict]:
+        guard = QueryGuard(max_limit=guard_limit)
+        financial_data = FinancialData(SharedFiles(db_path.parent.parent), query_guard=guard)
+        await financial_data.connect()
+        pages, token = [], ""
+        try:
+            while True:
+                page = json.loads(await financial_data.async_fetch_data_using_sqlite_query(sql, token))
+                assert isinstance(page, dict), page
+                pages.append(page)
+                token = page.get("continuation_token")
+                if not token:
+                    return pages
+        finally:
+            await financial_data.close()
+
+    return asyncio.run(run())
+
+
+def count_rows(db_path: Path, table: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_guarded_full_scan_pages_up_to_the_guard_limit(plain_ledger: Path) -> None:
+    pages = fetch_all_pages(plain_ledger, "SELECT * FROM journal_entries")
+    documents = [row[0] for page in pages for row in page["data"]]
+
+    assert pages[0]["query_guard"]["findings"] == ["full_scan"]
+    # The query runs as written and is paged; the guard's LIMIT is applied across the pages
+    assert pages[0]["query_guard"]["executed_query"] == "SELECT * FROM journal_entries"
+    assert pages[0]["query_guard"]["row_limit"] == 1000
+    assert len(documents) == len(set(documents)) == 1000
+    # The guard's limit ended the result, and says so
+    assert pages[-1]["truncated"] is True
+    assert pages[-1]["row_limit"] == 1000
+
+
+@pytest.mark.parametrize("layout", ["plain", "compact"])
+def test_guarded_full_scan_pages_through_every_row(
+    plain_ledger: Path, compact_ledger: Path, layout: str
+) -> None:
+    db_path = plain_ledger if layout == "plain" else compact_ledger
+    pages = fetch_all_pages(db_path, "SELECT * FROM journal_entries", guard_limit=100_000)
+    documents = [row[0] for page in pages for row in page["data"]]
+
+    assert len(documents) == len(set(documents)) == count_rows(plain_ledger, "journal_entries")
+    assert "truncated" not in pages[-1]
+
+
+def test_full_scan_uses_keyset_paging_on_the_document_number(plain_ledger: Path) -> None:
+    pages = fetch_all_pages(plain_ledger, "SELECT * FROM journal_entries", guard_limit=300)
+    assert decode_token(pages[0]["continuation_token"])["k"] == ["DOCUMENT_NUMBER"]
+
+
+def test_balance_pages_do_not_skip_rows(plain_ledger: Path) -> None:
+    pages = fetch_all_pages(plain_ledger, "SELECT SAP_BOOK_ID, DATE, BALANCE FROM balance_records")
+    keys = [tuple(row[:2]) for page in pages for row in page["data"]]
+    assert len(keys) == len(set(keys)) == count_rows(plain_ledger, "balance_records")
+
+
+def test_keyset_needs_a_unique_key_of_the_table() -> None:
+    columns = ["SAP_BOOK_ID", "DATE", "BALANCE"]
+    assert choose_keyset("SELECT SAP_BOOK_ID, DATE, BALANCE FROM balance_records", columns, BALANCE_KEY) == [
+        "SAP_BOOK_ID",
+        "DATE",
+    ]
+    # Journals per book and day are not unique
+    assert choose_keyset("SELECT SAP_BOOK_ID, ENTRY_DATE AS DATE, VALUE FROM journal_entries", columns, []) is None
+    assert (
+        choose_keyset(
+            "SELECT b.SAP_BOOK_ID, b.DATE, j.VALUE AS BALANCE FROM balance_records b "
+            "JOIN journal_entries j ON j.SAP_BOOK_ID = b.SAP_BOOK_ID",
+            columns,
+            BALANCE_KEY,
+        )
+        is None
+    )
+    assert choose_keyset("SELECT SAP_BOOK_ID, BALANCE AS DATE FROM balance_records", columns, BALANCE_KEY) is None
+
+
+def test_keyset_keeps_the_query_order() -> None:
+    sql = "SELECT * FROM balance_records ORDER BY BALANCE DESC"
+    assert choose_keyset(sql, ["SAP_BOOK_ID", "DATE", "BALANCE"], BALANCE_KEY) is None
+
+
+def run_queries(db_path: Path, *calls: tuple[str, str]) -> list[object]:
+    """Results of (query, continuation token) calls on one FinancialData; a token of "-" reuses the previous one."""
+
+    async def run() -> list[object]:
+        financial_data = FinancialData(SharedFiles(db_path.parent.parent))
+        await financial_data.connect()
+        results: list[object] = []
+        try:
+            for sql, token in calls:
+                if token == "-":
+                    token = results[-1]["continuation_token"]
+                results.append(json.loads(await financial_data.async_fetch_data_using_sqlite_query(sql, token)))
+        finally:
+            await financial_data.close()
+        return results
+
+    return asyncio.run(run())
+
+
+def test_ordered_query_pages_by_offset_in_its_own_order(plain_ledger: Path) -> None:
+    where = "WHERE SAP_BOOK_ID IN ('B0002', 'B0003')"
+    sql = f"SELECT SAP_BOOK_ID, DATE, BALANCE FROM balance_records {where} ORDER BY BALANCE DESC"
+    pages = fetch_all_pages(plain_ledger, sql)
+    balances = [row[2] for page in pages for row in page["data"]]
+
+    assert "o" in decode_token(pages[0]["continuation_token"])
+    assert balances == sorted(balances, reverse=True)
+    with sqlite3.connect(plain_ledger) as conn:
+        assert len(balances) == conn.execute(f"SELECT COUNT(*) FROM balance_records {where}").fetchone()[0]
+
+
+def test_token_of_another_query_is_rejected(plain_ledger: Path) -> None:
+    first, other = run_queries(
+        plain_ledger,
+        ("SELECT * FROM balance_records", ""),
+        ("SELECT * FROM balance_records WHERE BALANCE > 0", "-"),
+    )
+    assert first["truncated"] is True
+    assert "different query" in other["SQLite query failed"]
+
+
+def test_token_expires_when_the_data_changes(ledger: Path) -> None:
+    sql = "SELECT * FROM balance_records"
+    [first] = run_queries(ledger, (sql, ""))
+    with sqlite3.connect(ledger) as conn:
+        conn.execute("UPDATE balance_records SET BALANCE = BALANCE + 1 WHERE SAP_BOOK_ID = 'B0001'")
+    [expired] = run_queries(ledger, (sql, first["continuation_token"]))
+    assert "Continuation token expired" in expired
+
+
+@pytest.mark.parametrize(
+    "forged",
+    [
+        {"k": ['DOCUMENT_NUMBER") > (0) UNION SELECT * FROM books --'], "a": ["x"]},
+        {"k": ["VALUE"], "a": [0]},
+        {"k": ["DOCUMENT_NUMBER"], "a": ["x", "y"]},
+        {"o": "0; DROP TABLE books"},
+    ],
+)
+def test_forged_token_is_rejected(plain_ledger: Path, forged: dict) -> None:
+    sql = "SELECT * FROM journal_entries WHERE SAP_BOOK_ID = 'B0001'"
+    [first] = run_queries(plain_ledger, (sql, ""))
+    state = {key: value for key, value in decode_token(first["continuation_token"]).items() if key in ("h", "v", "n")}
+    [result] = run_queries(plain_ledger, (sql, encode_token({**state, **forged})))
+    assert result == {"SQLite query failed": "Invalid continuation token.", "query": sql}
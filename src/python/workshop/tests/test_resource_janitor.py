@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from resource_janitor import SHARED_OWNER, ResourceJanitor
+
+
+class FakeAgents:
+    """The delete methods of the agents client, recording what was deleted."""
+
+    def __init__(self, existing: set[str]) -> None:
+        self.existing = existing
+        self.deleted: list[str] = []
+
+    async def _delete(self, object_id: str) -> None:
+        if object_id not in self.existing:
+            raise ResourceNotFoundError(f"{object_id} not found")
+        self.existing.discard(object_id)
+        self.deleted.append(object_id)
+
+    delete_thread = delete_agent = delete_vector_store = delete_file = _delete
+
+
+def make_janitor(ledger_path: Path, existing: set[str], keep: set[str]) -> tuple[ResourceJanitor, FakeAgents]:
+    agents = FakeAgents(existing)
+    janitor = ResourceJanitor(SimpleNamespace(agents=agents), ledger_path, backoff=0.0, keep=lambda: keep)
+    return janitor, agents
+
+
+def ledger_rows(ledger_path: Path) -> dict[str, tuple]:
+    with sqlite3.connect(ledger_path) as conn:
+        return {row[0]: row[1:] for row in conn.execute("SELECT id, created_at, delisted_at FROM resources")}
+
+
+def test_reclaim_deletes_only_what_the_owner_created(tmp_path: Path) -> None:
+    async def scenario() -> list[str]:
+        janitor, agents = make_janitor(tmp_path / "ledger.db", {"thread_a", "thread_b", "agent"}, {"agent"})
+        await janitor.track("thread", "thread_a", "session_a")
+        await janitor.track("thread", "thread_b", "session_b")
+        await janitor.track("agent", "agent", SHARED_OWNER)
+        await janitor.reclaim("session_a")
+        deleted = list(agents.deleted)
+        await janitor.close()
+        return deleted
+
+    assert asyncio.run(scenario()) == ["thread_a"]
+
+
+def test_sweep_waits_min_age_after_the_registry_dropped_an_object(tmp_path: Path) -> None:
+    ledger_path = tmp_path / "ledger.db"
+    keep = {"agent_old"}
+
+    async def sweep() -> list[str]:
+        janitor, agents = make_janitor(ledger_path, {"agent_old"}, keep)
+        await janitor.sweep(min_age=60)
+        await janitor.close()
+        return agents.deleted
+
+    async def track() -> None:
+        janitor, _ = make_janitor(ledger_path, set(), keep)
+        await janitor.track("agent", "agent_old", SHARED_OWNER)
+        await janitor.close()
+
+    asyncio.run(track())
+    # Created long before it was replaced
+    with sqlite3.connect(ledger_path) as conn:
+        conn.execute("UPDATE resources SET created_at = 0")
+
+    assert asyncio.run(sweep()) == []
+    assert ledger_rows(ledger_path)["agent_old"][1] is None
+
+    keep.clear()
+    assert asyncio.run(sweep()) == []
+    delisted_at = ledger_rows(ledger_path)["agent_old"][1]
+    assert delisted_at is not None
+    # Still within the grace period, however old the object is
+    assert asyncio.run(sweep()) == []
+    assert ledger_rows(ledger_path)["agent_old"][1] == delisted_at
+
+    with sqlite3.connect(ledger_path) as conn:
+        conn.execute("UPDATE resources SET delisted_at = delisted_at - 61")
+    assert asyncio.run(sweep()) == ["agent_old"]
+    assert ledger_rows(ledger_path) == {}
+
+
+def test_sweep_forgets_the_delisting_of_an_object_listed_again(tmp_path: Path) -> None:
+    ledger_path = tmp_path / "ledger.db"
+    keep: set[str] = set()
+
+    async def scenario() -> None:
+        janitor, _ = make_janitor(ledger_path, {"store"}, keep)
+        await janitor.track("vector_store", "store", SHARED_OWNER)
+        await janitor.sweep(min_age=60)
+        keep.add("store")
+        await janitor.sweep(min_age=60)
+        await janitor.close()
+
+    asyncio.run(scenario())
+    assert ledger_rows(ledger_path)["store"][1] is None
+
+
+def test_sweep_deletes_what_a_dead_process_left_behind(tmp_path: Path) -> None:
+    ledger_path = tmp_path / "ledger.db"
+
+    async def scenario() -> list[str]:
+        janitor, agents = make_janitor(ledger_path, {"thread_dead", "thread_live"}, set())
+        await janitor.track("thread", "thread_live", "session")
+        await janitor.track("thread", "thread_dead", "session")
+        ledger = await janitor._ledger_connection()
+        # Far above any PID the kernel hands out
+        await ledger.execute("UPDATE resources SET pid = 2147483647 WHERE id = 'thread_dead'")
+        await ledger.commit()
+        await janitor.sweep()
+        deleted = list(agents.deleted)
+        await janitor.close()
+        return deleted
+
+    assert asyncio.run(scenario()) == ["thread_dead"]
+
+
+def test_ledger_of_an_older_version_gains_the_delisted_column(tmp_path: Path) -> None:
+    ledger_path = tmp_path / "ledger.db"
+    with sqlite3.connect(ledger_path) as conn:
+        conn.execute(
+            "CREATE TABLE resources (id TEXT PRIMARY KEY, kind TEXT NOT NULL, owner TEXT NOT NULL, pid INTEGER, "
+            "created_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO resources VALUES ('agent', 'agent', 'shared', NULL, 0)")
+
+    async def scenario() -> list[str]:
+        janitor, agents = make_janitor(ledger_path, {"agent"}, set())
+        await janitor.sweep(min_age=60)
+        await janitor.close()
+        return agents.deleted
+
+    assert asyncio.run(scenario()) == []
+    assert ledger_rows(ledger_path)["agent"][1] is not None
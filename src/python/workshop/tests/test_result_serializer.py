@@ -0,0 +1,30 @@
+import asyncio
+import json
+
+from result_serializer import OFFLOAD_THRESHOLD_BYTES, ResultSerializer, estimate_size
+
+COLUMNS = ["DOCUMENT_NUMBER", "REMARKS"]
+
+
+def rows(count: int, remark_length: int) -> list[tuple]:
+    return [(f"DOC-{i}", "x" * remark_length) for i in range(count)]
+
+
+def test_small_results_are_encoded_inline() -> None:
+    serializer = ResultSerializer()
+    result = asyncio.run(serializer.serialize_async(COLUMNS, rows(100, 20)))
+    assert json.loads(result)["data"][0] == ["DOC-0", "x" * 20]
+    assert serializer._executor is None
+
+
+def test_a_page_of_long_rows_is_encoded_in_the_executor() -> None:
+    # A full page of 100 rows with long text columns, as a REMARKS query returns
+    page = rows(100, 1000)
+    assert estimate_size(page) >= OFFLOAD_THRESHOLD_BYTES
+    serializer = ResultSerializer()
+    try:
+        result = asyncio.run(serializer.serialize_async(COLUMNS, page, {"truncated": True}))
+        assert serializer._executor is not None
+    finally:
+        serializer.close()
+    assert result == serializer.serialize(COLUMNS, page, {"truncated": True})
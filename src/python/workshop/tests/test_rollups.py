@@ -0,0 +1,59 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from rollups import ROLLUP_TABLES, build_rollups, refresh_rollups
+
+
+def rollup_rows(conn: sqlite3.Connection) -> dict[str, list[tuple]]:
+    return {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall() for table in ROLLUP_TABLES}
+
+
+def test_rollups_match_the_balance_records(plain_ledger: Path) -> None:
+    with sqlite3.connect(plain_ledger) as conn:
+        latest = conn.execute("SELECT SAP_BOOK_ID, DATE, BALANCE FROM latest_balances ORDER BY 1").fetchall()
+        expected_latest = conn.execute(
+            """
+            SELECT SAP_BOOK_ID, DATE, BALANCE FROM balance_records b
+            WHERE DATE = (SELECT MAX(DATE) FROM balance_records WHERE SAP_BOOK_ID = b.SAP_BOOK_ID)
+            ORDER BY 1
+            """
+        ).fetchall()
+        monthly = conn.execute("SELECT SUM(TOTAL_JOURNALS), ROUND(SUM(TOTAL_VALUE), 2) FROM book_monthly_totals")
+        yearly = conn.execute("SELECT SUM(TOTAL_JOURNALS), ROUND(SUM(TOTAL_VALUE), 2) FROM book_yearly_totals")
+        balances = conn.execute("SELECT SUM(TOTAL_JOURNALS), ROUND(SUM(BALANCE), 2) FROM balance_records")
+        expected_totals = balances.fetchone()
+
+        assert latest == expected_latest
+        assert len(latest) == conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        assert monthly.fetchone() == yearly.fetchone() == expected_totals
+
+
+def test_rebuild_is_repeatable(ledger: Path) -> None:
+    with sqlite3.connect(ledger) as conn:
+        before = rollup_rows(conn)
+        build_rollups(conn)
+        assert rollup_rows(conn) == before
+
+
+@pytest.mark.parametrize("book_id", ["B0001", "B0007"])
+def test_refresh_of_changed_balances_matches_a_rebuild(ledger: Path, book_id: str) -> None:
+    with sqlite3.connect(ledger) as conn:
+        dates = [row[0] for row in conn.execute("SELECT DATE FROM balance_records WHERE SAP_BOOK_ID = ?", (book_id,))]
+        changed = [(book_id, dates[0]), (book_id, dates[-1])]
+        before = rollup_rows(conn)
+        with conn:
+            conn.executemany(
+                "UPDATE balance_records SET BALANCE = BALANCE + 1000, TOTAL_JOURNALS = TOTAL_JOURNALS + 3 "
+                "WHERE SAP_BOOK_ID = ? AND DATE = ?",
+                changed,
+            )
+            conn.execute("CREATE TEMP TABLE changed (SAP_BOOK_ID TEXT, DATE TEXT)")
+            conn.executemany("INSERT INTO changed VALUES (?, ?)", changed)
+            refresh_rollups(conn, "temp.changed")
+        refreshed = rollup_rows(conn)
+        assert refreshed != before
+
+        build_rollups(conn)
+        assert refreshed == rollup_rows(conn)
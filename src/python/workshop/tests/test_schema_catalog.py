@@ -0,0 +1,37 @@
+import asyncio
+import shutil
+import sqlite3
+from pathlib import Path
+
+import aiosqlite
+
+from schema_catalog import SchemaCatalog
+
+
+def build_catalog(db_path: Path) -> dict:
+    async def run() -> dict:
+        async with aiosqlite.connect(db_path) as conn:
+            return await SchemaCatalog(db_path, db_path.with_suffix(".catalog.json")).get(conn, "test")
+
+    return asyncio.run(run())
+
+
+def test_catalog_does_not_depend_on_the_row_order(plain_ledger: Path, tmp_path: Path) -> None:
+    reordered = tmp_path / "reordered.db"
+    shutil.copy(plain_ledger, reordered)
+    with sqlite3.connect(reordered) as conn:
+        conn.execute("CREATE TABLE reversed AS SELECT * FROM journal_entries ORDER BY DOCUMENT_NUMBER DESC")
+        conn.execute("DELETE FROM journal_entries")
+        conn.execute("INSERT INTO journal_entries SELECT * FROM reversed")
+        conn.execute("DROP TABLE reversed")
+
+    expected = build_catalog(plain_ledger)
+    assert expected["transaction_types"] == sorted(expected["transaction_types"])
+    assert expected["currencies"] == sorted(expected["currencies"])
+    assert SchemaCatalog.render(build_catalog(reordered)) == SchemaCatalog.render(expected)
+
+
+def test_layouts_list_the_same_values(plain_ledger: Path, compact_ledger: Path) -> None:
+    plain, compact = build_catalog(plain_ledger), build_catalog(compact_ledger)
+    for key in ("transaction_types", "currencies", "years"):
+        assert compact[key] == plain[key]
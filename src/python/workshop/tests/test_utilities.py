@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from utilities import load_json, save_json
+
+
+def test_json_round_trip_leaves_no_temporary_file(tmp_path: Path) -> None:
+    path = tmp_path / "registry.json"
+    save_json(path, {"format": 1, "agents": {"a": {"id": "asst_1"}}}, "agent registry")
+    assert load_json(path, "agent registry") == {"format": 1, "agents": {"a": {"id": "asst_1"}}}
+    assert [file.name for file in tmp_path.iterdir()] == ["registry.json"]
+
+
+def test_missing_or_corrupt_json_reads_as_none(tmp_path: Path) -> None:
+    path = tmp_path / "catalog.json"
+    assert load_json(path, "schema catalog") is None
+    path.write_text('{"format": 1,', encoding="utf-8")
+    assert load_json(path, "schema catalog") is None
+
+
+def test_failed_save_is_logged_not_raised(tmp_path: Path) -> None:
+    save_json(tmp_path / "missing" / "cache.json", {"format": 1}, "upload cache")
+    assert not (tmp_path / "missing").exists()
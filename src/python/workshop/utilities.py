@@ -1,12 +1,65 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 from azure.ai.projects.aio import AIProjectClient
-from azure.ai.projects.models import ThreadMessage
+from azure.ai.projects.models import FileState, OpenAIFile, ThreadMessage, VectorStore
+from azure.core.exceptions import ResourceNotFoundError
 
 from terminal_colors import TerminalColors as tc
 
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+UPLOAD_CACHE_FORMAT = 1
+MAX_CONCURRENT_UPLOADS = 8
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file, read in chunks so large files never sit in memory whole."""
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while chunk := file.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_json(path: Path, description: str) -> Optional[dict]:
+    """Read a JSON file written by save_json; None when it is missing or unreadable."""
+    try:
+        with path.open("r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable %s %s: %s", description, path, e)
+        return None
+
+
+def save_json(path: Path, value: dict, description: str) -> None:
+    """Write a JSON file shared by several processes; a failure is logged, not raised."""
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with temp_path.open("w", encoding="utf-8") as file:
+            json.dump(value, file, indent=2)
+        # Atomic, so other processes never read a half-written file
+        temp_path.replace(path)
+    except OSError as e:
+        logger.warning("Could not persist %s to %s: %s", description, path, e)
+        temp_path.unlink(missing_ok=True)
+
 
 class Utilities:
+    def __init__(self, upload_cache_path: Optional[Path] = None) -> None:
+        # Content hash -> ID of the uploaded file, so identical bytes are uploaded only once
+        self.upload_cache_path = upload_cache_path or Path(__file__).with_name("shared.uploads.json")
+        self._upload_cache_lock = asyncio.Lock()
+
     # propert to get the relative path of shared files
     @property
     def shared_files_path(self) -> Path:
@@ -31,7 +84,7 @@ class Utilities:
         """Print a token in blue."""
         print(f"{tc.BLUE}{msg}{tc.RESET}", end="", flush=True)
 
-    async def get_file(self, project_client: AIProjectClient, file_id: str, attachment_name: str) -> None:
+    async def get_file(self, project_client: AIProjectClient, file_id: str, attachment_name: str) -> Path:
         """Retrieve the file and save it to the local disk."""
         self.log_msg_green(f"Getting file with ID: {file_id}")
 
@@ -52,42 +105,109 @@ class Utilities:
                 file.write(chunk)
 
         self.log_msg_green(f"File saved to {file_path}")
+        return file_path
 
-    async def get_files(self, message: ThreadMessage, project_client: AIProjectClient) -> None:
+    async def get_files(self, message: ThreadMessage, project_client: AIProjectClient) -> list[Path]:
         """Get the image files from the message and kickoff download."""
+        file_paths = []
         if message.image_contents:
             for index, image in enumerate(message.image_contents, start=0):
                 attachment_name = (
                     "unknown" if not message.file_path_annotations else message.file_path_annotations[index].text + ".png"
                 )
-                await self.get_file(project_client, image.image_file.file_id, attachment_name)
+                file_paths.append(await self.get_file(project_client, image.image_file.file_id, attachment_name))
         elif message.attachments:
             for index, attachment in enumerate(message.attachments, start=0):
                 attachment_name = (
                     "unknown" if not message.file_path_annotations else message.file_path_annotations[index].text
                 )
-                await self.get_file(project_client, attachment.file_id, attachment_name)
+                file_paths.append(await self.get_file(project_client, attachment.file_id, attachment_name))
+        return file_paths
 
-    async def upload_file(self, project_client: AIProjectClient, file_path: Path, purpose: str = "assistants") -> None:
-        """Upload a file to the project."""
+    async def upload_file(
+        self, project_client: AIProjectClient, file_path: Path, purpose: str = "assistants"
+    ) -> OpenAIFile:
+        """Upload a file to the project, streaming it from disk."""
         self.log_msg_purple(f"Uploading file: {file_path}")
-        file_info = await project_client.agents.upload_file(file_path=file_path, purpose=purpose)
+        with file_path.open("rb") as file:
+            file_info = await project_client.agents.upload_file(file=(file_path.name, file), purpose=purpose)
         self.log_msg_purple(f"File uploaded with ID: {file_info.id}")
         return file_info
 
-    async def create_vector_store(
-        self, project_client: AIProjectClient, files: list[str], vector_store_name: str
-    ) -> None:
-        """Upload a file to the project."""
+    async def upload_file_once(
+        self, project_client: AIProjectClient, file_path: Path, purpose: str = "assistants"
+    ) -> str:
+        """Return the ID of an uploaded file with the same content, uploading it only if there is none.
+
+        The upload cache maps content hashes to file IDs; a cached ID is used only after the
+        service confirms the file still exists with the same size and has not failed.
+        """
+        stat = file_path.stat()
+        cache = await asyncio.to_thread(self._load_upload_cache)
+        # Unchanged files are recognized by size and modification time without hashing them again
+        known = cache["paths"].get(str(file_path))
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            content_hash = known["sha256"]
+        else:
+            content_hash = await asyncio.to_thread(hash_file, file_path)
+
+        key = f"{purpose}:{content_hash}"
+        uploaded = cache["files"].get(key)
+        if uploaded and not await self._file_exists(project_client, uploaded["file_id"], stat.st_size):
+            uploaded = None
+        if uploaded:
+            self.log_msg_purple(f"Reusing uploaded file {file_path.name}: {uploaded['file_id']}")
+        else:
+            file_info = await self.upload_file(project_client, file_path, purpose)
+            uploaded = {
+                "file_id": file_info.id,
+                "filename": file_path.name,
+                "uploaded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+
+        async with self._upload_cache_lock:
+            cache = self._load_upload_cache()
+            cache["paths"][str(file_path)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": content_hash,
+            }
+            cache["files"][key] = uploaded
+            self._save_upload_cache(cache)
+        return uploaded["file_id"]
+
+    @staticmethod
+    async def _file_exists(project_client: AIProjectClient, file_id: str, size: int) -> bool:
+        try:
+            file_info = await project_client.agents.get_file(file_id)
+        except ResourceNotFoundError:
+            return False
+        return file_info.bytes == size and file_info.status not in (
+            FileState.ERROR,
+            FileState.DELETING,
+            FileState.DELETED,
+        )
 
-        file_ids = []
+    async def create_vector_store(
+        self,
+        project_client: AIProjectClient,
+        files: list[str],
+        vector_store_name: str,
+        max_concurrent_uploads: int = MAX_CONCURRENT_UPLOADS,
+    ) -> VectorStore:
+        """Upload the shared files, at most max_concurrent_uploads at a time, and create a vector store of them.
+
+        Files whose content was uploaded before are not uploaded again; see upload_file_once.
+        """
         prefix = self.shared_files_path
+        semaphore = asyncio.Semaphore(max_concurrent_uploads)
 
-        # Upload the files
-        for file in files:
-            file_path = prefix / file
-            file_info = await self.upload_file(project_client, file_path=file_path, purpose="assistants")
-            file_ids.append(file_info.id)
+        async def upload(file: str) -> str:
+            async with semaphore:
+                return await self.upload_file_once(project_client, prefix / file, purpose="assistants")
+
+        # gather keeps the order of the files
+        file_ids = await asyncio.gather(*(upload(file) for file in files))
 
         self.log_msg_purple("Creating the vector store")
 
@@ -98,3 +218,12 @@ class Utilities:
 
         self.log_msg_purple(f"Vector store created and files added.")
         return vector_store
+
+    def _load_upload_cache(self) -> dict:
+        cache = load_json(self.upload_cache_path, "upload cache")
+        if cache is None or cache.get("format") != UPLOAD_CACHE_FORMAT:
+            return {"format": UPLOAD_CACHE_FORMAT, "paths": {}, "files": {}}
+        return cache
+
+    def _save_upload_cache(self, cache: dict) -> None:
+        save_json(self.upload_cache_path, cache, "upload cache")